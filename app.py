@@ -3,15 +3,22 @@ Aplicación principal Flask.
 
 Este módulo inicializa la aplicación Flask y configura todos los componentes.
 """
+from datetime import timedelta
 from flask import Flask
 from flask_login import LoginManager
 from flask_mail import Mail
 from flask_migrate import Migrate
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, date
-from database import db
+from database import db, configurar_sqlite
 from config import get_config
 from utils.error_handler import register_error_handlers
+from utils.commands import register_commands
+from utils.scheduler import configurar_scheduler
+from utils.condicional import configurar_peticiones_condicionales
+from services.cache import crear_cache, CacheLRU
+from services.cache_usuario import CacheUsuario
+from services.identidad import CacheIdentidad
+from services.tokens_api import TokensApi, token_de_peticion
+from services.contrasenas import VerificadorContrasenas
 
 
 def create_app(config_class=None):
@@ -33,6 +40,8 @@ def create_app(config_class=None):
     
     # Inicializar extensiones
     db.init_app(app)
+    with app.app_context():
+        configurar_sqlite(db.engine, app.config)
     migrate = Migrate(app, db)
     
     login_manager = LoginManager()
@@ -42,99 +51,66 @@ def create_app(config_class=None):
     
     mail = Mail(app)
     
-    # Configurar scheduler para tareas programadas
-    scheduler = BackgroundScheduler()
-    scheduler.start()
+    # Caché de resultados de estrategias de deuda
+    app.extensions['cache_estrategias'] = crear_cache(
+        'estrategias',
+        max_entradas=app.config['ESTRATEGIAS_CACHE_MAX'],
+        ttl=app.config['ESTRATEGIAS_CACHE_TTL'],
+        url_redis=app.config.get('CACHE_REDIS_URL')
+    )
+    
+    # Caché por usuario de las respuestas de lectura de la API
+    cache_usuarios = crear_cache(
+        'usuarios',
+        max_entradas=app.config['API_CACHE_MAX'],
+        ttl=app.config['API_CACHE_TTL'],
+        url_redis=app.config.get('CACHE_REDIS_URL')
+    )
+    # Las versiones viven en la base de datos; los cuerpos solo se guardan si se
+    # configura (por defecto, con Redis)
+    app.extensions['cache_usuarios'] = CacheUsuario(
+        cache_usuarios, guardar_respuestas=app.config['API_CACHE_RESPUESTAS']
+    )
+    
+    # Usuarios autenticados en memoria, para no leerlos en cada petición
+    app.extensions['cache_identidad'] = CacheIdentidad(
+        CacheLRU(app.config['IDENTIDAD_CACHE_MAX'], app.config['IDENTIDAD_CACHE_TTL'])
+    )
     
-    # Importar modelos después de inicializar db
-    from models import User, Ingreso, Egreso, Meta, Ahorro, Recordatorio, DeudaFija
+    # Tokens firmados de la API, con la lista de revocados en memoria
+    app.extensions['tokens_api'] = TokensApi(
+        app.config.get('API_TOKEN_SECRET') or app.config['SECRET_KEY'],
+        timedelta(hours=app.config['API_TOKEN_HORAS']),
+        CacheLRU(1, app.config['API_TOKEN_REVOCADOS_TTL']),
+        app.extensions['cache_identidad']
+    )
+    
+    # Pool acotado para los hashes de contraseñas (opcional)
+    if app.config['PASSWORD_HILOS'] > 0:
+        app.extensions['verificador_contrasenas'] = VerificadorContrasenas(
+            app.config['PASSWORD_HILOS'], app.config['PASSWORD_COLA_MAX']
+        )
+    
+    # Registra todas las tablas en db.metadata para create_all y Flask-Migrate
+    # (load_user ya no usa los modelos: lee la caché de identidad)
+    import models  # noqa: F401
     
     @login_manager.user_loader
     def load_user(user_id):
-        """Carga un usuario por su ID."""
-        return User.query.get(int(user_id))
-    
-    def verificar_recordatorios():
-        """Tarea programada para verificar y enviar recordatorios."""
-        with app.app_context():
-            from datetime import timedelta
-            hoy = datetime.now().date()
-            
-            # Verificar recordatorios normales
-            recordatorios = Recordatorio.query.filter_by(enviado=False).all()
-            
-            for recordatorio in recordatorios:
-                if recordatorio.fecha_recordatorio <= hoy:
-                    try:
-                        from flask_mail import Message
-                        msg = Message(
-                            subject=f'[FINANZAS MALU] Recordatorio: {recordatorio.titulo}',
-                            recipients=[recordatorio.usuario.email],
-                            body=f'Hola {recordatorio.usuario.nombre},\n\n'
-                                 f'Te recordamos que tienes un pago pendiente:\n\n'
-                                 f'Título: {recordatorio.titulo}\n'
-                                 f'Descripción: {recordatorio.descripcion}\n'
-                                 f'Fecha de pago: {recordatorio.fecha_pago}\n'
-                                 f'Monto: ${recordatorio.monto:.2f}\n\n'
-                                 f'Por favor, no olvides realizar este pago a tiempo.'
-                        )
-                        mail.send(msg)
-                        recordatorio.enviado = True
-                        db.session.commit()
-                    except Exception as e:
-                        app.logger.error(f'Error enviando recordatorio: {e}')
-            
-            # Verificar deudas fijas (2 días antes)
-            deudas = DeudaFija.query.filter_by(activa=True, pagada_este_mes=False).all()
-            
-            for deuda in deudas:
-                # Calcular fecha de pago del mes actual
-                fecha_pago_mes = date(hoy.year, hoy.month, min(deuda.dia_pago, 28))
-                if fecha_pago_mes < hoy:
-                    # Si ya pasó, usar el próximo mes
-                    if hoy.month == 12:
-                        fecha_pago_mes = date(hoy.year + 1, 1, min(deuda.dia_pago, 28))
-                    else:
-                        fecha_pago_mes = date(hoy.year, hoy.month + 1, min(deuda.dia_pago, 28))
-                
-                # Verificar si faltan 2 días o menos
-                dias_restantes = (fecha_pago_mes - hoy).days
-                
-                if 0 <= dias_restantes <= 2:
-                    # Verificar si ya se envió notificación hoy
-                    try:
-                        from models import TokenRecuperacion
-                        # Usar un campo temporal o verificar última notificación
-                        # Por simplicidad, enviaremos si está en el rango
-                        from flask_mail import Message
-                        msg = Message(
-                            subject=f'[FINANZAS MALU] Recordatorio: Pago de deuda fija - {deuda.titulo}',
-                            recipients=[deuda.usuario.email],
-                            body=f'Hola {deuda.usuario.nombre},\n\n'
-                                 f'Te recordamos que tienes una deuda fija próxima a vencer:\n\n'
-                                 f'Deuda: {deuda.titulo}\n'
-                                 f'Descripción: {deuda.descripcion or "Sin descripción"}\n'
-                                 f'Fecha de pago: {fecha_pago_mes.strftime("%d/%m/%Y")}\n'
-                                 f'Monto: ${deuda.monto:.2f}\n'
-                                 f'Días restantes: {dias_restantes}\n\n'
-                                 f'Por favor, no olvides realizar este pago a tiempo.\n'
-                                 f'Puedes marcarlo como pagado en la aplicación cuando lo realices.'
-                        )
-                        mail.send(msg)
-                        app.logger.info(f'Notificación de deuda enviada: {deuda.titulo}')
-                    except Exception as e:
-                        app.logger.error(f'Error enviando notificación de deuda: {e}')
-    
-    # Programar verificación diaria de recordatorios
-    scheduler.add_job(
-        func=verificar_recordatorios,
-        trigger='cron',
-        hour=app.config.get('SCHEDULER_HOUR', 9),
-        minute=app.config.get('SCHEDULER_MINUTE', 0),
-        id='verificar_recordatorios',
-        name='Verificar recordatorios diarios',
-        replace_existing=True
-    )
+        """Carga un usuario por su ID desde la caché de identidad."""
+        return app.extensions['cache_identidad'].cargar(int(user_id))
+    
+    @login_manager.request_loader
+    def load_user_from_request(request):
+        """Autentica las peticiones a la API con un token Bearer, sin sesión."""
+        token = token_de_peticion(request) if request.blueprint == 'api' else None
+        if token is None:
+            return None
+        usuario_id = app.extensions['tokens_api'].verificar(token)
+        return app.extensions['cache_identidad'].cargar(usuario_id) if usuario_id else None
+    
+    # Configurar scheduler y programar la verificación diaria de recordatorios
+    configurar_scheduler(app, mail)
     
     # Registrar blueprints
     from routes.auth import auth_bp
@@ -157,9 +133,15 @@ def create_app(config_class=None):
     app.register_blueprint(estrategias_bp)
     app.register_blueprint(api_bp)
     
+    # ETag / Last-Modified para el dashboard y los listados
+    configurar_peticiones_condicionales(app)
+    
     # Registrar manejadores de errores
     register_error_handlers(app)
     
+    # Registrar comandos CLI
+    register_commands(app)
+    
     # Agregar funciones globales a Jinja2
     @app.context_processor
     def inject_date():
@@ -10,6 +10,32 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def opciones_motor(url: str) -> dict:
+    """
+    Opciones de ``create_engine`` según el motor de la base de datos.
+
+    SQLite usa los valores por defecto de SQLAlchemy (los PRAGMA se aplican al
+    conectar, ver ``database.configurar_sqlite``). Para servidores como
+    PostgreSQL se acota el pool por worker, se reciclan las conexiones antes de
+    que el servidor las cierre y se comprueban antes de usarlas.
+    """
+    if url.startswith('sqlite'):
+        return {}
+
+    opciones = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true',
+    }
+    # Tiempo máximo por sentencia en PostgreSQL (0: sin límite)
+    timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+    if timeout > 0 and url.startswith('postgresql'):
+        opciones['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+    return opciones
+
+
 class Config:
     """Configuración base de la aplicación."""
     
@@ -20,6 +46,13 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///finanzas.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'False').lower() == 'true'
+    SQLALCHEMY_ENGINE_OPTIONS = opciones_motor(SQLALCHEMY_DATABASE_URI)
+    
+    # PRAGMA de cada conexión SQLite (vacío para no aplicarlo)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  # 256 MB
     
     # Configuración de email
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -29,16 +62,67 @@ class Config:
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD', '')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', '')
     
+    # Envío de notificaciones: mensajes por conexión SMTP y hilos de envío
+    NOTIFICACIONES_LOTE = int(os.getenv('NOTIFICACIONES_LOTE', 50))
+    NOTIFICACIONES_HILOS = int(os.getenv('NOTIFICACIONES_HILOS', 4))
+    
     # Configuración de scheduler
     SCHEDULER_TIMEZONE = os.getenv('SCHEDULER_TIMEZONE', 'UTC')
     SCHEDULER_HOUR = int(os.getenv('SCHEDULER_HOUR', 9))
     SCHEDULER_MINUTE = int(os.getenv('SCHEDULER_MINUTE', 0))
+    # local: tareas en memoria (un worker); distribuido: jobstore en BD y bloqueo por tarea
+    SCHEDULER_MODO = os.getenv('SCHEDULER_MODO', 'local')
+    SCHEDULER_JOBSTORE_URL = os.getenv('SCHEDULER_JOBSTORE_URL')  # Por defecto, DATABASE_URL
+    SCHEDULER_SHARDS = int(os.getenv('SCHEDULER_SHARDS', 1))
+    SCHEDULER_LEASE_SEGUNDOS = int(os.getenv('SCHEDULER_LEASE_SEGUNDOS', 3600))
     
     # Configuración de paginación
     ITEMS_PER_PAGE = int(os.getenv('ITEMS_PER_PAGE', 10))
+    API_ITEMS_PER_PAGE = int(os.getenv('API_ITEMS_PER_PAGE', 100))
+    API_MAX_ITEMS_PER_PAGE = int(os.getenv('API_MAX_ITEMS_PER_PAGE', 1000))
+    
+    # Configuración de importación masiva
+    IMPORTACION_MAX_FILAS = int(os.getenv('IMPORTACION_MAX_FILAS', 10000))
+    IMPORTACION_TAMANO_LOTE = int(os.getenv('IMPORTACION_TAMANO_LOTE', 500))
+    
+    # Simulación de estrategias de deuda: eventos, vectorizado (NumPy), exacto (Decimal) o verificado
+    ESTRATEGIAS_MODO = os.getenv('ESTRATEGIAS_MODO', 'eventos')
+    ESTRATEGIAS_PROCESOS = int(os.getenv('ESTRATEGIAS_PROCESOS', 2))
+    ESTRATEGIAS_MAX_ESCENARIOS = int(os.getenv('ESTRATEGIAS_MAX_ESCENARIOS', 200))
+    ESTRATEGIAS_CACHE_MAX = int(os.getenv('ESTRATEGIAS_CACHE_MAX', 1024))
+    ESTRATEGIAS_CACHE_TTL = int(os.getenv('ESTRATEGIAS_CACHE_TTL', 600))
+    
+    # Caché por usuario de las respuestas de lectura de la API
+    API_CACHE_MAX = int(os.getenv('API_CACHE_MAX', 4096))
+    API_CACHE_TTL = int(os.getenv('API_CACHE_TTL', 300))
+    
+    # Caché en memoria de los usuarios autenticados (load_user). Los cambios hechos
+    # en otro worker tardan como máximo IDENTIDAD_CACHE_TTL segundos en verse
+    IDENTIDAD_CACHE_MAX = int(os.getenv('IDENTIDAD_CACHE_MAX', 1024))
+    IDENTIDAD_CACHE_TTL = int(os.getenv('IDENTIDAD_CACHE_TTL', 60))
+    
+    # Caché compartida entre workers (opcional, requiere el paquete redis)
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    
+    # Guardar los cuerpos de las respuestas de la API (por defecto, solo con Redis)
+    API_CACHE_RESPUESTAS = os.getenv('API_CACHE_RESPUESTAS',
+                                     str(bool(CACHE_REDIS_URL))).lower() == 'true'
+    
+    # Hash de contraseñas: método (scrypt o pbkdf2:sha256) y coste (0: el del método).
+    # Con PASSWORD_HILOS > 0 los hashes se calculan en un pool acotado de hilos
+    PASSWORD_HASH_METODO = os.getenv('PASSWORD_HASH_METODO', 'scrypt')
+    PASSWORD_HASH_ITERACIONES = int(os.getenv('PASSWORD_HASH_ITERACIONES', 0))
+    PASSWORD_HILOS = int(os.getenv('PASSWORD_HILOS', 0))
+    PASSWORD_COLA_MAX = int(os.getenv('PASSWORD_COLA_MAX', 16))
     
     # Configuración de tokens
     TOKEN_EXPIRATION_HOURS = int(os.getenv('TOKEN_EXPIRATION_HOURS', 24))
+    
+    # Tokens Bearer de la API: clave de firma (por defecto, SECRET_KEY), vigencia
+    # y segundos que cada worker reutiliza la lista de tokens revocados
+    API_TOKEN_SECRET = os.getenv('API_TOKEN_SECRET')
+    API_TOKEN_HORAS = int(os.getenv('API_TOKEN_HORAS', 24))
+    API_TOKEN_REVOCADOS_TTL = int(os.getenv('API_TOKEN_REVOCADOS_TTL', 30))
 
 
 class DevelopmentConfig(Config):
@@ -64,7 +148,12 @@ class TestingConfig(Config):
     """Configuración para pruebas."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
     WTF_CSRF_ENABLED = False
+    # Hashes baratos para que las pruebas no dependan del coste de producción
+    PASSWORD_HASH_METODO = 'pbkdf2:sha256'
+    PASSWORD_HASH_ITERACIONES = 1000
+    API_CACHE_RESPUESTAS = True
 
 
 # Diccionario de configuraciones
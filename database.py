@@ -1,6 +1,89 @@
+from typing import Any, Dict, Optional
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, event, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 
 # Instancia de SQLAlchemy que será inicializada en app.py
 db = SQLAlchemy()
 
+# INSERT con ON CONFLICT DO UPDATE de cada dialecto
+_INSERT_CON_CONFLICTO = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
 
+
+def acumular(tabla, claves: Dict[str, Any], incrementos: Dict[str, Any],
+             valores: Optional[Dict[str, Any]] = None, sesion=None) -> None:
+    """
+    Inserta la fila de `claves` o, si ya existe, suma `incrementos` a sus
+    columnas (y asigna `valores`), sin perder escrituras concurrentes.
+
+    En PostgreSQL y SQLite es un único ``INSERT ... ON CONFLICT DO UPDATE``
+    sobre la restricción única de `claves`. En otros motores se hace el UPDATE
+    y, si no había fila, el INSERT en un savepoint; si otra transacción la
+    insertó a la vez, se repite el UPDATE.
+
+    No hace commit: forma parte de la transacción del llamador.
+
+    Args:
+        tabla: Modelo o tabla con una restricción única sobre `claves`
+        claves: Valores de las columnas que identifican la fila
+        incrementos: Columnas a sumar (valor inicial si la fila es nueva)
+        valores: Columnas a asignar (opcional)
+        sesion: Sesión en la que se ejecuta (por defecto, ``db.session``)
+    """
+    tabla = getattr(tabla, '__table__', tabla)
+    valores = valores or {}
+    sesion = sesion or db.session
+    fila = {**claves, **incrementos, **valores}
+
+    insertar = _INSERT_CON_CONFLICTO.get(sesion.get_bind().dialect.name)
+    if insertar is not None:
+        sentencia = insertar(tabla).values(**fila)
+        sesion.execute(sentencia.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={**{c: tabla.c[c] + sentencia.excluded[c] for c in incrementos},
+                  **{c: sentencia.excluded[c] for c in valores}}
+        ))
+        return
+
+    actualizar = update(tabla).where(and_(*(tabla.c[c] == v for c, v in claves.items())))\
+        .values(**{c: tabla.c[c] + v for c, v in incrementos.items()}, **valores)
+    if sesion.execute(actualizar).rowcount:
+        return
+    try:
+        with sesion.begin_nested():
+            sesion.execute(insert(tabla).values(**fila))
+    except IntegrityError:
+        sesion.execute(actualizar)
+
+
+def configurar_sqlite(engine, config):
+    """
+    Aplica los PRAGMA de SQLite a cada conexión nueva del motor.
+
+    Con ``journal_mode=WAL`` los lectores no se bloquean mientras otro proceso
+    escribe; ``synchronous=NORMAL`` es seguro en WAL y evita un fsync por
+    commit; ``busy_timeout`` hace que un escritor espere al bloqueo en lugar
+    de fallar con "database is locked".
+
+    Args:
+        engine: Motor de SQLAlchemy (se ignora si no es SQLite)
+        config: Configuración de la aplicación
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT_MS')),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE')),
+    ]
+    pragmas = [(nombre, valor) for nombre, valor in pragmas if valor not in (None, '')]
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexion, registro):
+        cursor = conexion.cursor()
+        for nombre, valor in pragmas:
+            cursor.execute(f'PRAGMA {nombre}={valor}')
+        cursor.close()
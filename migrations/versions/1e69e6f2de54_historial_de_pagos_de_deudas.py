@@ -0,0 +1,109 @@
+"""historial de pagos de deudas
+
+Revision ID: 1e69e6f2de54
+Revises: 46fb259e6d42
+Create Date: 2026-10-17 20:23:54.786751
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e69e6f2de54'
+down_revision = '46fb259e6d42'
+branch_labels = None
+depends_on = None
+
+
+PREFIJO_EGRESO = 'Pago de deuda: '
+
+deudas = sa.table('deudas_fijas',
+                  sa.column('id', sa.Integer), sa.column('usuario_id', sa.Integer),
+                  sa.column('titulo', sa.String), sa.column('monto', sa.Numeric),
+                  sa.column('pagada_este_mes', sa.Boolean),
+                  sa.column('fecha_ultimo_pago', sa.Date))
+egresos = sa.table('egresos',
+                   sa.column('id', sa.Integer), sa.column('usuario_id', sa.Integer),
+                   sa.column('descripcion', sa.String), sa.column('categoria', sa.String),
+                   sa.column('monto', sa.Numeric), sa.column('fecha', sa.Date))
+pagos = sa.table('pagos_deuda',
+                 sa.column('deuda_id', sa.Integer), sa.column('periodo', sa.String),
+                 sa.column('egreso_id', sa.Integer), sa.column('monto', sa.Numeric),
+                 sa.column('fecha', sa.Date))
+
+
+def _historial(conexion):
+    """
+    Pagos a partir de los egresos automáticos ('Pago de deuda: <título>') y,
+    si no hay egreso, de la marca de pagada del mes.
+    """
+    por_titulo = {}
+    marcadas = []
+    for deuda in conexion.execute(sa.select(deudas)):
+        por_titulo.setdefault((deuda.usuario_id, deuda.titulo), []).append(deuda)
+        if deuda.pagada_este_mes and deuda.fecha_ultimo_pago:
+            marcadas.append(deuda)
+
+    filas = {}
+    consulta = sa.select(egresos).where(
+        egresos.c.categoria == 'Deudas',
+        egresos.c.descripcion.like(PREFIJO_EGRESO + '%')
+    ).order_by(egresos.c.fecha, egresos.c.id)
+    for egreso in conexion.execute(consulta):
+        candidatas = por_titulo.get((egreso.usuario_id, egreso.descripcion[len(PREFIJO_EGRESO):]))
+        if not candidatas or len(candidatas) > 1:
+            continue  # Título ambiguo o deuda eliminada
+        clave = (candidatas[0].id, egreso.fecha.strftime('%Y-%m'))
+        filas.setdefault(clave, dict(deuda_id=clave[0], periodo=clave[1], egreso_id=egreso.id,
+                                     monto=egreso.monto, fecha=egreso.fecha))
+
+    for deuda in marcadas:
+        clave = (deuda.id, deuda.fecha_ultimo_pago.strftime('%Y-%m'))
+        filas.setdefault(clave, dict(deuda_id=deuda.id, periodo=clave[1], egreso_id=None,
+                                     monto=deuda.monto, fecha=deuda.fecha_ultimo_pago))
+    return list(filas.values())
+
+
+def upgrade():
+    op.create_table(
+        'pagos_deuda',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('deuda_id', sa.Integer(), nullable=False),
+        sa.Column('periodo', sa.String(length=7), nullable=False),
+        sa.Column('egreso_id', sa.Integer(), nullable=True),
+        sa.Column('monto', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['deuda_id'], ['deudas_fijas.id']),
+        sa.ForeignKeyConstraint(['egreso_id'], ['egresos.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('deuda_id', 'periodo', name='uq_pagos_deuda_periodo')
+    )
+
+    filas = _historial(op.get_bind())
+    if filas:
+        op.bulk_insert(pagos, filas)
+
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.drop_index('ix_deudas_fijas_estado_proxima')
+        batch_op.create_index('ix_deudas_fijas_activa_proxima',
+                              ['activa', 'proxima_fecha_pago'], unique=False)
+        batch_op.drop_column('pagada_este_mes')
+
+
+def downgrade():
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.add_column(sa.Column('pagada_este_mes', sa.Boolean(), nullable=True))
+
+    periodo = date.today().strftime('%Y-%m')
+    pagada = sa.exists().where(pagos.c.deuda_id == deudas.c.id, pagos.c.periodo == periodo)
+    op.execute(deudas.update().values(pagada_este_mes=sa.case((pagada, True), else_=False)))
+
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.drop_index('ix_deudas_fijas_activa_proxima')
+        batch_op.create_index('ix_deudas_fijas_estado_proxima',
+                              ['activa', 'pagada_este_mes', 'proxima_fecha_pago'], unique=False)
+
+    op.drop_table('pagos_deuda')
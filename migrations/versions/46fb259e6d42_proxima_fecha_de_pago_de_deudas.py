@@ -0,0 +1,58 @@
+"""proxima fecha de pago de deudas
+
+Revision ID: 46fb259e6d42
+Revises: f1d4f9b024bf
+Create Date: 2026-10-17 20:19:51.720932
+
+"""
+import calendar
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '46fb259e6d42'
+down_revision = 'f1d4f9b024bf'
+branch_labels = None
+depends_on = None
+
+
+def _proxima_fecha(dia_pago, hoy):
+    """Primera fecha de pago >= hoy (en meses cortos, el último día del mes)."""
+    fecha = date(hoy.year, hoy.month, min(dia_pago, calendar.monthrange(hoy.year, hoy.month)[1]))
+    if fecha < hoy:
+        anio, mes = (hoy.year + 1, 1) if hoy.month == 12 else (hoy.year, hoy.month + 1)
+        fecha = date(anio, mes, min(dia_pago, calendar.monthrange(anio, mes)[1]))
+    return fecha
+
+
+def upgrade():
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.add_column(sa.Column('proxima_fecha_pago', sa.Date(), nullable=True))
+
+    # Un UPDATE por día de pago
+    deudas = sa.table('deudas_fijas', sa.column('dia_pago', sa.Integer),
+                      sa.column('proxima_fecha_pago', sa.Date))
+    hoy = date.today()
+    for dia in range(1, 32):
+        op.execute(deudas.update().where(deudas.c.dia_pago == dia)
+                   .values(proxima_fecha_pago=_proxima_fecha(dia, hoy)))
+
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.alter_column('proxima_fecha_pago', existing_type=sa.Date(), nullable=False)
+        batch_op.drop_index('ix_deudas_fijas_estado_dia')
+        batch_op.create_index('ix_deudas_fijas_estado_proxima',
+                              ['activa', 'pagada_este_mes', 'proxima_fecha_pago'], unique=False)
+        batch_op.create_index('ix_deudas_fijas_usuario_proxima',
+                              ['usuario_id', 'proxima_fecha_pago'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.drop_index('ix_deudas_fijas_usuario_proxima')
+        batch_op.drop_index('ix_deudas_fijas_estado_proxima')
+        batch_op.create_index('ix_deudas_fijas_estado_dia',
+                              ['activa', 'pagada_este_mes', 'dia_pago'], unique=False)
+        batch_op.drop_column('proxima_fecha_pago')
@@ -0,0 +1,54 @@
+"""hash de tokens de recuperacion
+
+Revision ID: 8655ed5f83c8
+Revises: 9f721fa07b5a
+Create Date: 2026-10-17 20:38:49.055648
+
+"""
+import hashlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8655ed5f83c8'
+down_revision = '9f721fa07b5a'
+branch_labels = None
+depends_on = None
+
+
+tokens = sa.table('tokens_recuperacion',
+                  sa.column('id', sa.Integer), sa.column('token', sa.String),
+                  sa.column('token_hash', sa.String), sa.column('usado', sa.Boolean),
+                  sa.column('fecha_expiracion', sa.DateTime))
+
+
+def upgrade():
+    with op.batch_alter_table('tokens_recuperacion') as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sa.String(length=64), nullable=True))
+
+    # Los tokens vigentes siguen funcionando; los usados o expirados se descartan
+    conexion = op.get_bind()
+    op.execute(tokens.delete().where(sa.or_(tokens.c.usado.is_(True),
+                                            tokens.c.fecha_expiracion <= datetime.utcnow())))
+    for token_id, token in conexion.execute(sa.select(tokens.c.id, tokens.c.token)).fetchall():
+        conexion.execute(tokens.update().where(tokens.c.id == token_id)
+                         .values(token_hash=hashlib.sha256(token.encode()).hexdigest()))
+
+    with op.batch_alter_table('tokens_recuperacion') as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column('token')
+        batch_op.create_index('ix_tokens_recuperacion_busqueda',
+                              ['token_hash', 'usado', 'fecha_expiracion'], unique=False)
+
+
+def downgrade():
+    # Los tokens en claro no se pueden recuperar a partir del hash
+    op.execute(tokens.delete())
+    with op.batch_alter_table('tokens_recuperacion') as batch_op:
+        batch_op.drop_index('ix_tokens_recuperacion_busqueda')
+        batch_op.add_column(sa.Column('token', sa.String(length=100), nullable=False))
+        batch_op.create_unique_constraint('uq_tokens_recuperacion_token', ['token'])
+        batch_op.drop_column('token_hash')
@@ -0,0 +1,27 @@
+"""version de tokens de la api
+
+Revision ID: 893eceab66c7
+Revises: ad1477d98a7b
+Create Date: 2026-10-17 20:56:44.354058
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '893eceab66c7'
+down_revision = 'ad1477d98a7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('version_tokens', sa.Integer(), nullable=False,
+                                      server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('version_tokens')
@@ -0,0 +1,31 @@
+"""bloqueos de tareas programadas
+
+Revision ID: 9e498127b8b1
+Revises: fb8f2a285b45
+Create Date: 2026-10-17 20:03:05.548890
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e498127b8b1'
+down_revision = 'fb8f2a285b45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'bloqueos_tareas',
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('propietario', sa.String(length=100), nullable=True),
+        sa.Column('expira', sa.DateTime(), nullable=False),
+        sa.Column('ultimo_periodo', sa.String(length=20), nullable=True),
+        sa.PrimaryKeyConstraint('nombre')
+    )
+
+
+def downgrade():
+    op.drop_table('bloqueos_tareas')
@@ -0,0 +1,35 @@
+"""tokens de la api revocados
+
+Revision ID: 9f721fa07b5a
+Revises: 1e69e6f2de54
+Create Date: 2026-10-17 20:34:44.618445
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f721fa07b5a'
+down_revision = '1e69e6f2de54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'tokens_api_revocados',
+        sa.Column('jti', sa.String(length=32), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('fecha_expiracion', sa.DateTime(), nullable=False),
+        sa.Column('fecha_revocacion', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_tokens_api_revocados_fecha_expiracion', 'tokens_api_revocados',
+                    ['fecha_expiracion'])
+
+
+def downgrade():
+    op.drop_index('ix_tokens_api_revocados_fecha_expiracion', table_name='tokens_api_revocados')
+    op.drop_table('tokens_api_revocados')
@@ -0,0 +1,31 @@
+"""versiones de datos por usuario
+
+Revision ID: ad1477d98a7b
+Revises: 8655ed5f83c8
+Create Date: 2026-10-17 20:53:05.931886
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ad1477d98a7b'
+down_revision = '8655ed5f83c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'versiones_datos',
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('tabla', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('fecha_modificacion', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('usuario_id', 'tabla')
+    )
+
+
+def downgrade():
+    op.drop_table('versiones_datos')
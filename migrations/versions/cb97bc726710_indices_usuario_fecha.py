@@ -0,0 +1,38 @@
+"""indices compuestos para consultas por usuario y fecha
+
+Revision ID: cb97bc726710
+Revises: 
+Create Date: 2026-10-17 19:52:26.681238
+
+Las bases creadas con ``db.create_all()`` antes de esta revisión ya tienen
+todas las tablas; esta migración solo añade los índices.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb97bc726710'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_ingresos_usuario_fecha', 'ingresos',
+                    ['usuario_id', sa.text('fecha DESC')],
+                    postgresql_include=['monto', 'categoria'])
+    op.create_index('ix_egresos_usuario_fecha', 'egresos',
+                    ['usuario_id', sa.text('fecha DESC')],
+                    postgresql_include=['monto', 'categoria'])
+    op.create_index('ix_recordatorios_enviado_fecha', 'recordatorios',
+                    ['enviado', 'fecha_recordatorio'])
+    op.create_index('ix_deudas_fijas_estado_dia', 'deudas_fijas',
+                    ['activa', 'pagada_este_mes', 'dia_pago'])
+
+
+def downgrade():
+    op.drop_index('ix_deudas_fijas_estado_dia', table_name='deudas_fijas')
+    op.drop_index('ix_recordatorios_enviado_fecha', table_name='recordatorios')
+    op.drop_index('ix_egresos_usuario_fecha', table_name='egresos')
+    op.drop_index('ix_ingresos_usuario_fecha', table_name='ingresos')
@@ -0,0 +1,45 @@
+"""financiamiento y amortizacion de deudas
+
+Revision ID: f1d4f9b024bf
+Revises: 9e498127b8b1
+Create Date: 2026-10-17 20:15:41.545627
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1d4f9b024bf'
+down_revision = '9e498127b8b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.add_column(sa.Column('saldo_pendiente', sa.Numeric(precision=12, scale=2), nullable=True))
+        batch_op.add_column(sa.Column('tasa_interes', sa.Numeric(precision=6, scale=3), nullable=True))
+        batch_op.add_column(sa.Column('pago_minimo', sa.Numeric(precision=10, scale=2), nullable=True))
+
+    op.create_table(
+        'amortizaciones_deuda',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('deuda_id', sa.Integer(), nullable=False),
+        sa.Column('mes', sa.Integer(), nullable=False),
+        sa.Column('interes', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('pago', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('saldo', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['deuda_id'], ['deudas_fijas.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('deuda_id', 'mes', name='uq_amortizaciones_deuda_mes')
+    )
+
+
+def downgrade():
+    op.drop_table('amortizaciones_deuda')
+
+    with op.batch_alter_table('deudas_fijas') as batch_op:
+        batch_op.drop_column('pago_minimo')
+        batch_op.drop_column('tasa_interes')
+        batch_op.drop_column('saldo_pendiente')
@@ -0,0 +1,51 @@
+"""tabla de resumenes mensuales
+
+Revision ID: f4d4ae6d9941
+Revises: cb97bc726710
+Create Date: 2026-10-17 19:54:25.149405
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4d4ae6d9941'
+down_revision = 'cb97bc726710'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    resumenes = op.create_table(
+        'resumenes_mensuales',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('anio', sa.Integer(), nullable=False),
+        sa.Column('mes', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=10), nullable=False),
+        sa.Column('categoria', sa.String(length=100), nullable=False),
+        sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('usuario_id', 'anio', 'mes', 'tipo', 'categoria',
+                            name='uq_resumenes_mensuales_clave')
+    )
+
+    # Poblar los resúmenes con las transacciones existentes
+    columnas = ['usuario_id', 'anio', 'mes', 'tipo', 'categoria', 'total', 'cantidad']
+    for tipo, tabla in (('ingreso', 'ingresos'), ('egreso', 'egresos')):
+        origen = sa.table(tabla, sa.column('id'), sa.column('usuario_id'),
+                          sa.column('fecha'), sa.column('categoria'), sa.column('monto'))
+        anio = sa.extract('year', origen.c.fecha)
+        mes = sa.extract('month', origen.c.fecha)
+        agrupado = sa.select(
+            origen.c.usuario_id, anio, mes, sa.literal(tipo), origen.c.categoria,
+            sa.func.sum(origen.c.monto), sa.func.count(origen.c.id)
+        ).group_by(origen.c.usuario_id, anio, mes, origen.c.categoria)
+        op.execute(resumenes.insert().from_select(columnas, agrupado))
+
+
+def downgrade():
+    op.drop_table('resumenes_mensuales')
@@ -0,0 +1,33 @@
+"""registro de notificaciones de deudas
+
+Revision ID: fb8f2a285b45
+Revises: f4d4ae6d9941
+Create Date: 2026-10-17 20:00:22.431777
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fb8f2a285b45'
+down_revision = 'f4d4ae6d9941'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notificaciones_enviadas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('deuda_id', sa.Integer(), nullable=False),
+        sa.Column('periodo', sa.String(length=7), nullable=False),
+        sa.Column('fecha_envio', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['deuda_id'], ['deudas_fijas.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('deuda_id', 'periodo', name='uq_notificaciones_deuda_periodo')
+    )
+
+
+def downgrade():
+    op.drop_table('notificaciones_enviadas')
@@ -1,7 +1,8 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date, timedelta
 from database import db
+from utils import recurrencia
+from services import contrasenas
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -11,6 +12,8 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+    # Los tokens de la API llevan esta versión: al cambiarla dejan de ser válidos
+    version_tokens = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relaciones
     ingresos = db.relationship('Ingreso', backref='usuario', lazy=True, cascade='all, delete-orphan')
@@ -19,12 +22,15 @@ class User(UserMixin, db.Model):
     ahorros = db.relationship('Ahorro', backref='usuario', lazy=True, cascade='all, delete-orphan')
     recordatorios = db.relationship('Recordatorio', backref='usuario', lazy=True, cascade='all, delete-orphan')
     deudas_fijas = db.relationship('DeudaFija', backref='usuario', lazy=True, cascade='all, delete-orphan')
+    resumenes_mensuales = db.relationship('ResumenMensual', backref='usuario', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        """Cambia la contraseña y revoca los tokens de la API emitidos hasta ahora."""
+        self.password_hash = contrasenas.generar_hash(password)
+        self.version_tokens = (self.version_tokens or 0) + 1
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return contrasenas.verificar(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.email}>'
@@ -40,6 +46,12 @@ class Ingreso(db.Model):
     fecha = db.Column(db.Date, nullable=False, default=date.today)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Listados, rangos del dashboard y estadísticas filtran por usuario y fecha
+        db.Index('ix_ingresos_usuario_fecha', usuario_id, fecha.desc(),
+                 postgresql_include=['monto', 'categoria']),
+    )
+    
     def __repr__(self):
         return f'<Ingreso {self.monto} - {self.descripcion}>'
 
@@ -54,9 +66,36 @@ class Egreso(db.Model):
     fecha = db.Column(db.Date, nullable=False, default=date.today)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Listados, rangos del dashboard y estadísticas filtran por usuario y fecha
+        db.Index('ix_egresos_usuario_fecha', usuario_id, fecha.desc(),
+                 postgresql_include=['monto', 'categoria']),
+    )
+    
     def __repr__(self):
         return f'<Egreso {self.monto} - {self.descripcion}>'
 
+class ResumenMensual(db.Model):
+    """Totales de ingresos/egresos por usuario, mes y categoría."""
+    __tablename__ = 'resumenes_mensuales'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    anio = db.Column(db.Integer, nullable=False)
+    mes = db.Column(db.Integer, nullable=False)
+    tipo = db.Column(db.String(10), nullable=False)  # ingreso, egreso
+    categoria = db.Column(db.String(100), nullable=False)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('usuario_id', 'anio', 'mes', 'tipo', 'categoria',
+                            name='uq_resumenes_mensuales_clave'),
+    )
+    
+    def __repr__(self):
+        return f'<ResumenMensual {self.tipo} {self.anio}-{self.mes:02d} {self.categoria}>'
+
 class Meta(db.Model):
     __tablename__ = 'metas'
     
@@ -96,19 +135,36 @@ class Ahorro(db.Model):
         return f'<Ahorro {self.titulo}>'
 
 class TokenRecuperacion(db.Model):
+    """Token de recuperación de contraseña; solo se guarda su hash SHA-256."""
     __tablename__ = 'tokens_recuperacion'
     
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    token = db.Column(db.String(100), unique=True, nullable=False)
+    token_hash = db.Column(db.String(64), nullable=False)
     fecha_expiracion = db.Column(db.DateTime, nullable=False)
     usado = db.Column(db.Boolean, default=False)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
     usuario = db.relationship('User', backref='tokens_recuperacion')
     
+    __table_args__ = (
+        db.Index('ix_tokens_recuperacion_busqueda', token_hash, usado, fecha_expiracion),
+    )
+    
+    def __repr__(self):
+        return f'<TokenRecuperacion {self.usuario_id} {self.fecha_expiracion}>'
+
+class TokenApiRevocado(db.Model):
+    """Token de la API revocado antes de su expiración."""
+    __tablename__ = 'tokens_api_revocados'
+    
+    jti = db.Column(db.String(32), primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    fecha_expiracion = db.Column(db.DateTime, nullable=False, index=True)
+    fecha_revocacion = db.Column(db.DateTime, default=datetime.utcnow)
+    
     def __repr__(self):
-        return f'<TokenRecuperacion {self.token}>'
+        return f'<TokenApiRevocado {self.jti}>'
 
 class Recordatorio(db.Model):
     __tablename__ = 'recordatorios'
@@ -123,6 +179,10 @@ class Recordatorio(db.Model):
     enviado = db.Column(db.Boolean, default=False)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_recordatorios_enviado_fecha', enviado, fecha_recordatorio),
+    )
+    
     def __repr__(self):
         return f'<Recordatorio {self.titulo}>'
 
@@ -136,34 +196,145 @@ class DeudaFija(db.Model):
     monto = db.Column(db.Numeric(10, 2), nullable=False)
     fecha_pago = db.Column(db.Date, nullable=False)  # Fecha de pago mensual
     dia_pago = db.Column(db.Integer, nullable=False)  # Día del mes (1-31)
+    proxima_fecha_pago = db.Column(db.Date, nullable=False)  # Próximo vencimiento (>= hoy)
     activa = db.Column(db.Boolean, default=True)
-    pagada_este_mes = db.Column(db.Boolean, default=False)
     fecha_ultimo_pago = db.Column(db.Date)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Datos de financiamiento (opcionales) para las proyecciones de pago
+    saldo_pendiente = db.Column(db.Numeric(12, 2))
+    tasa_interes = db.Column(db.Numeric(6, 3))  # Tasa anual en %
+    pago_minimo = db.Column(db.Numeric(10, 2))  # Si falta, se usa el monto
+    
+    __table_args__ = (
+        db.Index('ix_deudas_fijas_activa_proxima', activa, proxima_fecha_pago),
+        db.Index('ix_deudas_fijas_usuario_proxima', usuario_id, proxima_fecha_pago),
+    )
+    
     # La relación 'usuario' se crea automáticamente a través del backref en User
+    notificaciones = db.relationship('NotificacionEnviada', backref='deuda', lazy=True,
+                                     cascade='all, delete-orphan')
+    amortizacion = db.relationship('AmortizacionDeuda', backref='deuda', lazy=True,
+                                   cascade='all, delete-orphan',
+                                   order_by='AmortizacionDeuda.mes')
+    pagos = db.relationship('PagoDeuda', backref='deuda', lazy='dynamic',
+                            cascade='all, delete-orphan',
+                            order_by='PagoDeuda.periodo.desc()')
+    
+    def programar_pago(self, hoy=None):
+        """Calcula el próximo vencimiento a partir del día de pago."""
+        self.proxima_fecha_pago = recurrencia.proxima_fecha_pago(self.dia_pago, hoy or date.today())
+        return self.proxima_fecha_pago
+    
+    def fecha_proximo_pago(self, hoy=None):
+        """
+        Próximo vencimiento: el guardado o, si ya pasó y la tarea diaria aún
+        no lo actualizó, el siguiente según el día de pago.
+        """
+        hoy = hoy or date.today()
+        if self.proxima_fecha_pago and self.proxima_fecha_pago >= hoy:
+            return self.proxima_fecha_pago
+        return recurrencia.proxima_fecha_pago(self.dia_pago, hoy)
+    
+    def periodo_cuota(self, hoy=None):
+        """Período (YYYY-MM) de la cuota del próximo vencimiento, con el que se registra su pago."""
+        return self.fecha_proximo_pago(hoy).strftime('%Y-%m')
+    
+    def cuota_pagada(self, hoy=None):
+        """Verifica si la cuota del próximo vencimiento ya tiene su pago registrado."""
+        return db.session.query(
+            PagoDeuda.query.filter_by(deuda_id=self.id, periodo=self.periodo_cuota(hoy)).exists()
+        ).scalar()
     
     def necesita_pago(self):
-        """Verifica si la deuda necesita pago este mes."""
+        """Verifica si la próxima cuota vence en 2 días o menos sin estar pagada."""
         hoy = date.today()
-        # Si ya está pagada este mes, no necesita pago
-        if self.pagada_este_mes and self.fecha_ultimo_pago:
-            if self.fecha_ultimo_pago.year == hoy.year and self.fecha_ultimo_pago.month == hoy.month:
-                return False
-        
-        # Calcular fecha de pago del mes actual
-        fecha_pago_mes = date(hoy.year, hoy.month, min(self.dia_pago, 28))
-        if fecha_pago_mes < hoy:
-            # Si ya pasó, usar el próximo mes
-            if hoy.month == 12:
-                fecha_pago_mes = date(hoy.year + 1, 1, min(self.dia_pago, 28))
-            else:
-                fecha_pago_mes = date(hoy.year, hoy.month + 1, min(self.dia_pago, 28))
+        # Si la próxima cuota ya está pagada (aunque sea antes de su mes), no necesita pago
+        if self.cuota_pagada(hoy):
+            return False
         
         # Verificar si faltan 2 días o menos
-        dias_restantes = (fecha_pago_mes - hoy).days
-        return 0 <= dias_restantes <= 2 and not self.pagada_este_mes
+        dias_restantes = (self.fecha_proximo_pago(hoy) - hoy).days
+        return 0 <= dias_restantes <= 2
     
     def __repr__(self):
         return f'<DeudaFija {self.titulo}>'
 
+class AmortizacionDeuda(db.Model):
+    """Fila del plan de pagos precalculado de una deuda (pagando su mínimo)."""
+    __tablename__ = 'amortizaciones_deuda'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    deuda_id = db.Column(db.Integer, db.ForeignKey('deudas_fijas.id'), nullable=False)
+    mes = db.Column(db.Integer, nullable=False)  # 1 = próximo pago
+    interes = db.Column(db.Numeric(12, 2), nullable=False)
+    pago = db.Column(db.Numeric(12, 2), nullable=False)
+    saldo = db.Column(db.Numeric(14, 2), nullable=False)  # Saldo tras el pago
+    
+    __table_args__ = (
+        db.UniqueConstraint('deuda_id', 'mes', name='uq_amortizaciones_deuda_mes'),
+    )
+    
+    def __repr__(self):
+        return f'<AmortizacionDeuda {self.deuda_id} mes {self.mes}>'
+
+class PagoDeuda(db.Model):
+    """Pago mensual de una deuda fija; como máximo uno por período (YYYY-MM)."""
+    __tablename__ = 'pagos_deuda'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    deuda_id = db.Column(db.Integer, db.ForeignKey('deudas_fijas.id'), nullable=False)
+    periodo = db.Column(db.String(7), nullable=False)
+    egreso_id = db.Column(db.Integer, db.ForeignKey('egresos.id', ondelete='SET NULL'))
+    monto = db.Column(db.Numeric(10, 2), nullable=False)
+    fecha = db.Column(db.Date, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('deuda_id', 'periodo', name='uq_pagos_deuda_periodo'),
+    )
+    
+    egreso = db.relationship('Egreso', backref=db.backref('pago_deuda', uselist=False))
+    
+    def __repr__(self):
+        return f'<PagoDeuda {self.deuda_id} {self.periodo}>'
+
+class NotificacionEnviada(db.Model):
+    """Aviso de vencimiento ya enviado para una deuda en un período (YYYY-MM)."""
+    __tablename__ = 'notificaciones_enviadas'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    deuda_id = db.Column(db.Integer, db.ForeignKey('deudas_fijas.id'), nullable=False)
+    periodo = db.Column(db.String(7), nullable=False)
+    fecha_envio = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('deuda_id', 'periodo', name='uq_notificaciones_deuda_periodo'),
+    )
+    
+    def __repr__(self):
+        return f'<NotificacionEnviada {self.deuda_id} {self.periodo}>'
+
+class BloqueoTarea(db.Model):
+    """Lease de una tarea programada compartida entre varios procesos."""
+    __tablename__ = 'bloqueos_tareas'
+    
+    nombre = db.Column(db.String(100), primary_key=True)
+    propietario = db.Column(db.String(100))
+    expira = db.Column(db.DateTime, nullable=False)
+    ultimo_periodo = db.Column(db.String(20))  # Último período completado
+    
+    def __repr__(self):
+        return f'<BloqueoTarea {self.nombre} {self.propietario}>'
+
+class VersionDatos(db.Model):
+    """Versión de una tabla de un usuario, que cambia con cada commit que la modifica."""
+    __tablename__ = 'versiones_datos'
+    
+    # Sin clave foránea: la versión se escribe en el mismo commit que crea o borra al usuario
+    usuario_id = db.Column(db.Integer, primary_key=True)
+    tabla = db.Column(db.String(50), primary_key=True)  # '*' = cualquier tabla
+    version = db.Column(db.Integer, nullable=False, default=0)
+    fecha_modificacion = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<VersionDatos {self.usuario_id} {self.tabla} v{self.version}>'
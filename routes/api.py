@@ -1,9 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
-from models import Ingreso, Egreso, Meta, Ahorro, Recordatorio
+from models import User, Ingreso, Egreso, Meta, Ahorro, Recordatorio, DeudaFija, AmortizacionDeuda
 from database import db
-from datetime import datetime
+from datetime import datetime, date
 from functools import wraps
+import codecs
+import csv
+from itertools import islice
+from services.transacciones_service import TransaccionesService
+from services.dashboard_service import DashboardService
+from services.validators import ValidationError
+from services.paginacion import paginar_por_cursor
+from services.exportacion_service import ExportacionService, FORMATOS
+from services.estrategias_service import EstrategiasService, POLITICAS
+from services.deudas_service import DeudasService
+from services.tokens_api import token_de_peticion
+from services import contrasenas
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -20,36 +32,162 @@ def json_response(func):
             return jsonify({'error': str(e)}), 400
     return wrapper
 
+def respuesta_en_cache(recurso, tablas):
+    """
+    Decorador que guarda la respuesta JSON en la caché por usuario.
+    
+    La respuesta lleva un ETag derivado de la versión de las tablas del
+    usuario de las que depende; si el cliente envía ese ETag en If-None-Match
+    se responde 304 sin ejecutar la vista. La clave incluye la fecha y los
+    parámetros de la petición.
+    """
+    def decorador(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions['cache_usuarios']
+            clave = cache.clave(current_user.id, recurso, [
+                date.today().isoformat(), sorted(request.args.items(multi=True)), kwargs
+            ], tablas)
+            etag = cache.etag(clave)
+            
+            if etag in request.if_none_match:
+                respuesta = Response(status=304)
+            else:
+                cuerpo = cache.obtener(clave)
+                if cuerpo is None:
+                    resultado = func(*args, **kwargs)
+                    respuesta, estado = resultado if isinstance(resultado, tuple) else (resultado, 200)
+                    if estado != 200:
+                        return resultado
+                    cuerpo = respuesta.get_data(as_text=True)
+                    cache.guardar(clave, cuerpo)
+                respuesta = Response(cuerpo, mimetype='application/json')
+            
+            respuesta.set_etag(etag)
+            respuesta.headers['Cache-Control'] = 'private, no-cache'
+            return respuesta
+        return wrapper
+    return decorador
+
+def listar_paginado(modelo, clave, serializar):
+    """
+    Devuelve una página de `modelo` del usuario actual paginada por cursor.
+    
+    Parámetros de query: ``cursor``, ``limit`` y ``total`` (``true`` para
+    incluir el conteo total, que requiere una consulta adicional).
+    """
+    limite = request.args.get('limit', current_app.config['API_ITEMS_PER_PAGE'], type=int)
+    limite = max(1, min(limite, current_app.config['API_MAX_ITEMS_PER_PAGE']))
+    
+    pagina = paginar_por_cursor(
+        modelo.query.filter_by(usuario_id=current_user.id),
+        modelo,
+        request.args.get('cursor'),
+        limite=limite
+    )
+    
+    respuesta = {
+        clave: [serializar(item) for item in pagina.items],
+        'next_cursor': pagina.next_cursor
+    }
+    if request.args.get('total', 'false').lower() == 'true':
+        respuesta['total'] = pagina.total
+    return respuesta
+
+def serializar_transaccion(t):
+    return {
+        'id': t.id,
+        'monto': float(t.monto),
+        'descripcion': t.descripcion,
+        'categoria': t.categoria,
+        'fecha': t.fecha.isoformat()
+    }
+
+def exportar_transacciones(tipos, nombre):
+    """
+    Respuesta en streaming con las transacciones del usuario actual.
+    
+    Parámetros de query: ``formato`` (``ndjson`` o ``csv``), ``desde``,
+    ``hasta`` (YYYY-MM-DD, inclusive) y ``categoria``.
+    """
+    formato = request.args.get('formato', 'ndjson').lower()
+    try:
+        desde, hasta = ExportacionService.validar_filtros(
+            formato, request.args.get('desde'), request.args.get('hasta')
+        )
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    fragmentos = ExportacionService.exportar(
+        current_user.id, tipos, formato,
+        desde=desde, hasta=hasta,
+        categoria=request.args.get('categoria')
+    )
+    return Response(
+        stream_with_context(fragmentos),
+        mimetype=FORMATOS[formato],
+        headers={'Content-Disposition': f'attachment; filename={nombre}.{formato}'}
+    )
+
+# ========== TOKENS ==========
+@api_bp.before_request
+def rechazar_token_invalido():
+    """Responde 401 si la petición trae un token Bearer inválido, expirado o revocado."""
+    if token_de_peticion(request) is not None and not current_user.is_authenticated:
+        return jsonify({'error': 'Token inválido o expirado'}), 401
+
+@api_bp.route('/tokens', methods=['POST'])
+def crear_token():
+    data = request.get_json(silent=True) or {}
+    usuario = User.query.filter_by(email=data.get('email')).first()
+    if not contrasenas.autenticar(usuario, data.get('password') or ''):
+        return jsonify({'error': 'Email o contraseña incorrectos'}), 401
+    
+    token, expira = current_app.extensions['tokens_api'].generar(usuario.id, usuario.version_tokens)
+    return jsonify({'token': token, 'expira': expira.isoformat()}), 201
+
+@api_bp.route('/tokens', methods=['DELETE'])
+@login_required
+def revocar_token():
+    token = token_de_peticion(request)
+    if token is None:
+        return jsonify({'error': 'La petición no usa un token Bearer'}), 400
+    current_app.extensions['tokens_api'].revocar(token)
+    return jsonify({'message': 'Token revocado exitosamente'})
+
+@api_bp.route('/tokens/todos', methods=['DELETE'])
+@login_required
+def revocar_todos_los_tokens():
+    # Solo con la sesión: un token robado no puede revocar los del usuario legítimo
+    if token_de_peticion(request) is not None:
+        return jsonify({'error': 'Revocar todos los tokens requiere la sesión iniciada'}), 403
+    current_app.extensions['tokens_api'].revocar_todos(current_user.id)
+    return jsonify({'message': 'Todos los tokens fueron revocados'})
+
 # ========== INGRESOS ==========
 @api_bp.route('/ingresos', methods=['GET'])
 @login_required
 @json_response
 def listar_ingresos():
-    ingresos = Ingreso.query.filter_by(usuario_id=current_user.id).all()
-    return {
-        'ingresos': [{
-            'id': i.id,
-            'monto': float(i.monto),
-            'descripcion': i.descripcion,
-            'categoria': i.categoria,
-            'fecha': i.fecha.isoformat()
-        } for i in ingresos]
-    }
+    return listar_paginado(Ingreso, 'ingresos', serializar_transaccion)
+
+@api_bp.route('/ingresos/export', methods=['GET'])
+@login_required
+def exportar_ingresos():
+    return exportar_transacciones(['ingreso'], 'ingresos')
 
 @api_bp.route('/ingresos', methods=['POST'])
 @login_required
 @json_response
 def crear_ingreso():
     data = request.get_json()
-    ingreso = Ingreso(
-        usuario_id=current_user.id,
-        monto=float(data['monto']),
-        descripcion=data['descripcion'],
-        categoria=data['categoria'],
-        fecha=datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+    ingreso = TransaccionesService.crear_ingreso(
+        current_user.id,
+        str(data['monto']),
+        data['descripcion'],
+        data['categoria'],
+        data['fecha']
     )
-    db.session.add(ingreso)
-    db.session.commit()
     return {'message': 'Ingreso creado exitosamente', 'id': ingreso.id}
 
 @api_bp.route('/ingresos/<int:id>', methods=['GET'])
@@ -74,13 +212,17 @@ def actualizar_ingreso(id):
         return jsonify({'error': 'No autorizado'}), 403
     
     data = request.get_json()
-    ingreso.monto = float(data.get('monto', ingreso.monto))
-    ingreso.descripcion = data.get('descripcion', ingreso.descripcion)
-    ingreso.categoria = data.get('categoria', ingreso.categoria)
-    if 'fecha' in data:
-        ingreso.fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
-    
-    db.session.commit()
+    try:
+        TransaccionesService.actualizar_ingreso(
+            ingreso,
+            monto=str(data['monto']) if 'monto' in data else None,
+            descripcion=data.get('descripcion'),
+            categoria=data.get('categoria'),
+            fecha=data.get('fecha')
+        )
+    except ValidationError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     return jsonify({'message': 'Ingreso actualizado exitosamente'})
 
 @api_bp.route('/ingresos/<int:id>', methods=['DELETE'])
@@ -90,8 +232,7 @@ def eliminar_ingreso(id):
     if ingreso.usuario_id != current_user.id:
         return jsonify({'error': 'No autorizado'}), 403
     
-    db.session.delete(ingreso)
-    db.session.commit()
+    TransaccionesService.eliminar_ingreso(ingreso)
     return jsonify({'message': 'Ingreso eliminado exitosamente'})
 
 # ========== EGRESOS ==========
@@ -99,31 +240,25 @@ def eliminar_ingreso(id):
 @login_required
 @json_response
 def listar_egresos():
-    egresos = Egreso.query.filter_by(usuario_id=current_user.id).all()
-    return {
-        'egresos': [{
-            'id': e.id,
-            'monto': float(e.monto),
-            'descripcion': e.descripcion,
-            'categoria': e.categoria,
-            'fecha': e.fecha.isoformat()
-        } for e in egresos]
-    }
+    return listar_paginado(Egreso, 'egresos', serializar_transaccion)
+
+@api_bp.route('/egresos/export', methods=['GET'])
+@login_required
+def exportar_egresos():
+    return exportar_transacciones(['egreso'], 'egresos')
 
 @api_bp.route('/egresos', methods=['POST'])
 @login_required
 @json_response
 def crear_egreso():
     data = request.get_json()
-    egreso = Egreso(
-        usuario_id=current_user.id,
-        monto=float(data['monto']),
-        descripcion=data['descripcion'],
-        categoria=data['categoria'],
-        fecha=datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+    egreso = TransaccionesService.crear_egreso(
+        current_user.id,
+        str(data['monto']),
+        data['descripcion'],
+        data['categoria'],
+        data['fecha']
     )
-    db.session.add(egreso)
-    db.session.commit()
     return {'message': 'Egreso creado exitosamente', 'id': egreso.id}
 
 @api_bp.route('/egresos/<int:id>', methods=['GET'])
@@ -148,13 +283,17 @@ def actualizar_egreso(id):
         return jsonify({'error': 'No autorizado'}), 403
     
     data = request.get_json()
-    egreso.monto = float(data.get('monto', egreso.monto))
-    egreso.descripcion = data.get('descripcion', egreso.descripcion)
-    egreso.categoria = data.get('categoria', egreso.categoria)
-    if 'fecha' in data:
-        egreso.fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
-    
-    db.session.commit()
+    try:
+        TransaccionesService.actualizar_egreso(
+            egreso,
+            monto=str(data['monto']) if 'monto' in data else None,
+            descripcion=data.get('descripcion'),
+            categoria=data.get('categoria'),
+            fecha=data.get('fecha')
+        )
+    except ValidationError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     return jsonify({'message': 'Egreso actualizado exitosamente'})
 
 @api_bp.route('/egresos/<int:id>', methods=['DELETE'])
@@ -164,13 +303,78 @@ def eliminar_egreso(id):
     if egreso.usuario_id != current_user.id:
         return jsonify({'error': 'No autorizado'}), 403
     
-    db.session.delete(egreso)
-    db.session.commit()
+    TransaccionesService.eliminar_egreso(egreso)
     return jsonify({'message': 'Egreso eliminado exitosamente'})
 
+# ========== TRANSACCIONES ==========
+@api_bp.route('/transacciones/export', methods=['GET'])
+@login_required
+def exportar_todas_transacciones():
+    return exportar_transacciones(['ingreso', 'egreso'], 'transacciones')
+
+def lineas_utf8(flujo, tamano_bloque=64 * 1024):
+    """
+    Líneas de texto de un flujo binario UTF-8 (con o sin BOM), leído por bloques.
+    
+    No usa ``io.TextIOWrapper``: el ``SpooledTemporaryFile`` de las subidas no
+    lo admite en Python < 3.11. Solo se corta en los saltos de línea LF, como espera ``csv``.
+    
+    Raises:
+        UnicodeDecodeError: Si el contenido no es UTF-8 válido
+    """
+    decodificador = codecs.getincrementaldecoder('utf-8-sig')()
+    pendiente = ''
+    for bloque in iter(lambda: flujo.read(tamano_bloque), b''):
+        *lineas, pendiente = (pendiente + decodificador.decode(bloque)).split('\n')
+        for linea in lineas:
+            yield linea + '\n'
+    pendiente += decodificador.decode(b'', final=True)
+    if pendiente:
+        yield pendiente
+
+@api_bp.route('/transacciones/bulk', methods=['POST'])
+@login_required
+def importar_transacciones():
+    """
+    Importa transacciones en lote desde un array JSON o un CSV.
+    
+    El CSV puede enviarse como archivo ``archivo`` (multipart) o como cuerpo
+    ``text/csv``, con columnas tipo, fecha, monto, categoria y descripcion.
+    """
+    max_filas = current_app.config['IMPORTACION_MAX_FILAS']
+    if 'archivo' in request.files or request.mimetype == 'text/csv':
+        flujo = request.files['archivo'].stream if 'archivo' in request.files else request.stream
+        texto = lineas_utf8(flujo)
+        # Basta leer una fila de más para saber si se supera el máximo
+        try:
+            filas = list(islice(csv.DictReader(texto), max_filas + 1))
+        except (UnicodeDecodeError, csv.Error) as e:
+            return jsonify({'error': f'CSV inválido: {e}'}), 400
+    else:
+        data = request.get_json(silent=True)
+        filas = data.get('transacciones') if isinstance(data, dict) else data
+        if not isinstance(filas, list):
+            return jsonify({'error': 'Se esperaba una lista de transacciones'}), 400
+    
+    if len(filas) > max_filas:
+        return jsonify({'error': f'Máximo {max_filas} transacciones por importación'}), 400
+    
+    tipo_defecto = request.args.get('tipo')
+    if tipo_defecto not in (None, 'ingreso', 'egreso'):
+        return jsonify({'error': "El tipo debe ser 'ingreso' o 'egreso'"}), 400
+    
+    resultado = TransaccionesService.importar_lote(
+        current_user.id, filas,
+        tamano_lote=current_app.config['IMPORTACION_TAMANO_LOTE'],
+        tipo_defecto=tipo_defecto
+    )
+    codigo = 201 if resultado['creados'] else 400
+    return jsonify(resultado), codigo
+
 # ========== METAS ==========
 @api_bp.route('/metas', methods=['GET'])
 @login_required
+@respuesta_en_cache('metas', ('metas',))
 @json_response
 def listar_metas():
     metas = Meta.query.filter_by(usuario_id=current_user.id).all()
@@ -238,6 +442,7 @@ def eliminar_meta(id):
 # ========== AHORROS ==========
 @api_bp.route('/ahorros', methods=['GET'])
 @login_required
+@respuesta_en_cache('ahorros', ('ahorros',))
 @json_response
 def listar_ahorros():
     ahorros = Ahorro.query.filter_by(usuario_id=current_user.id).all()
@@ -308,6 +513,7 @@ def eliminar_ahorro(id):
 # ========== RECORDATORIOS ==========
 @api_bp.route('/recordatorios', methods=['GET'])
 @login_required
+@respuesta_en_cache('recordatorios', ('recordatorios',))
 @json_response
 def listar_recordatorios():
     recordatorios = Recordatorio.query.filter_by(usuario_id=current_user.id).all()
@@ -373,31 +579,131 @@ def eliminar_recordatorio(id):
 # ========== ESTADÍSTICAS ==========
 @api_bp.route('/estadisticas', methods=['GET'])
 @login_required
+@respuesta_en_cache('estadisticas', ('ingresos', 'egresos', 'resumenes_mensuales', 'metas'))
 @json_response
 def obtener_estadisticas():
-    from datetime import date, timedelta
-    from sqlalchemy import func
-    
-    hoy = date.today()
-    inicio_mes = date(hoy.year, hoy.month, 1)
-    
-    ingresos_mes = db.session.query(func.sum(Ingreso.monto)).filter(
-        Ingreso.usuario_id == current_user.id,
-        Ingreso.fecha >= inicio_mes
-    ).scalar() or 0
-    
-    egresos_mes = db.session.query(func.sum(Egreso.monto)).filter(
-        Egreso.usuario_id == current_user.id,
-        Egreso.fecha >= inicio_mes
-    ).scalar() or 0
-    
-    balance_mes = float(ingresos_mes) - float(egresos_mes)
+    resumen = DashboardService.obtener_resumen(current_user.id, num_meses=1)
     
     return {
-        'ingresos_mes': float(ingresos_mes),
-        'egresos_mes': float(egresos_mes),
-        'balance_mes': balance_mes,
+        'ingresos_mes': float(resumen.ingresos_mes),
+        'egresos_mes': float(resumen.egresos_mes),
+        'balance_mes': resumen.balance_mes,
         'total_metas': Meta.query.filter_by(usuario_id=current_user.id).count(),
         'metas_completadas': Meta.query.filter_by(usuario_id=current_user.id, completada=True).count()
     }
 
+# ========== DEUDAS ==========
+def _decimal_o_none(valor):
+    return float(valor) if valor is not None else None
+
+@api_bp.route('/deudas', methods=['GET'])
+@login_required
+@json_response
+def listar_deudas():
+    """Deudas fijas del usuario con la proyección de su plan de pagos."""
+    activas = request.args.get('activas', 'true').lower() == 'true'
+    deudas = DeudaFija.query.filter_by(usuario_id=current_user.id, activa=activas)\
+        .order_by(DeudaFija.proxima_fecha_pago.asc(), DeudaFija.id.asc()).all()
+    proyecciones = DeudasService.proyecciones(d.id for d in deudas)
+    hoy = date.today()
+    pagadas = DeudasService.cuotas_pagadas(deudas, hoy)
+    return {
+        'deudas': [{
+            'id': d.id,
+            'titulo': d.titulo,
+            'monto': float(d.monto),
+            'dia_pago': d.dia_pago,
+            'proxima_fecha_pago': d.fecha_proximo_pago(hoy).isoformat(),
+            'pagada_este_mes': d.id in pagadas,
+            'saldo_pendiente': _decimal_o_none(d.saldo_pendiente),
+            'tasa_interes': _decimal_o_none(d.tasa_interes),
+            'pago_minimo': _decimal_o_none(d.pago_minimo),
+            'proyeccion': proyecciones.get(d.id)
+        } for d in deudas]
+    }
+
+@api_bp.route('/deudas/<int:id>/amortizacion', methods=['GET'])
+@login_required
+def obtener_amortizacion(id):
+    """Plan de pagos precalculado de una deuda."""
+    deuda = DeudaFija.query.get_or_404(id)
+    if deuda.usuario_id != current_user.id:
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    filas = AmortizacionDeuda.query.filter_by(deuda_id=deuda.id)\
+        .order_by(AmortizacionDeuda.mes).all()
+    return jsonify({
+        'deuda_id': deuda.id,
+        'amortizacion': [{
+            'mes': f.mes,
+            'interes': float(f.interes),
+            'pago': float(f.pago),
+            'saldo': float(f.saldo)
+        } for f in filas]
+    })
+
+@api_bp.route('/deudas/<int:id>/pagos', methods=['GET'])
+@login_required
+def listar_pagos_deuda(id):
+    """Historial de pagos de una deuda, del más reciente al más antiguo."""
+    deuda = DeudaFija.query.get_or_404(id)
+    if deuda.usuario_id != current_user.id:
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    return jsonify({
+        'deuda_id': deuda.id,
+        'pagos': [{
+            'periodo': p.periodo,
+            'fecha': p.fecha.isoformat(),
+            'monto': float(p.monto),
+            'egreso_id': p.egreso_id
+        } for p in deuda.pagos]
+    })
+
+@api_bp.route('/deudas/pagos/resumen', methods=['GET'])
+@login_required
+@json_response
+def resumen_pagos_deudas():
+    """Pagos de deudas del usuario en un año (``?anio=``, por defecto el actual)."""
+    anio = request.args.get('anio', date.today().year, type=int)
+    return {'anio': anio, 'deudas': DeudasService.resumen_anual(current_user.id, anio)}
+
+# ========== ESTRATEGIAS ==========
+@api_bp.route('/estrategias/comparar', methods=['POST'])
+@login_required
+def comparar_estrategias():
+    """
+    Compara estrategias de pago sobre un portafolio de deudas.
+    
+    Cuerpo JSON: ``deudas``, ``estrategias`` (por defecto todas),
+    ``ordenes`` (listas de IDs) y ``pagos_extra`` (o un solo ``pago_extra``).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Se esperaba un objeto JSON'}), 400
+    
+    estrategias = data.get('estrategias', [p for p in POLITICAS if p != 'personalizada'])
+    ordenes = data.get('ordenes', [])
+    pagos_extra = data.get('pagos_extra', [data.get('pago_extra', 0)])
+    if not all(isinstance(v, list) for v in (estrategias, ordenes, pagos_extra)):
+        return jsonify({'error': 'estrategias, ordenes y pagos_extra deben ser listas'}), 400
+    
+    try:
+        deudas = EstrategiasService.validar_deudas(data.get('deudas'))
+        escenarios = EstrategiasService.construir_escenarios(estrategias, ordenes, pagos_extra)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    max_escenarios = current_app.config['ESTRATEGIAS_MAX_ESCENARIOS']
+    if not escenarios:
+        return jsonify({'error': 'No hay escenarios para comparar'}), 400
+    if len(escenarios) > max_escenarios:
+        return jsonify({'error': f'Máximo {max_escenarios} escenarios por comparación'}), 400
+    
+    filas = EstrategiasService.comparar(
+        deudas, escenarios,
+        procesos=current_app.config['ESTRATEGIAS_PROCESOS'],
+        modo=current_app.config['ESTRATEGIAS_MODO']
+    )
+    mejor = min(range(len(filas)), key=lambda i: (filas[i]['total_intereses'], filas[i]['meses']))
+    return jsonify({'escenarios': filas, 'mejor': mejor})
@@ -1,10 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from flask_mail import Message
-from models import User, TokenRecuperacion
+from models import User
 from database import db
-from datetime import datetime, timedelta
-import secrets
+from services import contrasenas
+from services.recuperacion_service import RecuperacionService
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -56,7 +56,7 @@ def login():
         
         usuario = User.query.filter_by(email=email).first()
         
-        if usuario and usuario.check_password(password):
+        if contrasenas.autenticar(usuario, password):
             login_user(usuario)
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('main.dashboard'))
@@ -80,20 +80,9 @@ def recuperar_contraseña():
         usuario = User.query.filter_by(email=email).first()
         
         if usuario:
-            # Generar token de recuperación
-            token = secrets.token_urlsafe(32)
-            fecha_expiracion = datetime.utcnow() + timedelta(hours=24)
-            
-            # Eliminar tokens anteriores del usuario
-            TokenRecuperacion.query.filter_by(usuario_id=usuario.id, usado=False).delete()
-            
-            token_rec = TokenRecuperacion(
-                usuario_id=usuario.id,
-                token=token,
-                fecha_expiracion=fecha_expiracion
-            )
-            db.session.add(token_rec)
-            db.session.commit()
+            # Generar token de recuperación (reemplaza los anteriores del usuario)
+            horas = current_app.config['TOKEN_EXPIRATION_HOURS']
+            token, _ = RecuperacionService.crear_token(usuario.id, horas)
             
             # Enviar email
             try:
@@ -105,11 +94,10 @@ def recuperar_contraseña():
                          f'Has solicitado recuperar tu contraseña. '
                          f'Para restablecer tu contraseña, haz clic en el siguiente enlace:\n\n'
                          f'{reset_url}\n\n'
-                         f'Este enlace expirará en 24 horas.\n\n'
+                         f'Este enlace expirará en {horas} horas.\n\n'
                          f'Si no solicitaste este cambio, ignora este mensaje.'
                 )
                 # Obtener mail desde current_app
-                from flask import current_app
                 mail = current_app.extensions.get('mail')
                 if mail:
                     mail.send(msg)
@@ -129,9 +117,9 @@ def resetear_contraseña(token):
     if current_user.is_authenticated:
         return redirect(url_for('main.dashboard'))
     
-    token_rec = TokenRecuperacion.query.filter_by(token=token, usado=False).first()
+    token_rec = RecuperacionService.buscar_token(token)
     
-    if not token_rec or token_rec.fecha_expiracion < datetime.utcnow():
+    if not token_rec:
         flash('El enlace de recuperación es inválido o ha expirado.', 'error')
         return redirect(url_for('auth.recuperar_contraseña'))
     
@@ -6,7 +6,10 @@ from flask_login import login_required, current_user
 from models import DeudaFija
 from database import db
 from datetime import datetime, date, timedelta
+from decimal import Decimal
 from services.validators import validate_monto, validate_texto, ValidationError
+from services.deudas_service import DeudasService
+from utils.recurrencia import proxima_fecha_pago
 
 deudas_bp = Blueprint('deudas', __name__)
 
@@ -18,34 +21,22 @@ def listar_deudas():
     deudas = DeudaFija.query.filter_by(
         usuario_id=current_user.id,
         activa=activas
-    ).order_by(DeudaFija.dia_pago.asc()).all()
+    ).order_by(DeudaFija.proxima_fecha_pago.asc(), DeudaFija.id.asc()).all()
     
-    # Actualizar estado de pagos mensuales
+    # Pagos de la próxima cuota de todas las deudas en una sola consulta
     hoy = date.today()
+    pagadas = DeudasService.cuotas_pagadas(deudas, hoy)
     deudas_con_info = []
     
     for deuda in deudas:
-        if deuda.pagada_este_mes and deuda.fecha_ultimo_pago:
-            # Si cambió el mes, resetear el estado de pago
-            if deuda.fecha_ultimo_pago.year != hoy.year or deuda.fecha_ultimo_pago.month != hoy.month:
-                deuda.pagada_este_mes = False
-                db.session.commit()
-        
-        # Calcular fecha de pago del mes actual
-        fecha_pago_mes = date(hoy.year, hoy.month, min(deuda.dia_pago, 28))
-        if fecha_pago_mes < hoy:
-            # Si ya pasó, usar el próximo mes
-            if hoy.month == 12:
-                fecha_pago_mes = date(hoy.year + 1, 1, min(deuda.dia_pago, 28))
-            else:
-                fecha_pago_mes = date(hoy.year, hoy.month + 1, min(deuda.dia_pago, 28))
-        
+        fecha_pago_mes = deuda.fecha_proximo_pago(hoy)
         dias_restantes = (fecha_pago_mes - hoy).days
         
         deudas_con_info.append({
             'deuda': deuda,
             'fecha_pago': fecha_pago_mes,
-            'dias_restantes': dias_restantes
+            'dias_restantes': dias_restantes,
+            'pagada': deuda.id in pagadas
         })
     
     return render_template('deudas/listar.html', deudas_con_info=deudas_con_info, activas=activas)
@@ -78,14 +69,7 @@ def nueva_deuda():
                 return render_template('deudas/nueva.html')
             
             # Calcular fecha de pago inicial
-            hoy = date.today()
-            fecha_pago = date(hoy.year, hoy.month, min(dia_pago_int, 28))
-            if fecha_pago < hoy:
-                # Si la fecha ya pasó, usar el próximo mes
-                if hoy.month == 12:
-                    fecha_pago = date(hoy.year + 1, 1, min(dia_pago_int, 28))
-                else:
-                    fecha_pago = date(hoy.year, hoy.month + 1, min(dia_pago_int, 28))
+            fecha_pago = proxima_fecha_pago(dia_pago_int, date.today())
             
             deuda = DeudaFija(
                 usuario_id=current_user.id,
@@ -94,14 +78,23 @@ def nueva_deuda():
                 monto=monto_decimal,
                 fecha_pago=fecha_pago,
                 dia_pago=dia_pago_int,
-                activa=True,
-                pagada_este_mes=False
+                proxima_fecha_pago=fecha_pago,
+                activa=True
             )
             
             db.session.add(deuda)
+            DeudasService.actualizar_financiamiento(
+                deuda,
+                request.form.get('saldo_pendiente'),
+                request.form.get('tasa_interes'),
+                request.form.get('pago_minimo')
+            )
             db.session.commit()
             flash('Deuda fija creada exitosamente.', 'success')
             return redirect(url_for('deudas.listar_deudas'))
+        except ValidationError as e:
+            flash(str(e), 'error')
+            db.session.rollback()
         except ValueError:
             flash('El día de pago debe ser un número válido.', 'error')
         except Exception as e:
@@ -121,22 +114,11 @@ def marcar_pagada(id):
         return redirect(url_for('deudas.listar_deudas'))
     
     try:
-        deuda.pagada_este_mes = True
-        deuda.fecha_ultimo_pago = date.today()
-        
-        # Crear un egreso automático cuando se marca como pagada
-        from models import Egreso
-        egreso = Egreso(
-            usuario_id=current_user.id,
-            monto=deuda.monto,
-            descripcion=f'Pago de deuda: {deuda.titulo}',
-            categoria='Deudas',
-            fecha=date.today()
-        )
-        db.session.add(egreso)
-        db.session.commit()
-        
+        # El egreso se crea junto con el pago, en la misma transacción
+        DeudasService.registrar_pago(deuda)
         flash(f'Deuda "{deuda.titulo}" marcada como pagada. Egreso registrado automáticamente.', 'success')
+    except ValidationError as e:
+        flash(str(e), 'warning')
     except Exception as e:
         flash(f'Error al marcar la deuda como pagada: {str(e)}', 'error')
         db.session.rollback()
@@ -154,15 +136,30 @@ def desmarcar_pagada(id):
         return redirect(url_for('deudas.listar_deudas'))
     
     try:
-        deuda.pagada_este_mes = False
-        db.session.commit()
-        flash(f'Deuda "{deuda.titulo}" desmarcada como pagada.', 'success')
+        if DeudasService.anular_pago(deuda):
+            flash(f'Deuda "{deuda.titulo}" desmarcada como pagada. Se eliminó su egreso.', 'success')
+        else:
+            flash(f'La deuda "{deuda.titulo}" no tiene un pago registrado este mes.', 'warning')
     except Exception as e:
         flash(f'Error: {str(e)}', 'error')
         db.session.rollback()
     
     return redirect(url_for('deudas.listar_deudas'))
 
+@deudas_bp.route('/deudas/<int:id>/pagos')
+@login_required
+def historial_pagos(id):
+    """Historial de pagos de una deuda fija."""
+    deuda = DeudaFija.query.get_or_404(id)
+    
+    if deuda.usuario_id != current_user.id:
+        flash('No tienes permiso para ver esta deuda.', 'error')
+        return redirect(url_for('deudas.listar_deudas'))
+    
+    pagos = deuda.pagos.all()
+    total = sum((pago.monto for pago in pagos), Decimal('0'))
+    return render_template('deudas/historial.html', deuda=deuda, pagos=pagos, total=total)
+
 @deudas_bp.route('/deudas/<int:id>/editar', methods=['GET', 'POST'])
 @login_required
 def editar_deuda(id):
@@ -185,22 +182,28 @@ def editar_deuda(id):
                 flash(error, 'error')
                 return render_template('deudas/editar.html', deuda=deuda)
             
+            # Sin pago mínimo propio, el plan de pagos depende del monto mensual
+            monto_cambio = deuda.monto != monto_decimal
             deuda.monto = monto_decimal
             deuda.dia_pago = int(dia_pago)
             
             # Actualizar fecha de pago
-            hoy = date.today()
-            fecha_pago = date(hoy.year, hoy.month, min(deuda.dia_pago, 28))
-            if fecha_pago < hoy:
-                if hoy.month == 12:
-                    fecha_pago = date(hoy.year + 1, 1, min(deuda.dia_pago, 28))
-                else:
-                    fecha_pago = date(hoy.year, hoy.month + 1, min(deuda.dia_pago, 28))
-            deuda.fecha_pago = fecha_pago
+            deuda.fecha_pago = deuda.programar_pago()
+            
+            DeudasService.actualizar_financiamiento(
+                deuda,
+                request.form.get('saldo_pendiente'),
+                request.form.get('tasa_interes'),
+                request.form.get('pago_minimo'),
+                recalcular=monto_cambio
+            )
             
             db.session.commit()
             flash('Deuda actualizada exitosamente.', 'success')
             return redirect(url_for('deudas.listar_deudas'))
+        except ValidationError as e:
+            flash(str(e), 'error')
+            db.session.rollback()
         except Exception as e:
             flash(f'Error al actualizar la deuda: {str(e)}', 'error')
             db.session.rollback()
@@ -2,18 +2,24 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 from flask_login import login_required, current_user
 from models import Ingreso, Egreso
 from database import db
-from datetime import datetime, date
+from services.transacciones_service import TransaccionesService
+from services.paginacion import paginar_por_cursor
+from services.validators import ValidationError
+from datetime import date
 
 transacciones_bp = Blueprint('transacciones', __name__)
 
 @transacciones_bp.route('/ingresos')
 @login_required
 def listar_ingresos():
-    page = request.args.get('page', 1, type=int)
-    ingresos = Ingreso.query.filter_by(usuario_id=current_user.id)\
-        .order_by(Ingreso.fecha.desc())\
-        .paginate(page=page, per_page=10, error_out=False)
-    return render_template('transacciones/ingresos.html', ingresos=ingresos)
+    consulta = Ingreso.query.filter_by(usuario_id=current_user.id)
+    cursor = request.args.get('cursor')
+    try:
+        ingresos = paginar_por_cursor(consulta, Ingreso, cursor, limite=10)
+    except ValidationError:
+        cursor = None
+        ingresos = paginar_por_cursor(consulta, Ingreso, limite=10)
+    return render_template('transacciones/ingresos.html', ingresos=ingresos, cursor=cursor)
 
 @transacciones_bp.route('/ingresos/nuevo', methods=['GET', 'POST'])
 @login_required
@@ -30,15 +36,8 @@ def nuevo_ingreso():
             return render_template('transacciones/nuevo_ingreso.html', fecha_actual=fecha_actual)
         
         try:
-            ingreso = Ingreso(
-                usuario_id=current_user.id,
-                monto=float(monto),
-                descripcion=descripcion,
-                categoria=categoria,
-                fecha=datetime.strptime(fecha, '%Y-%m-%d').date()
-            )
-            db.session.add(ingreso)
-            db.session.commit()
+            TransaccionesService.crear_ingreso(current_user.id, monto, descripcion,
+                                          categoria, fecha)
             flash('Ingreso registrado exitosamente.', 'success')
             return redirect(url_for('transacciones.listar_ingresos'))
         except Exception as e:
@@ -58,13 +57,14 @@ def editar_ingreso(id):
         return redirect(url_for('transacciones.listar_ingresos'))
     
     if request.method == 'POST':
-        ingreso.monto = float(request.form.get('monto'))
-        ingreso.descripcion = request.form.get('descripcion')
-        ingreso.categoria = request.form.get('categoria')
-        ingreso.fecha = datetime.strptime(request.form.get('fecha'), '%Y-%m-%d').date()
-        
         try:
-            db.session.commit()
+            TransaccionesService.actualizar_ingreso(
+                ingreso,
+                monto=request.form.get('monto'),
+                descripcion=request.form.get('descripcion'),
+                categoria=request.form.get('categoria'),
+                fecha=request.form.get('fecha')
+            )
             flash('Ingreso actualizado exitosamente.', 'success')
             return redirect(url_for('transacciones.listar_ingresos'))
         except Exception as e:
@@ -83,8 +83,7 @@ def eliminar_ingreso(id):
         return redirect(url_for('transacciones.listar_ingresos'))
     
     try:
-        db.session.delete(ingreso)
-        db.session.commit()
+        TransaccionesService.eliminar_ingreso(ingreso)
         flash('Ingreso eliminado exitosamente.', 'success')
     except Exception as e:
         flash(f'Error al eliminar el ingreso: {str(e)}', 'error')
@@ -95,11 +94,14 @@ def eliminar_ingreso(id):
 @transacciones_bp.route('/egresos')
 @login_required
 def listar_egresos():
-    page = request.args.get('page', 1, type=int)
-    egresos = Egreso.query.filter_by(usuario_id=current_user.id)\
-        .order_by(Egreso.fecha.desc())\
-        .paginate(page=page, per_page=10, error_out=False)
-    return render_template('transacciones/egresos.html', egresos=egresos)
+    consulta = Egreso.query.filter_by(usuario_id=current_user.id)
+    cursor = request.args.get('cursor')
+    try:
+        egresos = paginar_por_cursor(consulta, Egreso, cursor, limite=10)
+    except ValidationError:
+        cursor = None
+        egresos = paginar_por_cursor(consulta, Egreso, limite=10)
+    return render_template('transacciones/egresos.html', egresos=egresos, cursor=cursor)
 
 @transacciones_bp.route('/egresos/nuevo', methods=['GET', 'POST'])
 @login_required
@@ -116,15 +118,8 @@ def nuevo_egreso():
             return render_template('transacciones/nuevo_egreso.html', fecha_actual=fecha_actual)
         
         try:
-            egreso = Egreso(
-                usuario_id=current_user.id,
-                monto=float(monto),
-                descripcion=descripcion,
-                categoria=categoria,
-                fecha=datetime.strptime(fecha, '%Y-%m-%d').date()
-            )
-            db.session.add(egreso)
-            db.session.commit()
+            TransaccionesService.crear_egreso(current_user.id, monto, descripcion,
+                                          categoria, fecha)
             flash('Egreso registrado exitosamente.', 'success')
             return redirect(url_for('transacciones.listar_egresos'))
         except Exception as e:
@@ -144,13 +139,14 @@ def editar_egreso(id):
         return redirect(url_for('transacciones.listar_egresos'))
     
     if request.method == 'POST':
-        egreso.monto = float(request.form.get('monto'))
-        egreso.descripcion = request.form.get('descripcion')
-        egreso.categoria = request.form.get('categoria')
-        egreso.fecha = datetime.strptime(request.form.get('fecha'), '%Y-%m-%d').date()
-        
         try:
-            db.session.commit()
+            TransaccionesService.actualizar_egreso(
+                egreso,
+                monto=request.form.get('monto'),
+                descripcion=request.form.get('descripcion'),
+                categoria=request.form.get('categoria'),
+                fecha=request.form.get('fecha')
+            )
             flash('Egreso actualizado exitosamente.', 'success')
             return redirect(url_for('transacciones.listar_egresos'))
         except Exception as e:
@@ -169,8 +165,7 @@ def eliminar_egreso(id):
         return redirect(url_for('transacciones.listar_egresos'))
     
     try:
-        db.session.delete(egreso)
-        db.session.commit()
+        TransaccionesService.eliminar_egreso(egreso)
         flash('Egreso eliminado exitosamente.', 'success')
     except Exception as e:
         flash(f'Error al eliminar el egreso: {str(e)}', 'error')
@@ -0,0 +1,86 @@
+"""
+Servicio de bloqueos de tareas programadas.
+
+Cada tarea tiene una fila en ``bloqueos_tareas``; un proceso la toma con un
+UPDATE condicional (lease con vencimiento), de modo que, aunque varios
+workers disparen la misma tarea, solo uno la ejecuta en cada período.
+"""
+import os
+import socket
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models import BloqueoTarea
+
+
+def identificador_proceso() -> str:
+    """Identifica al proceso actual como propietario de bloqueos."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class BloqueoService:
+    """Servicio para coordinar tareas programadas entre procesos."""
+
+    @staticmethod
+    def adquirir(nombre: str, propietario: str, periodo: str,
+                 duracion_segundos: int = 3600) -> bool:
+        """
+        Intenta tomar el bloqueo de una tarea para un período.
+
+        Falla si otro proceso tiene un lease vigente o si la tarea ya se
+        completó en el mismo período.
+
+        Args:
+            nombre: Nombre de la tarea
+            propietario: Identificador del proceso
+            periodo: Período de la ejecución (por ejemplo, la fecha del día)
+            duracion_segundos: Vigencia del lease si el proceso muere
+
+        Returns:
+            True si el bloqueo quedó a nombre de `propietario`
+        """
+        ahora = datetime.utcnow()
+        expira = ahora + timedelta(seconds=duracion_segundos)
+
+        tomados = BloqueoTarea.query.filter(
+            BloqueoTarea.nombre == nombre,
+            BloqueoTarea.expira < ahora,
+            or_(BloqueoTarea.ultimo_periodo.is_(None),
+                BloqueoTarea.ultimo_periodo != periodo)
+        ).update({BloqueoTarea.propietario: propietario, BloqueoTarea.expira: expira},
+                 synchronize_session=False)
+        if tomados:
+            db.session.commit()
+            return True
+
+        if db.session.get(BloqueoTarea, nombre) is not None:
+            db.session.rollback()
+            return False
+
+        # Primera ejecución de la tarea: la fila se crea ya bloqueada
+        db.session.add(BloqueoTarea(nombre=nombre, propietario=propietario, expira=expira))
+        try:
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    @staticmethod
+    def completar(nombre: str, propietario: str, periodo: str) -> None:
+        """Libera el bloqueo y marca el período como ejecutado."""
+        BloqueoTarea.query.filter_by(nombre=nombre, propietario=propietario).update(
+            {BloqueoTarea.expira: datetime.utcnow(), BloqueoTarea.ultimo_periodo: periodo},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    @staticmethod
+    def liberar(nombre: str, propietario: str) -> None:
+        """Libera el bloqueo sin marcar el período, para que pueda reintentarse."""
+        db.session.rollback()
+        BloqueoTarea.query.filter_by(nombre=nombre, propietario=propietario).update(
+            {BloqueoTarea.expira: datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
@@ -0,0 +1,162 @@
+"""
+Cachés de resultados.
+
+``CacheLRU`` vive en la memoria del proceso: acotada por número de entradas
+(se descarta la usada hace más tiempo) y con vencimiento por TTL.
+``CacheRedis`` guarda los valores como JSON en un Redis compartido, de modo
+que todos los workers aprovechan los resultados de los demás; requiere el
+paquete opcional ``redis``.
+
+Ambas exponen ``obtener``, ``guardar``, ``eliminar`` y ``estadisticas``.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - Redis es opcional
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def clave_hash(*partes: Any) -> str:
+    """Hash estable de datos serializables a JSON (el orden de las claves no importa)."""
+    datos = json.dumps(partes, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+class CacheLRU:
+    """Caché en memoria con tamaño máximo y vencimiento por entrada."""
+
+    def __init__(self, max_entradas: int = 1024, ttl: float = 300):
+        self.max_entradas = max(1, max_entradas)
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """Devuelve el valor guardado o None si no existe o venció."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None:
+                vence, valor = entrada
+                if vence > time.monotonic():
+                    self._datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+                del self._datos[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None) -> None:
+        """Guarda un valor; si se supera el máximo, descarta el menos usado."""
+        vence = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (vence, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def eliminar(self, clave: str) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Contadores de aciertos y fallos y número de entradas."""
+        with self._lock:
+            return {'aciertos': self.aciertos, 'fallos': self.fallos,
+                    'entradas': len(self._datos)}
+
+
+class CacheRedis:
+    """
+    Caché compartida en Redis.
+
+    Las claves llevan el prefijo de la caché y vencen con el TTL de Redis;
+    el tamaño lo acota la política de memoria del servidor (``maxmemory``).
+    Los contadores son globales a todos los workers. Si Redis no responde,
+    la caché se comporta como vacía.
+    """
+
+    def __init__(self, url: str, prefijo: str, ttl: float = 300):
+        if redis is None:
+            raise RuntimeError('El paquete redis no está instalado')
+        self.cliente = redis.Redis.from_url(url)
+        self.prefijo = f'finanzas:{prefijo}:'
+        self.ttl = ttl
+
+    def _contar(self, campo: str) -> None:
+        try:
+            self.cliente.hincrby(f'{self.prefijo}estadisticas', campo, 1)
+        except redis.RedisError:
+            pass
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        try:
+            valor = self.cliente.get(self.prefijo + clave)
+        except redis.RedisError as e:
+            logger.warning(f'Error leyendo de Redis: {e}')
+            return None
+        self._contar('aciertos' if valor is not None else 'fallos')
+        return json.loads(valor) if valor is not None else None
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None) -> None:
+        segundos = max(1, int(self.ttl if ttl is None else ttl))
+        try:
+            self.cliente.set(self.prefijo + clave, json.dumps(valor), ex=segundos)
+        except redis.RedisError as e:
+            logger.warning(f'Error escribiendo en Redis: {e}')
+
+    def eliminar(self, clave: str) -> None:
+        try:
+            self.cliente.delete(self.prefijo + clave)
+        except redis.RedisError as e:
+            logger.warning(f'Error eliminando de Redis: {e}')
+
+    def limpiar(self) -> None:
+        try:
+            claves = list(self.cliente.scan_iter(match=f'{self.prefijo}*'))
+            if claves:
+                self.cliente.delete(*claves)
+        except redis.RedisError as e:
+            logger.warning(f'Error limpiando Redis: {e}')
+
+    def estadisticas(self) -> Dict[str, int]:
+        try:
+            datos = self.cliente.hgetall(f'{self.prefijo}estadisticas')
+        except redis.RedisError:
+            datos = {}
+        return {'aciertos': int(datos.get(b'aciertos', 0)),
+                'fallos': int(datos.get(b'fallos', 0))}
+
+
+def crear_cache(prefijo: str, max_entradas: int = 1024, ttl: float = 300,
+                url_redis: Optional[str] = None):
+    """
+    Crea una caché compartida si hay URL de Redis y, si no, una en memoria.
+
+    Args:
+        prefijo: Nombre de la caché (separa las claves en Redis)
+        max_entradas: Máximo de entradas de la caché en memoria
+        ttl: Segundos de vigencia de cada entrada
+        url_redis: URL de Redis (opcional)
+    """
+    if url_redis:
+        if redis is not None:
+            return CacheRedis(url_redis, prefijo, ttl)
+        logger.warning('CACHE_REDIS_URL configurada pero redis no está instalado; '
+                       'se usa caché en memoria')
+    return CacheLRU(max_entradas, ttl)
@@ -0,0 +1,168 @@
+"""
+Caché por usuario de las respuestas de lectura.
+
+Cada usuario tiene una versión por tabla (``ingresos``, ``metas``...) y una
+versión ``*`` que cambia con cualquier modificación, guardadas en la tabla
+``versiones_datos`` junto con el momento del cambio. Las versiones se
+incrementan dentro de la misma transacción que modifica las filas del
+usuario, así que todos los workers ven la versión nueva en cuanto el cambio
+es visible. Las versiones sirven de ETag (un cliente con la versión vigente
+recibe 304 sin ejecutar la vista) y forman parte de la clave de las
+respuestas cacheadas, que dejan de usarse al cambiar la versión y vencen por
+LRU o TTL sin borrarlas una a una.
+
+Guardar los cuerpos de las respuestas es opcional (``API_CACHE_RESPUESTAS``,
+activado por defecto solo con la caché compartida de Redis).
+
+Los cambios hechos con el ORM se detectan con eventos de la sesión; las
+operaciones masivas (``query.update()``, ``insert()``) y las filas sin
+``usuario_id`` deben llamar a ``marcar_modificado``.
+"""
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional, Sequence, Tuple
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import db, acumular
+from services.cache import clave_hash
+
+
+CLAVE_MODIFICADOS = 'usuarios_modificados'
+
+# Versión que cambia con cualquier modificación de los datos del usuario
+TODAS = '*'
+
+
+def marcar_modificado(usuario_id: int, tabla: str) -> None:
+    """Invalida la tabla del usuario cuando se confirme la transacción actual."""
+    db.session.info.setdefault(CLAVE_MODIFICADOS, set()).add((usuario_id, tabla))
+
+
+class CacheUsuario:
+    """Respuestas cacheadas por usuario con claves versionadas."""
+
+    def __init__(self, cache, guardar_respuestas: bool = True):
+        """
+        Args:
+            cache: Caché de las respuestas (``CacheLRU`` o ``CacheRedis``)
+            guardar_respuestas: Si es False solo se usan las versiones (ETag)
+        """
+        self.cache = cache
+        self.guardar_respuestas = guardar_respuestas
+
+    @staticmethod
+    def estado(usuario_id: int,
+               tablas: Optional[Sequence[str]] = None) -> Tuple[str, float]:
+        """
+        Versión combinada y momento del último cambio de las tablas indicadas.
+
+        Args:
+            usuario_id: ID del usuario
+            tablas: Tablas de las que depende la respuesta; None para todas.
+                Siempre se incluye ``users`` (nombre del usuario en las páginas).
+
+        Returns:
+            Tupla (versión, timestamp del último cambio; 0 si nunca cambió)
+        """
+        from models import VersionDatos
+
+        tablas = [TODAS] if tablas is None else sorted(set(tablas) | {'users'})
+        filas = {tabla: (version, fecha) for tabla, version, fecha in db.session.query(
+            VersionDatos.tabla, VersionDatos.version, VersionDatos.fecha_modificacion
+        ).filter(VersionDatos.usuario_id == usuario_id, VersionDatos.tabla.in_(tablas))}
+
+        versiones = [filas.get(tabla, (0, None)) for tabla in tablas]
+        fechas = [fecha for _, fecha in versiones if fecha is not None]
+        timestamp = max(fechas).replace(tzinfo=timezone.utc).timestamp() if fechas else 0.0
+        return '.'.join(str(version) for version, _ in versiones), timestamp
+
+    def version(self, usuario_id: int, tablas: Optional[Sequence[str]] = None) -> str:
+        return self.estado(usuario_id, tablas)[0]
+
+    @staticmethod
+    def invalidar(usuario_id: int, tablas: Iterable[str] = (), sesion=None) -> None:
+        """
+        Incrementa las versiones de las tablas indicadas y la global dentro de
+        la transacción actual (sin hacer commit).
+        """
+        from models import VersionDatos
+
+        ahora = datetime.utcnow()
+        for tabla in sorted(set(tablas) | {TODAS}):
+            acumular(VersionDatos, {'usuario_id': usuario_id, 'tabla': tabla},
+                     {'version': 1}, {'fecha_modificacion': ahora}, sesion=sesion)
+
+    def clave(self, usuario_id: int, recurso: str, parametros: Any = None,
+              tablas: Optional[Sequence[str]] = None) -> str:
+        """Clave de una respuesta para la versión vigente de sus tablas."""
+        version = self.version(usuario_id, tablas)
+        return f'{usuario_id}:{version}:{recurso}:{clave_hash(parametros)}'
+
+    @staticmethod
+    def etag(clave: str) -> str:
+        return clave_hash(clave)[:32]
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        return self.cache.obtener(clave) if self.guardar_respuestas else None
+
+    def guardar(self, clave: str, valor: Any) -> None:
+        if self.guardar_respuestas:
+            self.cache.guardar(clave, valor)
+
+    def estadisticas(self):
+        return self.cache.estadisticas()
+
+
+def _cambios(session: Session) -> Iterable[Tuple[int, str]]:
+    """Pares (usuario_id, tabla) de las filas nuevas, modificadas o eliminadas."""
+    from models import User
+
+    for objeto in list(session.new) + list(session.deleted) + [
+            o for o in session.dirty if session.is_modified(o)]:
+        usuario_id = objeto.id if isinstance(objeto, User) else getattr(objeto, 'usuario_id', None)
+        if usuario_id is not None:
+            yield usuario_id, objeto.__tablename__
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_cambios(session, contexto_flush):
+    cambios = set(_cambios(session))
+    if cambios:
+        session.info.setdefault(CLAVE_MODIFICADOS, set()).update(cambios)
+
+
+def _por_usuario(cambios: Iterable[Tuple[int, str]]) -> dict:
+    por_usuario = {}
+    for usuario_id, tabla in cambios:
+        por_usuario.setdefault(usuario_id, set()).add(tabla)
+    return por_usuario
+
+
+@event.listens_for(Session, 'before_commit')
+def _versionar_cambios(session):
+    # Se vacía la sesión antes para registrar también los cambios pendientes
+    session.flush()
+    cambios = session.info.get(CLAVE_MODIFICADOS)
+    if not cambios:
+        return
+    # Siempre en el mismo orden, para que dos commits no se bloqueen entre sí
+    for usuario_id, tablas in sorted(_por_usuario(cambios).items()):
+        CacheUsuario.invalidar(usuario_id, tablas, sesion=session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _olvidar_identidades(session):
+    cambios = session.info.pop(CLAVE_MODIFICADOS, None)
+    if not cambios or not has_app_context():
+        return
+    # Los demás workers renuevan su copia al vencer IDENTIDAD_CACHE_TTL
+    identidad = current_app.extensions.get('cache_identidad')
+    if identidad is not None:
+        for usuario_id, tabla in cambios:
+            if tabla == 'users':
+                identidad.olvidar(usuario_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_cambios(session):
+    session.info.pop(CLAVE_MODIFICADOS, None)
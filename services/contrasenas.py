@@ -0,0 +1,136 @@
+"""
+Hash y verificación de contraseñas.
+
+El método y el coste se configuran con ``PASSWORD_HASH_METODO`` (``scrypt`` o
+``pbkdf2:<algoritmo>``) y ``PASSWORD_HASH_ITERACIONES`` (coste N de scrypt o
+iteraciones de PBKDF2). Cada hash guarda los parámetros con los que se generó,
+así que al cambiarlos los hashes anteriores siguen siendo válidos y se
+regeneran con los nuevos en el siguiente inicio de sesión.
+
+Con ``PASSWORD_HILOS`` > 0 los hashes se calculan en un pool de hilos acotado
+(hashlib libera el GIL durante scrypt y PBKDF2): como mucho ``PASSWORD_HILOS``
+hashes a la vez y ``PASSWORD_COLA_MAX`` en espera. Si la cola está llena se
+lanza ``ContrasenasSaturadasError`` en lugar de bloquear la petición, de modo
+que un pico de inicios de sesión no ocupe todos los hilos de los workers.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+from database import db
+
+
+METODO_POR_DEFECTO = 'scrypt'
+ITERACIONES_POR_DEFECTO = {'scrypt': 32768, 'pbkdf2': 600000}
+
+
+class ContrasenasSaturadasError(Exception):
+    """Hay demasiados hashes de contraseña pendientes."""
+    pass
+
+
+def metodo_hash(metodo: str = METODO_POR_DEFECTO, iteraciones: Optional[int] = None) -> str:
+    """
+    Método completo de werkzeug, tal como queda guardado en el hash.
+
+    Args:
+        metodo: ``scrypt`` o ``pbkdf2[:algoritmo]``
+        iteraciones: Coste N de scrypt o iteraciones de PBKDF2 (None: por defecto)
+
+    Returns:
+        Método con sus parámetros, p. ej. ``scrypt:32768:8:1`` o ``pbkdf2:sha256:600000``
+
+    Raises:
+        ValueError: Si el método no es scrypt ni pbkdf2
+    """
+    nombre, _, algoritmo = metodo.partition(':')
+    if nombre not in ITERACIONES_POR_DEFECTO:
+        raise ValueError(f'Método de hash no soportado: {metodo}')
+    iteraciones = iteraciones or ITERACIONES_POR_DEFECTO[nombre]
+    if nombre == 'scrypt':
+        return f'scrypt:{iteraciones}:8:1'
+    return f'pbkdf2:{algoritmo or "sha256"}:{iteraciones}'
+
+
+def metodo_configurado() -> str:
+    """Método de hash de la configuración de la aplicación."""
+    if not has_app_context():
+        return metodo_hash()
+    config = current_app.config
+    return metodo_hash(config.get('PASSWORD_HASH_METODO', METODO_POR_DEFECTO),
+                       config.get('PASSWORD_HASH_ITERACIONES'))
+
+
+def necesita_rehash(password_hash: str) -> bool:
+    """Indica si el hash se generó con parámetros distintos de los configurados."""
+    return password_hash.split('$', 1)[0] != metodo_configurado()
+
+
+class VerificadorContrasenas:
+    """Pool de hilos acotado para calcular hashes de contraseñas."""
+
+    def __init__(self, hilos: int, max_pendientes: int):
+        """
+        Args:
+            hilos: Hashes calculados a la vez
+            max_pendientes: Hashes que pueden esperar turno
+        """
+        self.pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='contrasenas')
+        self._cupos = threading.BoundedSemaphore(hilos + max_pendientes)
+
+    def ejecutar(self, funcion: Callable, *args):
+        """
+        Ejecuta `funcion` en el pool y espera el resultado.
+
+        Raises:
+            ContrasenasSaturadasError: Si el pool y su cola están llenos
+        """
+        if not self._cupos.acquire(blocking=False):
+            raise ContrasenasSaturadasError('Demasiadas solicitudes de inicio de sesión; '
+                                            'intenta de nuevo en unos segundos')
+        try:
+            futuro = self.pool.submit(funcion, *args)
+        except BaseException:
+            self._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: self._cupos.release())
+        return futuro.result()
+
+
+def _ejecutar(funcion: Callable, *args):
+    verificador = current_app.extensions.get('verificador_contrasenas') if has_app_context() else None
+    if verificador is None:
+        return funcion(*args)
+    return verificador.ejecutar(funcion, *args)
+
+
+def generar_hash(password: str) -> str:
+    """Hash de la contraseña con el método configurado."""
+    return _ejecutar(generate_password_hash, password, metodo_configurado())
+
+
+def verificar(password_hash: str, password: str) -> bool:
+    """Comprueba una contraseña contra su hash."""
+    return _ejecutar(check_password_hash, password_hash, password)
+
+
+def autenticar(usuario, password: str) -> bool:
+    """
+    Verifica la contraseña del usuario y, si su hash usa parámetros
+    anteriores a los configurados, lo regenera y confirma el cambio.
+
+    Args:
+        usuario: Usuario (``User``) o None
+        password: Contraseña enviada
+
+    Returns:
+        True si la contraseña es correcta
+    """
+    if usuario is None or not usuario.check_password(password):
+        return False
+    if necesita_rehash(usuario.password_hash):
+        # Sin set_password: regenerar el hash no revoca los tokens de la API
+        usuario.password_hash = generar_hash(password)
+        db.session.commit()
+    return True
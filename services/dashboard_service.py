@@ -0,0 +1,116 @@
+"""
+Servicio del dashboard.
+
+Calcula los totales mensuales, el desglose por categoría y la serie de los
+últimos meses leyendo la tabla de resúmenes mensuales en una sola consulta.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from datetime import date
+from decimal import Decimal
+from services.resumen_service import ResumenMensualService
+
+
+@dataclass
+class TotalCategoria:
+    """Total acumulado de una categoría."""
+    categoria: str
+    total: Decimal
+
+
+@dataclass
+class ResumenDashboard:
+    """Resultado agregado que consume la vista del dashboard."""
+    ingresos_mes: Decimal = Decimal('0')
+    egresos_mes: Decimal = Decimal('0')
+    meses: List[str] = field(default_factory=list)
+    ingresos_grafico: List[float] = field(default_factory=list)
+    egresos_grafico: List[float] = field(default_factory=list)
+    ingresos_categoria: List[TotalCategoria] = field(default_factory=list)
+    egresos_categoria: List[TotalCategoria] = field(default_factory=list)
+
+    @property
+    def balance_mes(self) -> float:
+        return float(self.ingresos_mes) - float(self.egresos_mes)
+
+
+def sumar_meses(fecha: date, meses: int) -> date:
+    """
+    Devuelve el primer día del mes desplazado `meses` respecto a `fecha`.
+
+    Args:
+        fecha: Fecha de referencia
+        meses: Número de meses a desplazar (puede ser negativo)
+
+    Returns:
+        Primer día del mes resultante
+    """
+    indice = fecha.year * 12 + (fecha.month - 1) + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+class DashboardService:
+    """Servicio para calcular las estadísticas del dashboard."""
+
+    @staticmethod
+    def obtener_resumen(usuario_id: int, hoy: Optional[date] = None,
+                        num_meses: int = 6) -> ResumenDashboard:
+        """
+        Calcula el resumen del dashboard en un solo viaje a la base de datos.
+
+        Los totales "del mes" incluyen todo lo registrado a partir del
+        primer día del mes actual, igual que las consultas originales.
+
+        Args:
+            usuario_id: ID del usuario
+            hoy: Fecha de referencia (por defecto, hoy)
+            num_meses: Número de meses de la serie para los gráficos
+
+        Returns:
+            ResumenDashboard con totales, serie mensual y categorías
+        """
+        hoy = hoy or date.today()
+        inicio_mes = date(hoy.year, hoy.month, 1)
+        inicio_serie = sumar_meses(inicio_mes, -(num_meses - 1))
+
+        filas = ResumenMensualService.obtener_desde(usuario_id, inicio_serie)
+
+        return DashboardService._construir_resumen(filas, inicio_mes, num_meses)
+
+    @staticmethod
+    def _construir_resumen(filas, inicio_mes: date, num_meses: int) -> ResumenDashboard:
+        """
+        Construye el ResumenDashboard a partir de filas
+        (tipo, anio, mes, categoria, total).
+        """
+        clave_actual = (inicio_mes.year, inicio_mes.month)
+        por_mes: Dict[Tuple[str, int, int], Decimal] = {}
+        por_categoria: Dict[str, Dict[str, Decimal]] = {'ingreso': {}, 'egreso': {}}
+        totales_mes = {'ingreso': Decimal('0'), 'egreso': Decimal('0')}
+
+        for tipo, anio, mes, categoria, total in filas:
+            anio, mes = int(anio), int(mes)
+            total = Decimal(str(total or 0))
+            clave = (tipo, anio, mes)
+            por_mes[clave] = por_mes.get(clave, Decimal('0')) + total
+
+            if (anio, mes) >= clave_actual:
+                totales_mes[tipo] += total
+                categorias = por_categoria[tipo]
+                categorias[categoria] = categorias.get(categoria, Decimal('0')) + total
+
+        resumen = ResumenDashboard(
+            ingresos_mes=totales_mes['ingreso'],
+            egresos_mes=totales_mes['egreso'],
+            ingresos_categoria=[TotalCategoria(c, t) for c, t in por_categoria['ingreso'].items()],
+            egresos_categoria=[TotalCategoria(c, t) for c, t in por_categoria['egreso'].items()]
+        )
+
+        for i in range(num_meses - 1, -1, -1):
+            mes_fecha = sumar_meses(inicio_mes, -i)
+            clave = (mes_fecha.year, mes_fecha.month)
+            resumen.meses.append(mes_fecha.strftime('%b %Y'))
+            resumen.ingresos_grafico.append(float(por_mes.get(('ingreso',) + clave, 0)))
+            resumen.egresos_grafico.append(float(por_mes.get(('egreso',) + clave, 0)))
+
+        return resumen
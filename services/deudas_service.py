@@ -0,0 +1,397 @@
+"""
+Servicio de deudas fijas.
+
+Mantiene los datos de financiamiento de cada deuda (saldo, tasa y pago
+mínimo) y su plan de amortización precalculado, que se regenera solo cuando
+esos datos cambian. Las vistas leen las proyecciones de la tabla en lugar de
+simular en cada petición.
+
+También mantiene al día ``proxima_fecha_pago``, el próximo vencimiento de
+cada deuda, para que los listados y avisos lo filtren y ordenen en SQL, y
+registra los pagos mensuales en ``pagos_deuda`` junto con su egreso. Cada
+pago se guarda con el período de la cuota que salda (el mes de
+``proxima_fecha_pago`` al pagar, no el mes del pago), así que una cuota está
+pagada si existe su fila (deuda_id, periodo) aunque se haya pagado antes de
+que empiece su mes.
+"""
+from typing import Optional, Dict, Any, List, Iterable, Set
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import func, insert, case, exists, and_, or_
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models import DeudaFija, AmortizacionDeuda, PagoDeuda, Egreso
+from services.estrategias_service import MAX_MESES
+from services.resumen_service import ResumenMensualService
+from services.cache_usuario import marcar_modificado
+from services.validators import validate_monto, ValidationError
+from utils.recurrencia import proxima_fecha_pago, fecha_en_mes, mes_siguiente
+
+
+CENTAVO = Decimal('0.01')
+TASA_MAXIMA = Decimal('999.999')
+
+
+def periodo_de(fecha: date) -> str:
+    """Período YYYY-MM de una fecha."""
+    return fecha.strftime('%Y-%m')
+
+
+class DeudasService:
+    """Servicio para gestionar el financiamiento, los vencimientos y los pagos de las deudas fijas."""
+
+    @staticmethod
+    def validar_financiamiento(saldo: Optional[str], tasa: Optional[str],
+                               pago_minimo: Optional[str]) -> Dict[str, Optional[Decimal]]:
+        """
+        Valida los datos de financiamiento; los campos vacíos quedan en None.
+
+        Returns:
+            Diccionario con saldo_pendiente, tasa_interes y pago_minimo
+
+        Raises:
+            ValidationError: Si algún valor no es válido
+        """
+        datos = {}
+        for campo, valor, nombre in (('saldo_pendiente', saldo, 'Saldo pendiente'),
+                                     ('tasa_interes', tasa, 'Tasa de interés'),
+                                     ('pago_minimo', pago_minimo, 'Pago mínimo')):
+            if valor is None or str(valor).strip() == '':
+                datos[campo] = None
+                continue
+            es_valido, error, decimal = validate_monto(str(valor).strip())
+            if not es_valido:
+                raise ValidationError(f'{nombre}: {error}')
+            datos[campo] = decimal
+
+        if datos['tasa_interes'] is not None and datos['tasa_interes'] > TASA_MAXIMA:
+            raise ValidationError('Tasa de interés: el valor es demasiado grande')
+        return datos
+
+    @staticmethod
+    def actualizar_financiamiento(deuda: DeudaFija, saldo: Optional[str], tasa: Optional[str],
+                                  pago_minimo: Optional[str], recalcular: bool = False) -> bool:
+        """
+        Guarda los datos de financiamiento y regenera el plan si cambiaron.
+
+        No hace commit: la deuda se guarda junto con el resto de cambios.
+
+        Args:
+            deuda: Deuda a actualizar
+            saldo: Saldo pendiente (vacío para no registrarlo)
+            tasa: Tasa de interés anual en %
+            pago_minimo: Pago mínimo mensual (vacío para usar el monto)
+            recalcular: Regenerar el plan aunque estos datos no cambien
+                (por ejemplo, si cambió el monto mensual)
+
+        Returns:
+            True si algún dato cambió
+
+        Raises:
+            ValidationError: Si algún valor no es válido
+        """
+        datos = DeudasService.validar_financiamiento(saldo, tasa, pago_minimo)
+        cambios = False
+        for campo, valor in datos.items():
+            actual = getattr(deuda, campo)
+            if (actual is None) != (valor is None) or (valor is not None and Decimal(actual) != valor):
+                setattr(deuda, campo, valor)
+                cambios = True
+
+        if cambios or recalcular:
+            DeudasService.recalcular_amortizacion(deuda)
+        return cambios
+
+    @staticmethod
+    def actualizar_fechas_pago(hoy: date, shard: int = 0, shards: int = 1) -> int:
+        """
+        Avanza el próximo vencimiento de las deudas cuya fecha ya pasó.
+
+        Las deudas con el mismo día de pago comparten fecha, así que basta un
+        UPDATE por día de pago (31 como máximo) y un commit.
+
+        Args:
+            hoy: Fecha de referencia
+            shard: Shard a procesar (usuarios con usuario_id mod shards == shard)
+            shards: Número total de shards
+
+        Returns:
+            Número de deudas actualizadas
+        """
+        vencidas = DeudaFija.query.filter(DeudaFija.proxima_fecha_pago < hoy)
+        if shards > 1:
+            vencidas = vencidas.filter(DeudaFija.usuario_id % shards == shard)
+
+        dias = [dia for (dia,) in vencidas.with_entities(DeudaFija.dia_pago).distinct()]
+        for (usuario_id,) in vencidas.with_entities(DeudaFija.usuario_id).distinct():
+            marcar_modificado(usuario_id, 'deudas_fijas')
+        actualizadas = 0
+        for dia in dias:
+            actualizadas += vencidas.filter(DeudaFija.dia_pago == dia).update(
+                {DeudaFija.proxima_fecha_pago: proxima_fecha_pago(dia, hoy)},
+                synchronize_session=False
+            )
+        db.session.commit()
+        return actualizadas
+
+    @staticmethod
+    def condicion_pendiente(periodo: str):
+        """Condición SQL de deuda sin pago registrado en `periodo` (YYYY-MM)."""
+        return ~exists().where(PagoDeuda.deuda_id == DeudaFija.id,
+                               PagoDeuda.periodo == periodo)
+
+    @staticmethod
+    def condicion_cuota_pendiente(desde: date, hasta: date):
+        """
+        Condición SQL de deuda sin pago de la cuota de su próximo vencimiento.
+
+        Se compara mes a mes entre `desde` y `hasta`: una deuda que vence en
+        un mes está pagada si tiene el pago de ese período. Las que vencen
+        fuera del rango se consideran pendientes.
+        """
+        pagadas = []
+        anio, mes = desde.year, desde.month
+        while date(anio, mes, 1) <= hasta:
+            pagadas.append(and_(
+                DeudaFija.proxima_fecha_pago.between(date(anio, mes, 1), fecha_en_mes(anio, mes, 31)),
+                ~DeudasService.condicion_pendiente(f'{anio:04d}-{mes:02d}')
+            ))
+            anio, mes = mes_siguiente(anio, mes)
+        return ~or_(*pagadas)
+
+    @staticmethod
+    def cuotas_pagadas(deudas: Iterable[DeudaFija], hoy: date) -> Set[int]:
+        """IDs de las deudas con la cuota de su próximo vencimiento pagada, en una consulta."""
+        periodos = {deuda.id: deuda.periodo_cuota(hoy) for deuda in deudas}
+        if not periodos:
+            return set()
+        pagos = db.session.query(PagoDeuda.deuda_id, PagoDeuda.periodo).filter(
+            PagoDeuda.deuda_id.in_(list(periodos)),
+            PagoDeuda.periodo.in_(set(periodos.values()))
+        )
+        return {deuda_id for deuda_id, periodo in pagos if periodos[deuda_id] == periodo}
+
+    @staticmethod
+    def registrar_pago(deuda: DeudaFija, fecha: Optional[date] = None) -> PagoDeuda:
+        """
+        Registra el pago de la próxima cuota y su egreso en una sola transacción.
+
+        El pago queda en el período de la cuota que vence en la fecha del
+        pago o después: pagar el 30 una deuda que vence el día 1 salda la
+        cuota del mes siguiente.
+
+        Args:
+            deuda: Deuda pagada
+            fecha: Fecha del pago (por defecto, hoy)
+
+        Returns:
+            Pago registrado
+
+        Raises:
+            ValidationError: Si esa cuota ya tiene su pago registrado
+        """
+        fecha = fecha or date.today()
+        periodo = deuda.periodo_cuota(fecha)
+        if deuda.cuota_pagada(fecha):
+            raise ValidationError('La próxima cuota de la deuda ya está pagada')
+
+        egreso = Egreso(
+            usuario_id=deuda.usuario_id,
+            monto=deuda.monto,
+            descripcion=f'Pago de deuda: {deuda.titulo}',
+            categoria='Deudas',
+            fecha=fecha
+        )
+        pago = PagoDeuda(deuda_id=deuda.id, periodo=periodo, egreso=egreso,
+                         monto=deuda.monto, fecha=fecha)
+        deuda.fecha_ultimo_pago = fecha
+        db.session.add_all([egreso, pago])
+        marcar_modificado(deuda.usuario_id, 'pagos_deuda')
+        ResumenMensualService.registrar(deuda.usuario_id, 'egreso', egreso.fecha,
+                                        egreso.categoria, egreso.monto)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otra petición registró el mismo pago
+            db.session.rollback()
+            raise ValidationError('La próxima cuota de la deuda ya está pagada')
+        return pago
+
+    @staticmethod
+    def anular_pago(deuda: DeudaFija, periodo: Optional[str] = None) -> bool:
+        """
+        Elimina el pago de una cuota y el egreso que generó.
+
+        Args:
+            deuda: Deuda pagada
+            periodo: Período YYYY-MM de la cuota (por defecto, la del próximo vencimiento)
+
+        Returns:
+            True si había un pago que anular
+        """
+        pago = deuda.pagos.filter_by(periodo=periodo or deuda.periodo_cuota()).first()
+        if pago is None:
+            return False
+
+        egreso = pago.egreso
+        if egreso is not None:
+            ResumenMensualService.registrar(egreso.usuario_id, 'egreso', egreso.fecha,
+                                            egreso.categoria, -egreso.monto, cantidad=-1)
+            db.session.delete(egreso)
+        db.session.delete(pago)
+        marcar_modificado(deuda.usuario_id, 'pagos_deuda')
+        db.session.flush()
+        deuda.fecha_ultimo_pago = db.session.query(func.max(PagoDeuda.fecha))\
+            .filter(PagoDeuda.deuda_id == deuda.id).scalar()
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def resumen_anual(usuario_id: int, anio: int) -> List[Dict[str, Any]]:
+        """
+        Pagos de cada deuda del usuario en un año, agrupados en SQL.
+
+        Returns:
+            Lista de {'deuda_id', 'titulo', 'pagos', 'total'} ordenada por título
+        """
+        filas = db.session.query(
+            DeudaFija.id, DeudaFija.titulo, func.count(PagoDeuda.id), func.sum(PagoDeuda.monto)
+        ).join(PagoDeuda, PagoDeuda.deuda_id == DeudaFija.id).filter(
+            DeudaFija.usuario_id == usuario_id,
+            PagoDeuda.periodo.between(f'{anio:04d}-01', f'{anio:04d}-12')
+        ).group_by(DeudaFija.id, DeudaFija.titulo).order_by(DeudaFija.titulo).all()
+
+        return [{'deuda_id': deuda_id, 'titulo': titulo, 'pagos': pagos, 'total': float(total)}
+                for deuda_id, titulo, pagos, total in filas]
+
+    @staticmethod
+    def calcular_amortizacion(saldo: Decimal, tasa_anual: Decimal,
+                              pago: Decimal) -> List[Dict[str, Any]]:
+        """
+        Plan de pagos mes a mes pagando un monto fijo.
+
+        El interés de cada mes se redondea al centavo. Se detiene al
+        liquidar la deuda o al llegar a MAX_MESES.
+
+        Returns:
+            Lista de filas {'mes', 'interes', 'pago', 'saldo'}
+        """
+        tasa_mensual = tasa_anual / Decimal('1200') if tasa_anual > 0 else Decimal('0')
+        filas = []
+        mes = 0
+        while saldo > 0 and mes < MAX_MESES:
+            mes += 1
+            interes = (saldo * tasa_mensual).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+            saldo += interes
+            pago_mes = min(pago, saldo)
+            saldo -= pago_mes
+            filas.append({'mes': mes, 'interes': interes, 'pago': pago_mes, 'saldo': saldo})
+        return filas
+
+    @staticmethod
+    def recalcular_amortizacion(deuda: DeudaFija) -> int:
+        """
+        Regenera las filas de amortización de una deuda.
+
+        Sin saldo pendiente la deuda queda sin plan.
+
+        Returns:
+            Número de filas generadas
+        """
+        if deuda.id is None:
+            db.session.flush()
+        AmortizacionDeuda.query.filter_by(deuda_id=deuda.id).delete(synchronize_session=False)
+        marcar_modificado(deuda.usuario_id, 'amortizaciones_deuda')
+        db.session.expire(deuda, ['amortizacion'])
+
+        if not deuda.saldo_pendiente or deuda.saldo_pendiente <= 0:
+            return 0
+
+        pago = deuda.pago_minimo if deuda.pago_minimo is not None else deuda.monto
+        filas = DeudasService.calcular_amortizacion(
+            Decimal(deuda.saldo_pendiente), Decimal(deuda.tasa_interes or 0), Decimal(pago)
+        )
+        if filas:
+            db.session.execute(insert(AmortizacionDeuda),
+                               [dict(fila, deuda_id=deuda.id) for fila in filas])
+        return len(filas)
+
+    @staticmethod
+    def proyecciones(deuda_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Resumen del plan de cada deuda leído de la tabla de amortización.
+
+        Returns:
+            {deuda_id: {'meses', 'total_intereses', 'total_pagado', 'liquidada'}}
+        """
+        deuda_ids = list(deuda_ids)
+        if not deuda_ids:
+            return {}
+
+        filas = db.session.query(
+            AmortizacionDeuda.deuda_id,
+            func.max(AmortizacionDeuda.mes),
+            func.sum(AmortizacionDeuda.interes),
+            func.sum(AmortizacionDeuda.pago),
+            func.min(AmortizacionDeuda.saldo)
+        ).filter(AmortizacionDeuda.deuda_id.in_(deuda_ids))\
+         .group_by(AmortizacionDeuda.deuda_id).all()
+
+        return {
+            deuda_id: {
+                'meses': meses,
+                'total_intereses': float(intereses),
+                'total_pagado': float(pagado),
+                'liquidada': saldo_minimo <= 0
+            }
+            for deuda_id, meses, intereses, pagado, saldo_minimo in filas
+        }
+
+    @staticmethod
+    def resumen_usuario(usuario_id: int) -> Dict[str, Any]:
+        """
+        Totales de las deudas activas del usuario según sus planes guardados.
+
+        Returns:
+            Diccionario con saldo_total, total_intereses y meses_para_liquidar
+            (el plan más largo; None si alguna deuda no se liquida)
+        """
+        planes = db.session.query(
+            AmortizacionDeuda.deuda_id.label('deuda_id'),
+            func.max(AmortizacionDeuda.mes).label('meses'),
+            func.sum(AmortizacionDeuda.interes).label('intereses'),
+            func.min(AmortizacionDeuda.saldo).label('saldo_minimo')
+        ).group_by(AmortizacionDeuda.deuda_id).subquery()
+
+        saldo_total, intereses, meses, sin_liquidar = db.session.query(
+            func.coalesce(func.sum(DeudaFija.saldo_pendiente), 0),
+            func.coalesce(func.sum(planes.c.intereses), 0),
+            func.max(planes.c.meses),
+            func.coalesce(func.sum(case((planes.c.saldo_minimo > 0, 1), else_=0)), 0)
+        ).join(planes, planes.c.deuda_id == DeudaFija.id).filter(
+            DeudaFija.usuario_id == usuario_id,
+            DeudaFija.activa.is_(True)
+        ).one()
+
+        return {
+            'saldo_total': float(saldo_total),
+            'total_intereses': float(intereses),
+            'meses_para_liquidar': None if sin_liquidar else meses
+        }
+
+    @staticmethod
+    def deudas_para_estrategia(deudas: Iterable[DeudaFija]) -> List[Dict[str, Any]]:
+        """
+        Convierte las deudas con saldo guardado al formato de las estrategias.
+
+        Returns:
+            Lista de deudas con id, nombre, saldo_pendiente, tasa_interes y pago_minimo
+        """
+        return [{
+            'id': deuda.id,
+            'nombre': deuda.titulo,
+            'saldo_pendiente': float(deuda.saldo_pendiente),
+            'tasa_interes': float(deuda.tasa_interes or 0),
+            'pago_minimo': float(deuda.pago_minimo if deuda.pago_minimo is not None
+                                 else deuda.monto)
+        } for deuda in deudas if deuda.saldo_pendiente and deuda.saldo_pendiente > 0]
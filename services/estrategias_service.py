@@ -0,0 +1,572 @@
+"""
+Servicio de estrategias de pago de deudas.
+
+Simula mes a mes el pago de un portafolio de deudas: cada mes se cobran los
+intereses, se aplican los pagos mínimos y el pago extra va a la deuda que
+indique la política de orden (avalancha, bola de nieve, etc.).
+
+La simulación vectorizada representa saldos, tasas y mínimos como arrays de
+NumPy y avanza todas las deudas con una operación por mes. La simulación por
+eventos usa además la fórmula de amortización para saltar los meses en que
+ninguna deuda termina de pagarse. El modo exacto repite el cálculo con
+``Decimal`` y sirve de referencia; el modo verificado ejecuta el de eventos y
+el exacto, y usa el exacto si no coinciden.
+"""
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from services.cache import clave_hash
+from services.validators import validate_monto, validate_texto, ValidationError
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy es opcional
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+MAX_MESES = 600  # 50 años máximo
+MESES_HISTORIAL = 24
+MODOS = ('eventos', 'vectorizado', 'exacto', 'verificado')
+
+# Saldos por debajo de este valor se consideran pagados en el modo vectorizado
+EPSILON = 1e-9
+# Diferencia máxima de intereses admitida frente al modo exacto: un centavo o,
+# con saldos que crecen sin control, una parte en mil millones
+TOLERANCIA = 0.01
+TOLERANCIA_RELATIVA = 1e-9
+
+# Una política devuelve la clave de prioridad de cada deuda a partir de
+# (saldo, tasa, pago mínimo, posición); el pago extra va a la de menor clave.
+# Solo usa aritmética, así que sirve igual con escalares Decimal y con arrays.
+Politica = Callable[[Any, Any, Any, Any], Any]
+
+POLITICAS: Dict[str, Politica] = {
+    # Mayor tasa de interés primero: minimiza los intereses pagados
+    'avalancha': lambda saldo, tasa, minimo, posicion: -tasa,
+    # Menor saldo primero: elimina deudas rápidamente
+    'bola_nieve': lambda saldo, tasa, minimo, posicion: saldo,
+    # Mayor pago mínimo primero: libera flujo mensual antes
+    'mayor_pago': lambda saldo, tasa, minimo, posicion: -minimo,
+    # Orden indicado por el usuario
+    'personalizada': lambda saldo, tasa, minimo, posicion: posicion,
+}
+# Políticas cuya prioridad cambia con el saldo y no solo al pagar una deuda
+DINAMICAS = {'bola_nieve'}
+
+
+def _es_identificador(valor: Any) -> bool:
+    """IDs de deuda admitidos: texto o entero (no bool, listas ni objetos, que no son hashables)."""
+    return isinstance(valor, (str, int)) and not isinstance(valor, bool)
+
+
+def _posiciones(deudas_info: Sequence[dict], orden: Optional[Sequence[Any]]) -> List[int]:
+    """Posición de cada deuda en el orden personalizado; las omitidas van al final."""
+    if not orden:
+        return list(range(len(deudas_info)))
+    indice = {id: i for i, id in enumerate(orden)}
+    return [indice.get(d['id'], len(orden) + i) for i, d in enumerate(deudas_info)]
+
+
+def _ordenar(deudas_info: Sequence[dict], clave: Politica,
+             posiciones: List[int]) -> List[dict]:
+    """Ordena las deudas por la clave inicial (los empates conservan el orden)."""
+    deudas = []
+    for deuda, posicion in zip(deudas_info, posiciones):
+        deuda = dict(deuda)
+        deuda['posicion'] = posicion
+        deudas.append(deuda)
+    return sorted(deudas, key=lambda d: clave(Decimal(str(d['saldo_pendiente'])),
+                                              Decimal(str(d['tasa_interes'])),
+                                              Decimal(str(d['pago_minimo'])),
+                                              d['posicion']))
+
+
+def _simular_exacto(deudas: List[dict], pago_extra_mensual: float,
+                    clave: Politica) -> Dict[str, Any]:
+    """Simulación de referencia con Decimal."""
+    extra = Decimal(str(pago_extra_mensual))
+    saldos = [Decimal(str(d['saldo_pendiente'])) for d in deudas]
+    tasas = [Decimal(str(d['tasa_interes'])) for d in deudas]
+    tasas_mensuales = [t / Decimal('12') / Decimal('100') if t > 0 else Decimal('0')
+                       for t in tasas]
+    minimos = [Decimal(str(d['pago_minimo'])) for d in deudas]
+    nombres = [d['nombre'] for d in deudas]
+    posiciones = [d['posicion'] for d in deudas]
+
+    meses = 0
+    total_intereses = Decimal('0')
+    historial = []
+    while any(s > 0 for s in saldos):
+        meses += 1
+        mes_intereses = Decimal('0')
+        pago_total_mes = Decimal('0')
+
+        # Calcular intereses y pagos mínimos
+        for i, saldo in enumerate(saldos):
+            if saldo > 0:
+                interes = saldo * tasas_mensuales[i]
+                saldo += interes
+                mes_intereses += interes
+                total_intereses += interes
+                pago = min(minimos[i], saldo)
+                saldos[i] = saldo - pago
+                pago_total_mes += pago
+
+        # Aplicar el pago extra a la deuda prioritaria que aún tenga saldo
+        pendientes = [i for i, s in enumerate(saldos) if s > 0]
+        if pendientes and extra > 0:
+            i = min(pendientes, key=lambda i: clave(saldos[i], tasas[i], minimos[i], posiciones[i]))
+            pago_extra = min(extra, saldos[i])
+            saldos[i] -= pago_extra
+            pago_total_mes += pago_extra
+
+        # Guardar estado del mes
+        if meses <= MESES_HISTORIAL and (meses <= 12 or any(s > 0 for s in saldos)):
+            historial.append({
+                'mes': meses,
+                'total_intereses': float(mes_intereses),
+                'pago_total': float(pago_total_mes),
+                'saldos': {n: float(s) for n, s in zip(nombres, saldos) if s > 0}
+            })
+
+        # Evitar bucle infinito
+        if meses > MAX_MESES:
+            break
+
+    return {
+        'meses': meses,
+        'total_intereses': float(total_intereses),
+        'historial': historial
+    }
+
+
+class _CarteraVectorizada:
+    """Estado de la simulación con arrays de NumPy."""
+
+    def __init__(self, deudas: List[dict], pago_extra_mensual: float, clave: Politica):
+        self.extra = float(pago_extra_mensual)
+        self.clave = clave
+        self.saldos = np.array([float(d['saldo_pendiente']) for d in deudas])
+        self.tasas = np.array([float(d['tasa_interes']) for d in deudas])
+        self.tasas_mensuales = np.where(self.tasas > 0, self.tasas / 1200.0, 0.0)
+        self.minimos = np.array([float(d['pago_minimo']) for d in deudas])
+        self.posiciones = np.array([d['posicion'] for d in deudas], dtype=float)
+        self.nombres = [d['nombre'] for d in deudas]
+        self.activas = self.saldos > EPSILON
+        self.meses = 0
+        self.total_intereses = 0.0
+        self.historial = []
+
+    def prioritaria(self, saldos, activas) -> int:
+        """Índice de la deuda que recibe el pago extra."""
+        claves = np.where(activas, self.clave(saldos, self.tasas, self.minimos, self.posiciones),
+                          np.inf)
+        return int(np.argmin(claves))
+
+    def avanzar_mes(self) -> None:
+        """Simula un mes: intereses y pagos mínimos de todas las deudas a la vez."""
+        self.meses += 1
+        saldos = self.saldos
+        intereses = np.where(self.activas, saldos * self.tasas_mensuales, 0.0)
+        saldos += intereses
+        pagos = np.where(self.activas, np.minimum(self.minimos, saldos), 0.0)
+        saldos -= pagos
+        saldos[saldos <= EPSILON] = 0.0
+        mes_intereses = float(intereses.sum())
+        pago_total_mes = float(pagos.sum())
+        self.total_intereses += mes_intereses
+
+        activas = self.activas = saldos > 0
+        if self.extra > 0 and activas.any():
+            i = self.prioritaria(saldos, activas)
+            pago_extra = min(self.extra, float(saldos[i]))
+            saldos[i] -= pago_extra
+            pago_total_mes += pago_extra
+            if saldos[i] <= EPSILON:
+                saldos[i] = 0.0
+                activas[i] = False
+
+        if self.meses <= MESES_HISTORIAL and (self.meses <= 12 or activas.any()):
+            self.historial.append({
+                'mes': self.meses,
+                'total_intereses': mes_intereses,
+                'pago_total': pago_total_mes,
+                'saldos': {n: float(s) for n, s in zip(self.nombres, saldos) if s > 0}
+            })
+
+    def resultado(self) -> Dict[str, Any]:
+        return {
+            'meses': self.meses,
+            'total_intereses': self.total_intereses,
+            'historial': self.historial
+        }
+
+
+def _simular_vectorizado(deudas: List[dict], pago_extra_mensual: float,
+                         clave: Politica) -> Dict[str, Any]:
+    """Simulación mes a mes con una operación vectorizada por mes."""
+    cartera = _CarteraVectorizada(deudas, pago_extra_mensual, clave)
+    while cartera.activas.any():
+        cartera.avanzar_mes()
+        if cartera.meses > MAX_MESES:
+            break
+    return cartera.resultado()
+
+
+def _saldos_futuros(saldos, tasas_mensuales, pagos, meses):
+    """
+    Saldos tras `meses` meses pagando `pagos` cada mes (fórmula de amortización).
+
+    s(k) = (s - P/r) * (1 + r)^k + P/r, o s - P*k si r = 0. `meses` puede ser
+    un escalar o un array columna para obtener varios meses a la vez.
+    """
+    con_interes = tasas_mensuales > 0
+    r = np.where(con_interes, tasas_mensuales, 1.0)
+    equilibrio = pagos / r
+    crecimiento = np.power(1.0 + tasas_mensuales, meses)
+    return np.where(con_interes,
+                    (saldos - equilibrio) * crecimiento + equilibrio,
+                    saldos - pagos * meses)
+
+
+def _meses_hasta_cero(saldos, tasas_mensuales, pagos):
+    """
+    Meses que tarda cada deuda en llegar a cero con un pago fijo (inf si nunca).
+
+    Con interés: n = ceil(log(P / (P - r*s)) / log(1 + r)); sin interés:
+    n = ceil(s / P). El redondeo se corrige evaluando los saldos en n - 1 y n.
+    """
+    intereses = saldos * tasas_mensuales
+    amortiza = pagos > intereses + EPSILON
+    with np.errstate(divide='ignore', invalid='ignore'):
+        con_interes = np.log(pagos / (pagos - intereses)) / np.log1p(tasas_mensuales)
+        sin_interes = saldos / pagos
+    meses = np.where(tasas_mensuales > 0, con_interes, sin_interes)
+    meses = np.where(amortiza & (saldos > EPSILON), np.maximum(np.ceil(meses), 1.0), np.inf)
+
+    # Corregir errores de redondeo alrededor de valores enteros
+    finitos = np.isfinite(meses)
+    if finitos.any():
+        n = np.where(finitos, meses, 1.0)
+        meses = np.where(finitos & (_saldos_futuros(saldos, tasas_mensuales, pagos, n) > EPSILON),
+                         n + 1, meses)
+        n = np.where(finitos, meses, 2.0)
+        meses = np.where(finitos & (n > 1)
+                         & (_saldos_futuros(saldos, tasas_mensuales, pagos, n - 1) <= EPSILON),
+                         n - 1, meses)
+    return meses
+
+
+def _simular_eventos(deudas: List[dict], pago_extra_mensual: float, clave: Politica,
+                     dinamica: bool) -> Dict[str, Any]:
+    """
+    Simulación por eventos: salta directamente al siguiente mes en que cambia
+    el reparto de pagos.
+
+    Entre eventos cada deuda paga un monto fijo (su mínimo, más el extra si es
+    la prioritaria), así que su saldo sigue la fórmula de amortización y los
+    meses intermedios se calculan de una vez. Un evento es el pago total de
+    una deuda o, en políticas que dependen del saldo, un cambio de deuda
+    prioritaria. El mes del evento se simula normalmente. Los primeros 24
+    meses se simulan uno a uno para conservar el historial.
+    """
+    cartera = _CarteraVectorizada(deudas, pago_extra_mensual, clave)
+    tasas_mensuales, minimos = cartera.tasas_mensuales, cartera.minimos
+
+    while cartera.activas.any() and cartera.meses < MESES_HISTORIAL:
+        cartera.avanzar_mes()
+
+    while cartera.activas.any() and cartera.meses <= MAX_MESES:
+        activas = cartera.activas
+        saldos = cartera.saldos
+        pagos = np.where(activas, minimos, 0.0)
+
+        # Deuda prioritaria del próximo mes (se elige tras los pagos mínimos)
+        prioritaria = None
+        if cartera.extra > 0:
+            tras_minimos = saldos * (1.0 + tasas_mensuales) - minimos
+            pendientes = activas & (tras_minimos > EPSILON)
+            if pendientes.any():
+                prioritaria = cartera.prioritaria(tras_minimos, pendientes)
+                pagos[prioritaria] += cartera.extra
+
+        evento = _meses_hasta_cero(saldos, tasas_mensuales, pagos).min()
+        evento = int(min(evento, MAX_MESES + 1 - cartera.meses))
+
+        if dinamica and prioritaria is not None and evento > 1:
+            # Primer mes en que otra deuda pasaría a ser la prioritaria
+            meses = np.arange(evento).reshape(-1, 1)
+            tras_minimos = (_saldos_futuros(saldos, tasas_mensuales, pagos, meses)
+                            * (1.0 + tasas_mensuales) - minimos)
+            claves = np.where(activas & (tras_minimos > EPSILON),
+                              clave(tras_minimos, cartera.tasas, minimos, cartera.posiciones),
+                              np.inf)
+            cambios = np.nonzero(np.argmin(claves, axis=1) != prioritaria)[0]
+            if len(cambios):
+                evento = int(cambios[0]) + 1
+
+        # Saltar los meses sin eventos y simular el mes del evento
+        salto = evento - 1
+        if salto > 0:
+            nuevos = np.where(activas, _saldos_futuros(saldos, tasas_mensuales, pagos, salto), 0.0)
+            cartera.total_intereses += float((nuevos - saldos + pagos * salto).sum())
+            cartera.saldos = nuevos
+            cartera.meses += salto
+        cartera.avanzar_mes()
+
+    return cartera.resultado()
+
+
+def _evaluar_escenario(argumentos: tuple) -> Dict[str, Any]:
+    """Simula un escenario y devuelve solo su resumen (se ejecuta en el pool)."""
+    deudas_info, escenario, modo = argumentos
+    resultado = EstrategiasService.simular(deudas_info, escenario['pago_extra'],
+                                           escenario['estrategia'], escenario.get('orden'), modo)
+    fila = dict(escenario)
+    fila['meses'] = resultado['meses']
+    fila['total_intereses'] = round(resultado['total_intereses'], 2)
+    fila['pagada'] = resultado['meses'] <= MAX_MESES
+    return fila
+
+
+# Pool de procesos compartido por las peticiones del worker; se crea al primer uso
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_procesos = 0
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool(procesos: int) -> ProcessPoolExecutor:
+    global _pool, _pool_procesos
+    with _pool_lock:
+        if _pool is None or _pool_procesos != procesos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=procesos)
+            _pool_procesos = procesos
+        return _pool
+
+
+def _descartar_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+class EstrategiasService:
+    """Servicio para simular estrategias de pago de deudas."""
+
+    @staticmethod
+    def simular(deudas_info: Sequence[dict], pago_extra_mensual: float,
+                politica: str = 'avalancha', orden: Optional[Sequence[Any]] = None,
+                modo: str = 'eventos') -> Dict[str, Any]:
+        """
+        Simula el pago de las deudas con una política de orden.
+
+        Args:
+            deudas_info: Deudas con id, nombre, saldo_pendiente, tasa_interes y pago_minimo
+            pago_extra_mensual: Monto adicional que se paga cada mes
+            politica: Nombre de la política en POLITICAS
+            orden: IDs de deuda en orden de prioridad (política 'personalizada')
+            modo: 'eventos', 'vectorizado', 'exacto' (Decimal) o 'verificado'
+
+        Returns:
+            Diccionario con meses, total_intereses e historial (primeros 24 meses)
+
+        Raises:
+            ValueError: Si la política o el modo no son válidos
+        """
+        if politica not in POLITICAS:
+            raise ValueError(f"La política '{politica}' no es válida. "
+                             f"Debe ser una de: {', '.join(POLITICAS)}")
+        if modo not in MODOS:
+            raise ValueError(f"El modo '{modo}' no es válido. "
+                             f"Debe ser uno de: {', '.join(MODOS)}")
+
+        clave = POLITICAS[politica]
+        deudas = _ordenar(deudas_info, clave, _posiciones(deudas_info, orden))
+
+        if modo == 'exacto' or np is None:
+            return _simular_exacto(deudas, pago_extra_mensual, clave)
+
+        if modo == 'vectorizado':
+            return _simular_vectorizado(deudas, pago_extra_mensual, clave)
+
+        resultado = _simular_eventos(deudas, pago_extra_mensual, clave, politica in DINAMICAS)
+        if modo == 'verificado':
+            exacto = _simular_exacto(deudas, pago_extra_mensual, clave)
+            diferencia = abs(resultado['total_intereses'] - exacto['total_intereses'])
+            tolerancia = max(TOLERANCIA, TOLERANCIA_RELATIVA * abs(exacto['total_intereses']))
+            if resultado['meses'] != exacto['meses'] or diferencia > tolerancia:
+                logger.warning(f'Simulación por eventos difiere de la exacta ({politica}): '
+                               f'meses {resultado["meses"]} vs {exacto["meses"]}, '
+                               f'intereses {diferencia:.6f}')
+                return exacto
+        return resultado
+
+    @staticmethod
+    def clave_portafolio(deudas_info: Sequence[dict], pago_extra_mensual: float,
+                         politica: str, modo: str,
+                         orden: Optional[Sequence[Any]] = None) -> Tuple[str, List[dict]]:
+        """
+        Normaliza un portafolio y calcula su clave de caché.
+
+        Las deudas se ordenan por (nombre, saldo, tasa, mínimo), así que el
+        orden del formulario no cambia la clave. El id solo forma parte de la
+        clave con un orden personalizado, que es lo único que lo usa.
+
+        Returns:
+            Tupla (clave, deudas normalizadas para simular)
+        """
+        deudas = sorted(
+            ({'id': d['id'], 'nombre': d['nombre'],
+              'saldo_pendiente': float(d['saldo_pendiente']),
+              'tasa_interes': float(d['tasa_interes']),
+              'pago_minimo': float(d['pago_minimo'])} for d in deudas_info),
+            key=lambda d: (d['nombre'], d['saldo_pendiente'], d['tasa_interes'],
+                           d['pago_minimo'], str(d['id']))
+        )
+        usa_ids = politica == 'personalizada'
+        portafolio = [(d['nombre'], d['saldo_pendiente'], d['tasa_interes'], d['pago_minimo'],
+                       d['id'] if usa_ids else None) for d in deudas]
+        clave = clave_hash(politica, modo, float(pago_extra_mensual), portafolio,
+                           list(orden) if usa_ids and orden else None)
+        return clave, deudas
+
+    @staticmethod
+    def simular_en_cache(cache, deudas_info: Sequence[dict], pago_extra_mensual: float,
+                         politica: str = 'avalancha', orden: Optional[Sequence[Any]] = None,
+                         modo: str = 'eventos') -> Dict[str, Any]:
+        """
+        Igual que `simular`, pero reutiliza el resultado de un portafolio idéntico.
+
+        El resultado guardado se comparte entre peticiones: no debe modificarse.
+
+        Args:
+            cache: Caché de services.cache (CacheLRU o CacheRedis)
+        """
+        clave, deudas = EstrategiasService.clave_portafolio(
+            deudas_info, pago_extra_mensual, politica, modo, orden
+        )
+        resultado = cache.obtener(clave)
+        if resultado is None:
+            resultado = EstrategiasService.simular(deudas, pago_extra_mensual, politica, orden, modo)
+            cache.guardar(clave, resultado)
+        return resultado
+
+    @staticmethod
+    def validar_deudas(datos: Any) -> List[dict]:
+        """
+        Valida la lista de deudas de una simulación.
+
+        Args:
+            datos: Lista de diccionarios con nombre, saldo_pendiente,
+                tasa_interes, pago_minimo e id (opcional)
+
+        Returns:
+            Deudas normalizadas con valores float
+
+        Raises:
+            ValidationError: Si alguna deuda no es válida
+        """
+        if not isinstance(datos, list) or not datos:
+            raise ValidationError('Se esperaba una lista de deudas')
+
+        deudas = []
+        for numero, deuda in enumerate(datos, 1):
+            if not isinstance(deuda, dict):
+                raise ValidationError(f'Deuda {numero}: se esperaba un objeto')
+
+            nombre = str(deuda.get('nombre') or f'Deuda {numero}')
+            es_valido, error = validate_texto(nombre, 'Nombre', max_length=200)
+            if not es_valido:
+                raise ValidationError(f'Deuda {numero}: {error}')
+
+            valores = {}
+            for campo in ('saldo_pendiente', 'tasa_interes', 'pago_minimo'):
+                es_valido, error, valor = validate_monto(str(deuda.get(campo, '')))
+                if not es_valido:
+                    raise ValidationError(f'Deuda {numero} ({campo}): {error}')
+                valores[campo] = float(valor)
+            if valores['saldo_pendiente'] <= 0:
+                raise ValidationError(f'Deuda {numero}: el saldo pendiente debe ser mayor a 0')
+
+            id_deuda = deuda.get('id', numero)
+            if not _es_identificador(id_deuda):
+                raise ValidationError(f'Deuda {numero}: el id debe ser texto o un número entero')
+
+            deudas.append(dict(id=id_deuda, nombre=nombre, **valores))
+        return deudas
+
+    @staticmethod
+    def construir_escenarios(estrategias: Sequence[str], ordenes: Sequence[Sequence[Any]],
+                             pagos_extra: Sequence[Any]) -> List[dict]:
+        """
+        Combina estrategias, órdenes personalizados y montos de pago extra.
+
+        Returns:
+            Lista de escenarios {'estrategia', 'orden', 'pago_extra'}
+
+        Raises:
+            ValidationError: Si alguna estrategia o monto no es válido
+        """
+        for estrategia in estrategias:
+            if (not isinstance(estrategia, str) or estrategia not in POLITICAS
+                    or estrategia == 'personalizada'):
+                raise ValidationError(f"La estrategia '{estrategia}' no es válida")
+        for orden in ordenes:
+            if (not isinstance(orden, list) or not orden
+                    or not all(_es_identificador(id_deuda) for id_deuda in orden)):
+                raise ValidationError('Cada orden personalizado debe ser una lista de IDs')
+
+        montos = []
+        for pago_extra in pagos_extra:
+            es_valido, error, monto = validate_monto(str(pago_extra))
+            if not es_valido:
+                raise ValidationError(f'Pago extra: {error}')
+            montos.append(float(monto))
+
+        escenarios = []
+        for monto in montos:
+            escenarios.extend({'estrategia': estrategia, 'orden': None, 'pago_extra': monto}
+                              for estrategia in estrategias)
+            escenarios.extend({'estrategia': 'personalizada', 'orden': list(orden),
+                               'pago_extra': monto}
+                              for orden in ordenes)
+        return escenarios
+
+    @staticmethod
+    def comparar(deudas_info: Sequence[dict], escenarios: Sequence[dict],
+                 procesos: int = 1, modo: str = 'eventos') -> List[Dict[str, Any]]:
+        """
+        Simula varios escenarios y devuelve una tabla comparativa.
+
+        Con `procesos` > 1 los escenarios se reparten en un ProcessPoolExecutor
+        compartido; si el pool falla se calculan en el proceso actual.
+
+        Args:
+            deudas_info: Deudas validadas
+            escenarios: Escenarios de `construir_escenarios`
+            procesos: Número de procesos del pool (1 para no usarlo)
+            modo: Modo de simulación
+
+        Returns:
+            Una fila por escenario con meses, total_intereses y pagada
+        """
+        argumentos = [(list(deudas_info), escenario, modo) for escenario in escenarios]
+        if procesos > 1 and len(argumentos) > 1:
+            # Un bloque por proceso para no pagar la comunicación por escenario
+            bloque = -(-len(argumentos) // procesos)
+            try:
+                return list(_obtener_pool(procesos).map(_evaluar_escenario, argumentos,
+                                                        chunksize=bloque))
+            except BrokenProcessPool:
+                logger.warning('Pool de procesos de estrategias caído; se recalcula en el proceso')
+                _descartar_pool()
+        return [_evaluar_escenario(a) for a in argumentos]
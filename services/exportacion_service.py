@@ -0,0 +1,130 @@
+"""
+Servicio de exportación de transacciones.
+
+Genera NDJSON o CSV fila a fila con ``yield_per`` para que la memoria usada
+no dependa del tamaño del historial.
+"""
+import csv
+import io
+import json
+from typing import Optional, Iterator, List, Tuple
+from datetime import date
+from database import db
+from models import Ingreso, Egreso
+from services.validators import validate_fecha, ValidationError
+
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+COLUMNAS = ['tipo', 'id', 'fecha', 'monto', 'categoria', 'descripcion']
+MODELOS = {'ingreso': Ingreso, 'egreso': Egreso}
+FILAS_POR_LOTE = 1000
+
+
+class ExportacionService:
+    """Servicio para exportar transacciones en streaming."""
+
+    @staticmethod
+    def validar_filtros(formato: str, desde: Optional[str] = None,
+                        hasta: Optional[str] = None) -> Tuple[Optional[date], Optional[date]]:
+        """
+        Valida el formato y el rango de fechas de una exportación.
+
+        Returns:
+            Tupla (desde, hasta) como fechas o None
+
+        Raises:
+            ValidationError: Si algún parámetro no es válido
+        """
+        if formato not in FORMATOS:
+            raise ValidationError(f"El formato '{formato}' no es válido. "
+                                  f"Debe ser uno de: {', '.join(FORMATOS)}")
+
+        fechas = []
+        for valor in (desde, hasta):
+            if not valor:
+                fechas.append(None)
+                continue
+            es_valido, error, fecha = validate_fecha(valor)
+            if not es_valido:
+                raise ValidationError(error)
+            fechas.append(fecha)
+
+        if fechas[0] and fechas[1] and fechas[1] < fechas[0]:
+            raise ValidationError('La fecha final debe ser posterior a la inicial')
+        return fechas[0], fechas[1]
+
+    @staticmethod
+    def _filas(usuario_id: int, tipos: List[str], desde: Optional[date],
+               hasta: Optional[date], categoria: Optional[str]) -> Iterator[tuple]:
+        """Itera las filas (tipo, id, fecha, monto, categoria, descripcion)."""
+        for tipo in tipos:
+            modelo = MODELOS[tipo]
+            consulta = db.session.query(
+                modelo.id, modelo.fecha, modelo.monto, modelo.categoria, modelo.descripcion
+            ).filter(modelo.usuario_id == usuario_id)
+            if desde:
+                consulta = consulta.filter(modelo.fecha >= desde)
+            if hasta:
+                consulta = consulta.filter(modelo.fecha <= hasta)
+            if categoria:
+                consulta = consulta.filter(modelo.categoria == categoria)
+
+            # stream_results usa cursores del servidor donde el driver lo permite
+            consulta = consulta.order_by(modelo.fecha, modelo.id)\
+                .execution_options(stream_results=True)\
+                .yield_per(FILAS_POR_LOTE)
+            for fila in consulta:
+                yield (tipo,) + tuple(fila)
+
+    @staticmethod
+    def exportar(usuario_id: int, tipos: List[str], formato: str = 'ndjson',
+                 desde: Optional[date] = None, hasta: Optional[date] = None,
+                 categoria: Optional[str] = None) -> Iterator[str]:
+        """
+        Genera la exportación como fragmentos de texto.
+
+        Args:
+            usuario_id: ID del usuario
+            tipos: Tipos a exportar ('ingreso', 'egreso')
+            formato: 'ndjson' o 'csv'
+            desde: Fecha mínima inclusive (opcional)
+            hasta: Fecha máxima inclusive (opcional)
+            categoria: Filtrar por categoría (opcional)
+
+        Returns:
+            Iterador de fragmentos de texto listos para enviarse al cliente
+        """
+        filas = ExportacionService._filas(usuario_id, tipos, desde, hasta, categoria)
+        if formato == 'csv':
+            return ExportacionService._csv(filas)
+        return ExportacionService._ndjson(filas)
+
+    @staticmethod
+    def _ndjson(filas: Iterator[tuple]) -> Iterator[str]:
+        for tipo, id, fecha, monto, categoria, descripcion in filas:
+            yield json.dumps({
+                'tipo': tipo,
+                'id': id,
+                'fecha': fecha.isoformat(),
+                'monto': float(monto),
+                'categoria': categoria,
+                'descripcion': descripcion
+            }, ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def _csv(filas: Iterator[tuple]) -> Iterator[str]:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(COLUMNAS)
+
+        for numero, (tipo, id, fecha, monto, categoria, descripcion) in enumerate(filas, 1):
+            escritor.writerow([tipo, id, fecha.isoformat(), monto, categoria, descripcion])
+            if numero % FILAS_POR_LOTE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
@@ -0,0 +1,69 @@
+"""
+Caché de la identidad del usuario autenticado.
+
+Flask-Login llama a ``load_user`` en cada petición con sesión. En lugar de
+leer el usuario de la base de datos cada vez, se guarda una copia ligera
+(``UsuarioSesion``) en una caché en memoria acotada y con TTL. Cada commit
+que modifica la fila del usuario (nombre, email o contraseña) descarta su
+copia en el worker que lo hizo; los demás workers la renuevan al vencer el
+TTL (``IDENTIDAD_CACHE_TTL``).
+"""
+from typing import Optional
+from flask_login import UserMixin
+from database import db
+
+
+class UsuarioSesion(UserMixin):
+    """Datos del usuario autenticado, sin sesión de base de datos."""
+
+    def __init__(self, id: int, nombre: str, email: str, version_tokens: int = 0):
+        self.id = id
+        self.nombre = nombre
+        self.email = email
+        self.version_tokens = version_tokens
+
+    @classmethod
+    def desde_modelo(cls, usuario) -> 'UsuarioSesion':
+        return cls(usuario.id, usuario.nombre, usuario.email, usuario.version_tokens or 0)
+
+    def __repr__(self):
+        return f'<UsuarioSesion {self.email}>'
+
+
+class CacheIdentidad:
+    """Usuarios autenticados cacheados por ID."""
+
+    def __init__(self, cache):
+        """
+        Args:
+            cache: Caché en memoria de los usuarios (``CacheLRU``)
+        """
+        self.cache = cache
+
+    def cargar(self, usuario_id: int) -> Optional[UsuarioSesion]:
+        """
+        Devuelve el usuario cacheado o lo lee de la base de datos.
+
+        Args:
+            usuario_id: ID del usuario de la sesión
+
+        Returns:
+            Copia ligera del usuario, o None si no existe
+        """
+        from models import User
+
+        usuario = self.cache.obtener(usuario_id)
+        if usuario is None:
+            modelo = db.session.get(User, usuario_id)
+            if modelo is None:
+                return None
+            usuario = UsuarioSesion.desde_modelo(modelo)
+            self.cache.guardar(usuario_id, usuario)
+        return usuario
+
+    def olvidar(self, usuario_id: int) -> None:
+        """Descarta la copia del usuario para leerlo de nuevo en la próxima carga."""
+        self.cache.eliminar(usuario_id)
+
+    def estadisticas(self):
+        return self.cache.estadisticas()
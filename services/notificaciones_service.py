@@ -0,0 +1,266 @@
+"""
+Servicio de notificaciones por email.
+
+Construye los mensajes de recordatorios y deudas fijas y los envía por lotes,
+reutilizando una conexión SMTP por lote sobre un pool de hilos acotado.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+from flask_mail import Message
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from database import db
+from models import Recordatorio, DeudaFija, NotificacionEnviada
+from services.cache_usuario import marcar_modificado
+from services.deudas_service import DeudasService
+
+
+# Días de antelación con que se avisa del vencimiento de una deuda fija
+DIAS_AVISO_DEUDA = 2
+
+
+def mensaje_recordatorio(recordatorio: Recordatorio) -> Message:
+    """Construye el email de un recordatorio de pago."""
+    return Message(
+        subject=f'[FINANZAS MALU] Recordatorio: {recordatorio.titulo}',
+        recipients=[recordatorio.usuario.email],
+        body=f'Hola {recordatorio.usuario.nombre},\n\n'
+             f'Te recordamos que tienes un pago pendiente:\n\n'
+             f'Título: {recordatorio.titulo}\n'
+             f'Descripción: {recordatorio.descripcion}\n'
+             f'Fecha de pago: {recordatorio.fecha_pago}\n'
+             f'Monto: ${recordatorio.monto:.2f}\n\n'
+             f'Por favor, no olvides realizar este pago a tiempo.'
+    )
+
+
+def mensaje_deuda(deuda: DeudaFija, fecha_pago: date, dias_restantes: int) -> Message:
+    """Construye el email de aviso de una deuda fija próxima a vencer."""
+    return Message(
+        subject=f'[FINANZAS MALU] Recordatorio: Pago de deuda fija - {deuda.titulo}',
+        recipients=[deuda.usuario.email],
+        body=f'Hola {deuda.usuario.nombre},\n\n'
+             f'Te recordamos que tienes una deuda fija próxima a vencer:\n\n'
+             f'Deuda: {deuda.titulo}\n'
+             f'Descripción: {deuda.descripcion or "Sin descripción"}\n'
+             f'Fecha de pago: {fecha_pago.strftime("%d/%m/%Y")}\n'
+             f'Monto: ${deuda.monto:.2f}\n'
+             f'Días restantes: {dias_restantes}\n\n'
+             f'Por favor, no olvides realizar este pago a tiempo.\n'
+             f'Puedes marcarlo como pagado en la aplicación cuando lo realices.'
+    )
+
+
+class DespachadorNotificaciones:
+    """
+    Envía mensajes agrupados en lotes.
+
+    Cada lote abre una sola conexión SMTP (``mail.connect()``) y los lotes se
+    reparten entre un número acotado de hilos.
+    """
+
+    def __init__(self, app, mail, tamano_lote: int = 50, max_hilos: int = 4):
+        self.app = app
+        self.mail = mail
+        self.tamano_lote = max(1, tamano_lote)
+        self.max_hilos = max(1, max_hilos)
+
+    def _enviar_lote(self, lote: Sequence[Tuple[Hashable, Message]]) -> List[Hashable]:
+        """Envía un lote por una conexión y devuelve las claves enviadas."""
+        enviados = []
+        with self.app.app_context():
+            try:
+                with self.mail.connect() as conexion:
+                    for clave, mensaje in lote:
+                        try:
+                            conexion.send(mensaje)
+                            enviados.append(clave)
+                        except Exception as e:
+                            self.app.logger.error(f'Error enviando notificación {clave}: {e}')
+            except Exception as e:
+                # Fallo al abrir o cerrar la conexión: lo ya enviado se conserva
+                self.app.logger.error(f'Error en la conexión SMTP: {e}')
+        return enviados
+
+    def enviar(self, mensajes: Sequence[Tuple[Hashable, Message]]) -> List[Hashable]:
+        """
+        Envía los mensajes y devuelve las claves de los enviados con éxito.
+
+        Args:
+            mensajes: Pares (clave, Message); la clave identifica el origen
+
+        Returns:
+            Lista de claves cuyos mensajes se enviaron
+        """
+        if not mensajes:
+            return []
+
+        lotes = [mensajes[i:i + self.tamano_lote]
+                 for i in range(0, len(mensajes), self.tamano_lote)]
+        if len(lotes) == 1:
+            return self._enviar_lote(lotes[0])
+
+        enviados = []
+        with ThreadPoolExecutor(max_workers=min(self.max_hilos, len(lotes))) as pool:
+            for resultado in pool.map(self._enviar_lote, lotes):
+                enviados.extend(resultado)
+        return enviados
+
+
+def marcar_enviados(ids: List[Any], tamano: int = 500) -> None:
+    """Marca los recordatorios como enviados con UPDATEs por bloques y un commit."""
+    for i in range(0, len(ids), tamano):
+        Recordatorio.query.filter(Recordatorio.id.in_(ids[i:i + tamano]))\
+            .update({Recordatorio.enviado: True}, synchronize_session=False)
+    db.session.commit()
+
+
+def filtrar_shard(consulta, columna, shard: int = 0, shards: int = 1):
+    """Restringe la consulta a los usuarios del shard (usuario_id mod shards)."""
+    if shards > 1:
+        consulta = consulta.filter(columna % shards == shard)
+    return consulta
+
+
+def recordatorios_vencidos(hoy: date, shard: int = 0, shards: int = 1):
+    """
+    Recordatorios no enviados cuya fecha de aviso ya llegó.
+    
+    El filtro por fecha se resuelve en SQL con el índice
+    (enviado, fecha_recordatorio) y el usuario se carga en el mismo JOIN.
+    """
+    consulta = Recordatorio.query.options(joinedload(Recordatorio.usuario)).filter(
+        Recordatorio.enviado.is_(False),
+        Recordatorio.fecha_recordatorio <= hoy
+    )
+    return filtrar_shard(consulta, Recordatorio.usuario_id, shard, shards)
+
+
+def ventana_de_aviso(hoy: date, dias: int = DIAS_AVISO_DEUDA) -> Dict[str, Tuple[date, date]]:
+    """
+    Tramos de la ventana de aviso (hoy..hoy+dias), uno por período.
+    
+    Returns:
+        {'YYYY-MM': (desde, hasta)} con las fechas de la ventana en ese mes
+    """
+    ventana: Dict[str, Tuple[date, date]] = {}
+    for i in range(dias + 1):
+        fecha = hoy + timedelta(days=i)
+        periodo = fecha.strftime('%Y-%m')
+        ventana[periodo] = (ventana.get(periodo, (fecha,))[0], fecha)
+    return ventana
+
+
+def deudas_por_vencer(periodo: str, desde: date, hasta: date, shard: int = 0, shards: int = 1):
+    """
+    Deudas activas que vencen entre `desde` y `hasta`, sin pago registrado
+    ni aviso enviado en `periodo`.
+    
+    El vencimiento se filtra en SQL sobre el índice
+    (activa, proxima_fecha_pago); las pagadas y las ya avisadas se descartan
+    con anti-joins contra ``pagos_deuda`` y ``notificaciones_enviadas``.
+    """
+    ya_notificada = exists().where(
+        NotificacionEnviada.deuda_id == DeudaFija.id,
+        NotificacionEnviada.periodo == periodo
+    )
+    consulta = DeudaFija.query.options(joinedload(DeudaFija.usuario)).filter(
+        DeudaFija.activa.is_(True),
+        DeudaFija.proxima_fecha_pago.between(desde, hasta),
+        DeudasService.condicion_pendiente(periodo),
+        ~ya_notificada
+    )
+    return filtrar_shard(consulta, DeudaFija.usuario_id, shard, shards)
+
+
+def registrar_notificaciones(deuda_ids: List[int], periodo: str) -> None:
+    """Guarda en el registro las deudas ya avisadas en el período."""
+    db.session.add_all([NotificacionEnviada(deuda_id=deuda_id, periodo=periodo)
+                        for deuda_id in deuda_ids])
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Otro proceso registró el mismo aviso: se guardan uno a uno
+        db.session.rollback()
+        for deuda_id in deuda_ids:
+            db.session.add(NotificacionEnviada(deuda_id=deuda_id, periodo=periodo))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+
+
+def por_lotes(consulta, modelo, tamano: int) -> Iterator[list]:
+    """
+    Recorre una consulta en lotes de `tamano` filas ordenadas por id.
+    
+    Cada lote es una consulta nueva (``id > último id``), así que se puede
+    hacer commit entre lotes y la memoria usada no crece con la tabla.
+    """
+    ultimo_id = 0
+    while True:
+        lote = consulta.filter(modelo.id > ultimo_id).order_by(modelo.id).limit(tamano).all()
+        if not lote:
+            return
+        yield lote
+        ultimo_id = lote[-1].id
+
+
+def verificar_recordatorios(app, mail, hoy: Optional[date] = None,
+                            shard: int = 0, shards: int = 1) -> None:
+    """
+    Tarea programada: envía los recordatorios vencidos y los avisos de deudas.
+
+    Args:
+        app: Instancia de Flask
+        mail: Extensión Flask-Mail
+        hoy: Fecha de referencia (por defecto, hoy)
+        shard: Shard a procesar (usuarios con usuario_id mod shards == shard)
+        shards: Número total de shards
+    """
+    with app.app_context():
+        hoy = hoy or datetime.now().date()
+        despachador = DespachadorNotificaciones(
+            app, mail,
+            tamano_lote=app.config.get('NOTIFICACIONES_LOTE', 50),
+            max_hilos=app.config.get('NOTIFICACIONES_HILOS', 4)
+        )
+
+        # Un lote de base de datos llena todos los hilos de envío
+        tamano = despachador.tamano_lote * despachador.max_hilos
+
+        # Verificar recordatorios normales
+        for recordatorios in por_lotes(recordatorios_vencidos(hoy, shard, shards),
+                                       Recordatorio, tamano):
+            mensajes = [(r.id, mensaje_recordatorio(r)) for r in recordatorios]
+            enviados = despachador.enviar(mensajes)
+            if enviados:
+                usuarios = {r.id: r.usuario_id for r in recordatorios}
+                for usuario_id in {usuarios[i] for i in enviados}:
+                    marcar_modificado(usuario_id, 'recordatorios')
+                marcar_enviados(enviados)
+
+        # Verificar deudas fijas (2 días antes), una vez por período
+        DeudasService.actualizar_fechas_pago(hoy, shard, shards)
+        for periodo, (desde, hasta) in ventana_de_aviso(hoy).items():
+            consulta = deudas_por_vencer(periodo, desde, hasta, shard, shards)
+            for deudas in por_lotes(consulta, DeudaFija, tamano):
+                verificar_deudas(app, despachador, deudas, periodo, hoy)
+
+
+def verificar_deudas(app, despachador: DespachadorNotificaciones, deudas: List[DeudaFija],
+                     periodo: str, hoy: date) -> None:
+    """Envía el aviso de un lote de deudas por vencer y lo registra."""
+    mensajes = [(deuda.id, mensaje_deuda(deuda, deuda.proxima_fecha_pago,
+                                         (deuda.proxima_fecha_pago - hoy).days))
+                for deuda in deudas]
+    
+    enviados = despachador.enviar(mensajes)
+    if enviados:
+        registrar_notificaciones(enviados, periodo)
+    
+    titulos = {deuda.id: deuda.titulo for deuda in deudas}
+    for deuda_id in enviados:
+        app.logger.info(f'Notificación de deuda enviada: {titulos[deuda_id]}')
@@ -0,0 +1,105 @@
+"""
+Paginación por cursor (keyset).
+
+Ordena por (fecha, id) descendente y continúa desde la última fila vista,
+evitando el COUNT(*) y el OFFSET de ``paginate()`` en páginas profundas.
+"""
+import base64
+import json
+from datetime import date
+from typing import Optional, List, Any
+from sqlalchemy import or_, and_
+from services.validators import ValidationError
+
+
+def codificar_cursor(fecha: date, id: int) -> str:
+    """
+    Genera un cursor opaco para continuar después de (fecha, id).
+
+    Args:
+        fecha: Fecha de la última fila devuelta
+        id: ID de la última fila devuelta
+
+    Returns:
+        Token en base64 apto para URLs
+    """
+    datos = json.dumps({'f': fecha.isoformat(), 'i': id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor: str):
+    """
+    Decodifica un cursor generado por `codificar_cursor`.
+
+    Args:
+        cursor: Token recibido del cliente
+
+    Returns:
+        Tupla (fecha, id)
+
+    Raises:
+        ValidationError: Si el cursor no es válido
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return date.fromisoformat(datos['f']), int(datos['i'])
+    except (ValueError, KeyError, TypeError):
+        raise ValidationError('El cursor de paginación no es válido')
+
+
+class PaginaCursor:
+    """Página de resultados obtenida con un cursor."""
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str], consulta_total):
+        self.items = items
+        self.next_cursor = next_cursor
+        self._consulta_total = consulta_total
+        self._total = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def total(self) -> int:
+        """Total de filas; el COUNT solo se ejecuta si se solicita."""
+        if self._total is None:
+            self._total = self._consulta_total.order_by(None).count()
+        return self._total
+
+
+def paginar_por_cursor(consulta, modelo, cursor: Optional[str] = None,
+                       limite: int = 10) -> PaginaCursor:
+    """
+    Pagina una consulta por (fecha, id) descendente.
+
+    Args:
+        consulta: Query ya filtrada (por ejemplo, por usuario)
+        modelo: Modelo con columnas ``fecha`` e ``id``
+        cursor: Cursor devuelto por la página anterior (opcional)
+        limite: Número máximo de filas por página
+
+    Returns:
+        PaginaCursor con las filas y el cursor siguiente
+
+    Raises:
+        ValidationError: Si el cursor no es válido
+    """
+    pagina = consulta
+    if cursor:
+        fecha, id = decodificar_cursor(cursor)
+        pagina = pagina.filter(or_(
+            modelo.fecha < fecha,
+            and_(modelo.fecha == fecha, modelo.id < id)
+        ))
+
+    # Se pide una fila de más para saber si existe página siguiente
+    filas = pagina.order_by(modelo.fecha.desc(), modelo.id.desc()).limit(limite + 1).all()
+    items = filas[:limite]
+    next_cursor = None
+    if len(filas) > limite:
+        ultimo = items[-1]
+        next_cursor = codificar_cursor(ultimo.fecha, ultimo.id)
+
+    return PaginaCursor(items, next_cursor, consulta)
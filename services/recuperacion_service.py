@@ -0,0 +1,90 @@
+"""
+Servicio de recuperación de contraseñas.
+
+Los tokens se envían por email y en la base de datos solo se guarda su hash
+SHA-256: la búsqueda es una igualdad sobre ``token_hash`` con el estado y la
+expiración filtrados en SQL (índice ``ix_tokens_recuperacion_busqueda``). Una
+tarea diaria elimina por lotes los tokens usados o expirados.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import or_
+from database import db
+from models import TokenRecuperacion
+
+
+def hash_token(token: str) -> str:
+    """Hash SHA-256 (hex) con el que se guarda un token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RecuperacionService:
+    """Servicio para emitir, validar y limpiar tokens de recuperación."""
+
+    @staticmethod
+    def crear_token(usuario_id: int, horas: int = 24) -> Tuple[str, TokenRecuperacion]:
+        """
+        Emite un token nuevo e invalida los pendientes del usuario.
+
+        Args:
+            usuario_id: ID del usuario
+            horas: Vigencia del token
+
+        Returns:
+            Tupla (token en claro para el email, fila guardada)
+        """
+        token = secrets.token_urlsafe(32)
+        TokenRecuperacion.query.filter_by(usuario_id=usuario_id, usado=False)\
+            .delete(synchronize_session='fetch')
+        token_rec = TokenRecuperacion(
+            usuario_id=usuario_id,
+            token_hash=hash_token(token),
+            fecha_expiracion=datetime.utcnow() + timedelta(hours=horas)
+        )
+        db.session.add(token_rec)
+        db.session.commit()
+        return token, token_rec
+
+    @staticmethod
+    def buscar_token(token: str, ahora: Optional[datetime] = None) -> Optional[TokenRecuperacion]:
+        """
+        Token sin usar y vigente, o None.
+
+        Args:
+            token: Token recibido en el enlace
+            ahora: Momento de referencia en UTC (por defecto, ahora)
+        """
+        return TokenRecuperacion.query.filter(
+            TokenRecuperacion.token_hash == hash_token(token),
+            TokenRecuperacion.usado.is_(False),
+            TokenRecuperacion.fecha_expiracion > (ahora or datetime.utcnow())
+        ).first()
+
+    @staticmethod
+    def eliminar_vencidos(ahora: Optional[datetime] = None, tamano_lote: int = 1000) -> int:
+        """
+        Elimina los tokens usados o expirados, por lotes con un commit cada uno.
+
+        Args:
+            ahora: Momento de referencia en UTC (por defecto, ahora)
+            tamano_lote: Filas eliminadas por sentencia
+
+        Returns:
+            Número de tokens eliminados
+        """
+        ahora = ahora or datetime.utcnow()
+        vencidos = db.session.query(TokenRecuperacion.id).filter(or_(
+            TokenRecuperacion.usado.is_(True),
+            TokenRecuperacion.fecha_expiracion <= ahora
+        )).limit(tamano_lote)
+
+        eliminados = 0
+        while True:
+            ids = [token_id for (token_id,) in vencidos]
+            if not ids:
+                return eliminados
+            eliminados += TokenRecuperacion.query.filter(TokenRecuperacion.id.in_(ids))\
+                .delete(synchronize_session='fetch')
+            db.session.commit()
@@ -0,0 +1,200 @@
+"""
+Servicio de resúmenes mensuales.
+
+Mantiene la tabla ``resumenes_mensuales`` (totales por usuario, mes, tipo y
+categoría) para que los gráficos y estadísticas lean O(meses) filas en lugar
+de sumar todas las transacciones.
+"""
+from typing import Optional, List, Dict, Any
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import func, extract, literal, union_all, select, insert
+from database import db, acumular
+from models import Ingreso, Egreso, ResumenMensual
+from services.cache_usuario import marcar_modificado
+
+
+MODELOS = {'ingreso': Ingreso, 'egreso': Egreso}
+CENTAVO = Decimal('0.01')
+
+
+class ResumenMensualService:
+    """Servicio para mantener y consultar los resúmenes mensuales."""
+
+    @staticmethod
+    def registrar(usuario_id: int, tipo: str, fecha: date, categoria: str,
+                  monto: Decimal, cantidad: int = 1) -> None:
+        """
+        Acumula un movimiento en el resumen de su mes y categoría.
+
+        No hace commit: el cambio forma parte de la transacción del llamador.
+
+        Args:
+            usuario_id: ID del usuario
+            tipo: 'ingreso' o 'egreso'
+            fecha: Fecha de la transacción
+            categoria: Categoría de la transacción
+            monto: Importe a sumar (negativo para restar)
+            cantidad: Número de transacciones a sumar (negativo para restar)
+        """
+        monto = Decimal(str(monto))
+        marcar_modificado(usuario_id, 'resumenes_mensuales')
+        clave = dict(usuario_id=usuario_id, anio=fecha.year, mes=fecha.month,
+                     tipo=tipo, categoria=categoria)
+
+        if cantidad > 0:
+            # Upsert atómico: dos primeras escrituras concurrentes no chocan en la clave
+            acumular(ResumenMensual, clave, {'total': monto, 'cantidad': cantidad})
+            return
+
+        # Ajustes y bajas: solo modifican resúmenes existentes
+        actualizadas = ResumenMensual.query.filter_by(**clave).update({
+            ResumenMensual.total: ResumenMensual.total + monto,
+            ResumenMensual.cantidad: ResumenMensual.cantidad + cantidad
+        }, synchronize_session=False)
+
+        if actualizadas and cantidad < 0:
+            ResumenMensual.query.filter_by(**clave)\
+                .filter(ResumenMensual.cantidad <= 0)\
+                .delete(synchronize_session=False)
+
+    @staticmethod
+    def mover(usuario_id: int, tipo: str, anterior: tuple, nuevo: tuple) -> None:
+        """
+        Traslada una transacción actualizada entre resúmenes.
+
+        Args:
+            usuario_id: ID del usuario
+            tipo: 'ingreso' o 'egreso'
+            anterior: Tupla (fecha, categoria, monto) antes del cambio
+            nuevo: Tupla (fecha, categoria, monto) después del cambio
+        """
+        fecha_ant, categoria_ant, monto_ant = anterior
+        fecha_nueva, categoria_nueva, monto_nuevo = nuevo
+        mismo_grupo = (fecha_ant.year, fecha_ant.month, categoria_ant) == \
+            (fecha_nueva.year, fecha_nueva.month, categoria_nueva)
+
+        if mismo_grupo:
+            diferencia = Decimal(str(monto_nuevo)) - Decimal(str(monto_ant))
+            if diferencia:
+                ResumenMensualService.registrar(usuario_id, tipo, fecha_nueva,
+                                                categoria_nueva, diferencia, cantidad=0)
+            return
+
+        ResumenMensualService.registrar(usuario_id, tipo, fecha_ant, categoria_ant,
+                                        -Decimal(str(monto_ant)), cantidad=-1)
+        ResumenMensualService.registrar(usuario_id, tipo, fecha_nueva, categoria_nueva,
+                                        monto_nuevo)
+
+    @staticmethod
+    def consulta_transacciones(usuario_id: Optional[int] = None):
+        """
+        Agrupa las transacciones originales igual que la tabla de resúmenes.
+
+        Args:
+            usuario_id: Limitar a un usuario (opcional)
+
+        Returns:
+            Select con columnas usuario_id, anio, mes, tipo, categoria, total, cantidad
+        """
+        def _agrupar(tipo, modelo):
+            anio = extract('year', modelo.fecha)
+            mes = extract('month', modelo.fecha)
+            consulta = select(
+                modelo.usuario_id.label('usuario_id'),
+                anio.label('anio'),
+                mes.label('mes'),
+                literal(tipo).label('tipo'),
+                modelo.categoria.label('categoria'),
+                func.sum(modelo.monto).label('total'),
+                func.count(modelo.id).label('cantidad')
+            ).group_by(modelo.usuario_id, anio, mes, modelo.categoria)
+            if usuario_id is not None:
+                consulta = consulta.where(modelo.usuario_id == usuario_id)
+            return consulta
+
+        return union_all(*[_agrupar(tipo, modelo) for tipo, modelo in MODELOS.items()])
+
+    @staticmethod
+    def reconstruir(usuario_id: Optional[int] = None) -> int:
+        """
+        Regenera los resúmenes a partir de las transacciones.
+
+        Args:
+            usuario_id: Reconstruir solo este usuario (por defecto, todos)
+
+        Returns:
+            Número de filas de resumen generadas
+        """
+        borrado = ResumenMensual.query
+        if usuario_id is not None:
+            borrado = borrado.filter_by(usuario_id=usuario_id)
+        borrado.delete(synchronize_session=False)
+
+        origen = ResumenMensualService.consulta_transacciones(usuario_id).subquery()
+        columnas = ['usuario_id', 'anio', 'mes', 'tipo', 'categoria', 'total', 'cantidad']
+        db.session.execute(
+            insert(ResumenMensual).from_select(columnas, select(*[origen.c[c] for c in columnas]))
+        )
+        db.session.commit()
+
+        consulta = ResumenMensual.query
+        if usuario_id is not None:
+            consulta = consulta.filter_by(usuario_id=usuario_id)
+        return consulta.count()
+
+    @staticmethod
+    def verificar(usuario_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Compara los resúmenes con las transacciones originales.
+
+        Args:
+            usuario_id: Verificar solo este usuario (por defecto, todos)
+
+        Returns:
+            Lista de diferencias; vacía si los resúmenes son consistentes
+        """
+        def _clave(fila):
+            return (fila.usuario_id, int(fila.anio), int(fila.mes), fila.tipo, fila.categoria)
+
+        def _valor(fila):
+            return (Decimal(str(fila.total or 0)).quantize(CENTAVO), fila.cantidad)
+
+        esperado = {
+            _clave(f): _valor(f)
+            for f in db.session.execute(ResumenMensualService.consulta_transacciones(usuario_id))
+        }
+
+        consulta = ResumenMensual.query
+        if usuario_id is not None:
+            consulta = consulta.filter_by(usuario_id=usuario_id)
+        actual = {_clave(f): _valor(f) for f in consulta}
+
+        diferencias = []
+        for clave in sorted(set(esperado) | set(actual), key=str):
+            if esperado.get(clave) != actual.get(clave):
+                diferencias.append({
+                    'clave': clave,
+                    'esperado': esperado.get(clave),
+                    'actual': actual.get(clave)
+                })
+        return diferencias
+
+    @staticmethod
+    def obtener_desde(usuario_id: int, desde: date):
+        """
+        Obtiene los resúmenes de un usuario a partir del mes de `desde`.
+
+        Returns:
+            Filas (tipo, anio, mes, categoria, total)
+        """
+        return db.session.query(
+            ResumenMensual.tipo,
+            ResumenMensual.anio,
+            ResumenMensual.mes,
+            ResumenMensual.categoria,
+            ResumenMensual.total
+        ).filter(
+            ResumenMensual.usuario_id == usuario_id,
+            ResumenMensual.anio * 12 + ResumenMensual.mes >= desde.year * 12 + desde.month
+        ).all()
@@ -0,0 +1,146 @@
+"""
+Tokens firmados para acceder a la API sin cookie de sesión.
+
+Un token tiene la forma ``<usuario_id>.<version>.<expira>.<jti>.<firma>``: la
+firma es un HMAC-SHA256 de los demás campos con la clave de la aplicación, así
+que cualquier worker lo verifica sin crear sesión. ``version`` es la versión
+de tokens del usuario al emitirlo (``User.version_tokens``), que se compara
+con la del usuario en la caché de identidad: cambiar la contraseña o revocar
+todos los tokens la incrementa e invalida los emitidos antes.
+
+Los tokens revocados uno a uno antes de expirar se guardan en
+``tokens_api_revocados``; cada worker mantiene en memoria la lista de
+revocados vigentes y la vuelve a leer cuando vence su TTL. Una revocación
+tarda como máximo ese TTL (o ``IDENTIDAD_CACHE_TTL``, al revocar todos) en
+aplicarse en los demás workers.
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import FrozenSet, Optional, Tuple
+from database import db
+from models import TokenApiRevocado, User
+from services.cache_usuario import marcar_modificado
+
+
+PREFIJO_AUTORIZACION = 'Bearer '
+
+
+def _firma(clave: bytes, datos: str) -> str:
+    digest = hmac.new(clave, datos.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def token_de_peticion(request) -> Optional[str]:
+    """Token del encabezado ``Authorization: Bearer`` de la petición, si lo hay."""
+    autorizacion = request.headers.get('Authorization', '')
+    if autorizacion.startswith(PREFIJO_AUTORIZACION):
+        return autorizacion[len(PREFIJO_AUTORIZACION):].strip() or None
+    return None
+
+
+class TokensApi:
+    """Emisión, verificación y revocación de tokens de la API."""
+
+    def __init__(self, secreto: str, duracion: timedelta, cache, identidad):
+        """
+        Args:
+            secreto: Clave de firma de los tokens
+            duracion: Vigencia de los tokens emitidos
+            cache: Caché en memoria de la lista de revocados (``CacheLRU``)
+            identidad: Caché de identidad con la versión de tokens de cada usuario
+        """
+        # Clave derivada: los tokens no sirven como firma de otros datos de la app
+        self.clave = hashlib.sha256(f'tokens-api:{secreto}'.encode()).digest()
+        self.duracion = duracion
+        self.cache = cache
+        self.identidad = identidad
+
+    def generar(self, usuario_id: int, version: int = 0) -> Tuple[str, datetime]:
+        """
+        Emite un token para el usuario.
+
+        Args:
+            usuario_id: ID del usuario
+            version: Versión de tokens vigente del usuario
+
+        Returns:
+            Tupla (token, fecha de expiración en UTC)
+        """
+        expira = int(time.time() + self.duracion.total_seconds())
+        datos = f'{usuario_id}.{version}.{expira}.{secrets.token_hex(16)}'
+        return f'{datos}.{_firma(self.clave, datos)}', datetime.utcfromtimestamp(expira)
+
+    def _decodificar(self, token: str) -> Optional[Tuple[int, int, int, str]]:
+        """Campos (usuario_id, version, expira, jti) de un token bien firmado."""
+        try:
+            datos, firma = token.rsplit('.', 1)
+            usuario_id, version, expira, jti = datos.split('.')
+            campos = int(usuario_id), int(version), int(expira), jti
+        except ValueError:
+            return None
+        # En bytes: compare_digest no admite str con caracteres no ASCII
+        if not hmac.compare_digest(firma.encode(), _firma(self.clave, datos).encode()):
+            return None
+        return campos
+
+    def verificar(self, token: str) -> Optional[int]:
+        """
+        Comprueba firma, expiración, revocación y versión de tokens del usuario
+        con las cachés en memoria (la base de datos solo se consulta al
+        renovarlas).
+
+        Returns:
+            ID del usuario del token, o None si no es válido
+        """
+        campos = self._decodificar(token)
+        if campos is None:
+            return None
+        usuario_id, version, expira, jti = campos
+        if expira <= time.time() or jti in self.revocados():
+            return None
+        usuario = self.identidad.cargar(usuario_id)
+        if usuario is None or usuario.version_tokens != version:
+            return None
+        return usuario_id
+
+    def revocados(self) -> FrozenSet[str]:
+        """Identificadores de los tokens revocados que aún no expiraron."""
+        revocados = self.cache.obtener('revocados')
+        if revocados is None:
+            revocados = frozenset(jti for (jti,) in db.session.query(TokenApiRevocado.jti)
+                                  .filter(TokenApiRevocado.fecha_expiracion > datetime.utcnow()))
+            self.cache.guardar('revocados', revocados)
+        return revocados
+
+    def revocar(self, token: str) -> bool:
+        """
+        Revoca un token válido y elimina las revocaciones ya expiradas.
+
+        Returns:
+            True si el token era válido y quedó revocado
+        """
+        campos = self._decodificar(token)
+        if campos is None or self.verificar(token) is None:
+            return False
+        usuario_id, _, expira, jti = campos
+
+        TokenApiRevocado.query.filter(TokenApiRevocado.fecha_expiracion <= datetime.utcnow())\
+            .delete(synchronize_session=False)
+        db.session.add(TokenApiRevocado(jti=jti, usuario_id=usuario_id,
+                                        fecha_expiracion=datetime.utcfromtimestamp(expira)))
+        db.session.commit()
+        self.cache.eliminar('revocados')
+        return True
+
+    @staticmethod
+    def revocar_todos(usuario_id: int) -> None:
+        """Invalida todos los tokens emitidos al usuario incrementando su versión."""
+        User.query.filter_by(id=usuario_id).update(
+            {User.version_tokens: User.version_tokens + 1}, synchronize_session=False
+        )
+        marcar_modificado(usuario_id, 'users')
+        db.session.commit()
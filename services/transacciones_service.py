@@ -3,17 +3,24 @@ Servicio de transacciones.
 
 Contiene la lógica de negocio para ingresos y egresos.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Iterable
 from datetime import date
 from decimal import Decimal
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
 from database import db
 from models import Ingreso, Egreso
+from services.resumen_service import ResumenMensualService
+from services.cache_usuario import marcar_modificado
 from services.validators import (
     validate_monto, validate_fecha, validate_texto, 
     validate_categoria, ValidationError
 )
 
 
+MODELOS = {'ingreso': Ingreso, 'egreso': Egreso}
+
+
 class TransaccionesService:
     """Servicio para gestionar transacciones financieras."""
     
@@ -63,6 +70,7 @@ class TransaccionesService:
         )
         
         db.session.add(ingreso)
+        ResumenMensualService.registrar(usuario_id, 'ingreso', fecha_date, categoria, monto_decimal)
         db.session.commit()
         
         return ingreso
@@ -88,6 +96,8 @@ class TransaccionesService:
         Raises:
             ValidationError: Si los datos no son válidos
         """
+        anterior = (ingreso.fecha, ingreso.categoria, ingreso.monto)
+        
         if monto is not None:
             es_valido, error, monto_decimal = validate_monto(monto)
             if not es_valido:
@@ -112,6 +122,8 @@ class TransaccionesService:
                 raise ValidationError(error)
             ingreso.fecha = fecha_date
         
+        ResumenMensualService.mover(ingreso.usuario_id, 'ingreso', anterior,
+                                    (ingreso.fecha, ingreso.categoria, ingreso.monto))
         db.session.commit()
         return ingreso
     
@@ -123,6 +135,8 @@ class TransaccionesService:
         Args:
             ingreso: Ingreso a eliminar
         """
+        ResumenMensualService.registrar(ingreso.usuario_id, 'ingreso', ingreso.fecha,
+                                        ingreso.categoria, -ingreso.monto, cantidad=-1)
         db.session.delete(ingreso)
         db.session.commit()
     
@@ -172,6 +186,7 @@ class TransaccionesService:
         )
         
         db.session.add(egreso)
+        ResumenMensualService.registrar(usuario_id, 'egreso', fecha_date, categoria, monto_decimal)
         db.session.commit()
         
         return egreso
@@ -197,6 +212,8 @@ class TransaccionesService:
         Raises:
             ValidationError: Si los datos no son válidos
         """
+        anterior = (egreso.fecha, egreso.categoria, egreso.monto)
+        
         if monto is not None:
             es_valido, error, monto_decimal = validate_monto(monto)
             if not es_valido:
@@ -221,6 +238,8 @@ class TransaccionesService:
                 raise ValidationError(error)
             egreso.fecha = fecha_date
         
+        ResumenMensualService.mover(egreso.usuario_id, 'egreso', anterior,
+                                    (egreso.fecha, egreso.categoria, egreso.monto))
         db.session.commit()
         return egreso
     
@@ -232,7 +251,130 @@ class TransaccionesService:
         Args:
             egreso: Egreso a eliminar
         """
+        ResumenMensualService.registrar(egreso.usuario_id, 'egreso', egreso.fecha,
+                                        egreso.categoria, -egreso.monto, cantidad=-1)
         db.session.delete(egreso)
         db.session.commit()
-
-
+    
+    @staticmethod
+    def _validar_fila(fila: Dict[str, Any], tipo_defecto: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Valida una fila de importación y la convierte en valores de columna.
+        
+        Raises:
+            ValidationError: Si la fila no es válida
+        """
+        if not isinstance(fila, dict):
+            raise ValidationError('Cada fila debe ser un objeto')
+        
+        # Las filas JSON pueden traer cualquier tipo: se rechazan antes de validar
+        for campo in ('tipo', 'fecha', 'descripcion', 'categoria'):
+            if fila.get(campo) is not None and not isinstance(fila[campo], str):
+                raise ValidationError(f"El campo '{campo}' debe ser texto")
+        if fila.get('monto') is not None and (
+                isinstance(fila['monto'], bool) or not isinstance(fila['monto'], (str, int, float))):
+            raise ValidationError("El campo 'monto' debe ser un número")
+        
+        tipo = fila.get('tipo') or tipo_defecto
+        if tipo not in MODELOS:
+            raise ValidationError("El tipo debe ser 'ingreso' o 'egreso'")
+        
+        monto = fila.get('monto')
+        es_valido, error, monto_decimal = validate_monto(str(monto) if monto is not None else '')
+        if not es_valido:
+            raise ValidationError(error)
+        
+        es_valido, error, fecha_date = validate_fecha(fila.get('fecha'))
+        if not es_valido:
+            raise ValidationError(error)
+        
+        descripcion = fila.get('descripcion')
+        es_valido, error = validate_texto(descripcion, "Descripción", max_length=255)
+        if not es_valido:
+            raise ValidationError(error)
+        
+        categoria = fila.get('categoria')
+        es_valido, error = validate_categoria(categoria, tipo)
+        if not es_valido:
+            raise ValidationError(error)
+        
+        return {
+            'tipo': tipo,
+            'monto': monto_decimal,
+            'descripcion': descripcion,
+            'categoria': categoria,
+            'fecha': fecha_date
+        }
+    
+    @staticmethod
+    def importar_lote(usuario_id: int, filas: Iterable[Dict[str, Any]],
+                      tamano_lote: int = 500,
+                      tipo_defecto: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Importa muchas transacciones con inserciones por lotes.
+        
+        Todas las filas se validan primero; las válidas se insertan con un
+        único INSERT multi-fila por tipo y un commit por lote. Las filas
+        con errores se informan sin abortar el resto de la importación.
+        
+        Args:
+            usuario_id: ID del usuario
+            filas: Filas con tipo, monto, descripcion, categoria y fecha
+            tamano_lote: Número de filas por commit
+            tipo_defecto: Tipo para las filas que no lo indiquen (opcional)
+            
+        Returns:
+            Diccionario con 'creados' y 'errores' (lista de {'fila', 'error'},
+            numeradas desde 1)
+        """
+        validas = []
+        errores = []
+        for numero, fila in enumerate(filas, 1):
+            try:
+                validas.append((numero, TransaccionesService._validar_fila(fila, tipo_defecto)))
+            except ValidationError as e:
+                errores.append({'fila': numero, 'error': str(e)})
+        
+        creados = 0
+        for inicio in range(0, len(validas), tamano_lote):
+            lote = validas[inicio:inicio + tamano_lote]
+            por_tipo: Dict[str, List[Dict[str, Any]]] = {'ingreso': [], 'egreso': []}
+            for _, valores in lote:
+                por_tipo[valores['tipo']].append(valores)
+            
+            try:
+                for tipo, valores_tipo in por_tipo.items():
+                    if not valores_tipo:
+                        continue
+                    db.session.execute(insert(MODELOS[tipo]), [{
+                        'usuario_id': usuario_id,
+                        'monto': v['monto'],
+                        'descripcion': v['descripcion'],
+                        'categoria': v['categoria'],
+                        'fecha': v['fecha']
+                    } for v in valores_tipo])
+                    marcar_modificado(usuario_id, MODELOS[tipo].__tablename__)
+                    TransaccionesService._registrar_resumen_lote(usuario_id, tipo, valores_tipo)
+                db.session.commit()
+                creados += len(lote)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                errores.extend({'fila': numero, 'error': f'Error al guardar: {e.__class__.__name__}'}
+                               for numero, _ in lote)
+        
+        errores.sort(key=lambda e: e['fila'])
+        return {'creados': creados, 'errores': errores}
+    
+    @staticmethod
+    def _registrar_resumen_lote(usuario_id: int, tipo: str, valores: List[Dict[str, Any]]) -> None:
+        """Acumula un lote en los resúmenes mensuales con una operación por grupo."""
+        grupos: Dict[tuple, List[Any]] = {}
+        for v in valores:
+            clave = (v['fecha'].year, v['fecha'].month, v['categoria'])
+            grupo = grupos.setdefault(clave, [Decimal('0'), 0])
+            grupo[0] += v['monto']
+            grupo[1] += 1
+        
+        for (anio, mes, categoria), (total, cantidad) in grupos.items():
+            ResumenMensualService.registrar(usuario_id, tipo, date(anio, mes, 1),
+                                            categoria, total, cantidad=cantidad)
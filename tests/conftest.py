@@ -58,6 +58,32 @@ def usuario_test(app):
         return usuario
 
 
+@pytest.fixture
+def usuario_en_sesion(app):
+    """Fábrica de usuarios guardados y ligados a la sesión de la prueba."""
+    def crear(email='usuario@example.com', nombre='Usuario', password='password123'):
+        usuario = User(nombre=nombre, email=email)
+        usuario.set_password(password)
+        db.session.add(usuario)
+        db.session.commit()
+        return usuario
+    return crear
+
+
+@pytest.fixture
+def usuario(usuario_en_sesion):
+    """Usuario (usuario@example.com / password123) ligado a la sesión de la prueba."""
+    return usuario_en_sesion()
+
+
+@pytest.fixture
+def cliente(app, usuario):
+    """Cliente de prueba con la sesión de `usuario` iniciada."""
+    cliente = app.test_client()
+    cliente.post('/login', data={'email': usuario.email, 'password': 'password123'})
+    return cliente
+
+
 @pytest.fixture
 def usuario_autenticado(client, usuario_test):
     """Autentica un usuario para las pruebas."""
@@ -0,0 +1,41 @@
+"""
+Pruebas para los bloqueos de tareas programadas.
+"""
+from datetime import datetime, timedelta
+from database import db
+from models import BloqueoTarea
+from services.bloqueo_service import BloqueoService
+
+
+class TestBloqueoService:
+    """Pruebas para el lease de tareas entre procesos."""
+
+    def test_un_solo_proceso_obtiene_el_bloqueo(self, app):
+        """Prueba que el segundo proceso no tome un lease vigente."""
+        assert BloqueoService.adquirir('tarea', 'worker-1', '2024-03-10')
+        assert not BloqueoService.adquirir('tarea', 'worker-2', '2024-03-10')
+
+    def test_periodo_completado_no_se_repite(self, app):
+        """Prueba que una tarea completada no vuelva a correr en el mismo período."""
+        assert BloqueoService.adquirir('tarea', 'worker-1', '2024-03-10')
+        BloqueoService.completar('tarea', 'worker-1', '2024-03-10')
+
+        assert not BloqueoService.adquirir('tarea', 'worker-2', '2024-03-10')
+        assert BloqueoService.adquirir('tarea', 'worker-2', '2024-03-11')
+
+    def test_liberar_permite_reintentar(self, app):
+        """Prueba que un fallo libere el bloqueo sin marcar el período."""
+        assert BloqueoService.adquirir('tarea', 'worker-1', '2024-03-10')
+        BloqueoService.liberar('tarea', 'worker-1')
+
+        assert BloqueoService.adquirir('tarea', 'worker-2', '2024-03-10')
+
+    def test_lease_vencido_se_recupera(self, app):
+        """Prueba tomar el bloqueo de un proceso que murió sin liberarlo."""
+        assert BloqueoService.adquirir('tarea', 'worker-1', '2024-03-10')
+        BloqueoTarea.query.filter_by(nombre='tarea').update(
+            {BloqueoTarea.expira: datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+
+        assert BloqueoService.adquirir('tarea', 'worker-2', '2024-03-10')
+        assert db.session.get(BloqueoTarea, 'tarea').propietario == 'worker-2'
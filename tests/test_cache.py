@@ -0,0 +1,50 @@
+"""
+Pruebas para las cachés de resultados.
+"""
+from services.cache import CacheLRU, clave_hash, crear_cache
+
+
+class TestCacheLRU:
+    """Pruebas para la caché en memoria."""
+
+    def test_guarda_y_cuenta_aciertos(self):
+        """Prueba leer valores guardados y contar aciertos y fallos."""
+        cache = CacheLRU(max_entradas=10, ttl=60)
+        cache.guardar('a', {'valor': 1})
+
+        assert cache.obtener('a') == {'valor': 1}
+        assert cache.obtener('b') is None
+        assert cache.estadisticas() == {'aciertos': 1, 'fallos': 1, 'entradas': 1}
+
+    def test_descarta_la_menos_usada(self):
+        """Prueba que al superar el máximo se descarte la entrada menos usada."""
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        cache.guardar('a', 1)
+        cache.guardar('b', 2)
+        cache.obtener('a')
+        cache.guardar('c', 3)
+
+        assert cache.obtener('b') is None
+        assert cache.obtener('a') == 1
+        assert cache.obtener('c') == 3
+
+    def test_entradas_vencidas(self):
+        """Prueba que una entrada vencida no se devuelva."""
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        cache.guardar('a', 1, ttl=0)
+
+        assert cache.obtener('a') is None
+        assert cache.estadisticas()['entradas'] == 0
+
+    def test_sin_redis_usa_memoria(self):
+        """Prueba crear una caché en memoria si no hay URL de Redis."""
+        assert isinstance(crear_cache('prueba'), CacheLRU)
+
+
+class TestClaveHash:
+    """Pruebas para las claves de caché."""
+
+    def test_no_depende_del_orden_de_claves(self):
+        """Prueba que diccionarios iguales generen la misma clave."""
+        assert clave_hash({'a': 1, 'b': 2}) == clave_hash({'b': 2, 'a': 1})
+        assert clave_hash({'a': 1}) != clave_hash({'a': 2})
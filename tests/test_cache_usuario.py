@@ -0,0 +1,141 @@
+"""
+Pruebas para la caché por usuario de las respuestas de la API.
+"""
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import Meta
+from services.cache import CacheLRU
+from services.cache_usuario import CacheUsuario, marcar_modificado
+
+
+def _meta(usuario, titulo='Viaje'):
+    return Meta(usuario_id=usuario.id, titulo=titulo, monto_objetivo=Decimal('1000'),
+                fecha_limite=date(2030, 1, 1))
+
+
+class TestCacheUsuario:
+    """Pruebas para las claves versionadas."""
+
+    def test_invalidar_cambia_la_clave(self, app):
+        """Prueba que una versión nueva deje de usar las respuestas anteriores."""
+        cache = CacheUsuario(CacheLRU())
+        clave = cache.clave(1, 'metas', {'a': 1})
+        cache.guardar(clave, 'respuesta')
+
+        assert cache.clave(1, 'metas', {'a': 1}) == clave
+        assert cache.clave(2, 'metas', {'a': 1}) != clave
+
+        cache.invalidar(1)
+
+        assert cache.clave(1, 'metas', {'a': 1}) != clave
+
+    def test_versiones_compartidas_entre_workers(self, app, usuario):
+        """Prueba que otra instancia (otro worker) vea la versión nueva tras el commit."""
+        worker_a, worker_b = CacheUsuario(CacheLRU()), CacheUsuario(CacheLRU())
+        clave = worker_b.clave(usuario.id, 'metas', tablas=['metas'])
+        worker_b.guardar(clave, 'respuesta')
+
+        db.session.add(_meta(usuario))
+        db.session.commit()
+
+        assert worker_a.version(usuario.id, ['metas']) == worker_b.version(usuario.id, ['metas'])
+        assert worker_b.obtener(worker_b.clave(usuario.id, 'metas', tablas=['metas'])) is None
+
+    def test_invalidar_por_tabla(self, app):
+        """Prueba que cambiar una tabla no invalide las respuestas de otras."""
+        cache = CacheUsuario(CacheLRU())
+        metas = cache.version(1, ['metas'])
+        ahorros = cache.version(1, ['ahorros'])
+        todas = cache.version(1)
+
+        cache.invalidar(1, ['metas'])
+
+        assert cache.version(1, ['metas']) != metas
+        assert cache.version(1, ['ahorros']) == ahorros
+        assert cache.version(1) != todas
+
+    def test_sin_guardar_respuestas(self, app):
+        """Prueba que con las respuestas desactivadas solo se usen las versiones."""
+        cache = CacheUsuario(CacheLRU(), guardar_respuestas=False)
+        clave = cache.clave(1, 'metas')
+        cache.guardar(clave, 'respuesta')
+
+        assert cache.obtener(clave) is None
+        assert cache.estadisticas()['entradas'] == 0
+
+
+class TestInvalidacion:
+    """Pruebas para la invalidación al confirmar cambios."""
+
+    def test_commit_invalida_al_usuario(self, app, usuario):
+        """Prueba que un commit con filas del usuario le asigne otra versión."""
+        cache = app.extensions['cache_usuarios']
+        antes = cache.version(usuario.id)
+
+        db.session.add(_meta(usuario))
+        db.session.commit()
+
+        assert cache.version(usuario.id) != antes
+
+    def test_commit_invalida_solo_la_tabla(self, app, usuario):
+        """Prueba que el commit invalide la tabla de las filas modificadas."""
+        cache = app.extensions['cache_usuarios']
+        metas = cache.version(usuario.id, ['metas'])
+        ingresos = cache.version(usuario.id, ['ingresos'])
+
+        db.session.add(_meta(usuario))
+        db.session.commit()
+
+        assert cache.version(usuario.id, ['metas']) != metas
+        assert cache.version(usuario.id, ['ingresos']) == ingresos
+
+    def test_rollback_no_invalida(self, app, usuario):
+        """Prueba que los cambios descartados no invaliden la caché."""
+        cache = app.extensions['cache_usuarios']
+        antes = cache.version(usuario.id)
+
+        db.session.add(_meta(usuario))
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+
+        assert cache.version(usuario.id) == antes
+
+    def test_marcar_modificado(self, app, usuario):
+        """Prueba invalidar tras operaciones masivas marcadas a mano."""
+        cache = app.extensions['cache_usuarios']
+        antes = cache.version(usuario.id)
+
+        marcar_modificado(usuario.id, 'metas')
+        assert cache.version(usuario.id) == antes
+        db.session.commit()
+
+        assert cache.version(usuario.id) != antes
+
+
+class TestRespuestasEnCache:
+    """Pruebas para los endpoints de lectura cacheados."""
+
+    def test_etag_y_304(self, app, cliente):
+        """Prueba responder 304 si el cliente ya tiene la versión vigente."""
+        respuesta = cliente.get('/api/metas')
+        etag = respuesta.headers['ETag']
+
+        assert respuesta.status_code == 200
+        assert respuesta.get_json() == {'metas': []}
+
+        repetida = cliente.get('/api/metas', headers={'If-None-Match': etag})
+        assert repetida.status_code == 304
+        assert repetida.headers['ETag'] == etag
+
+    def test_escritura_invalida_la_respuesta(self, app, cliente):
+        """Prueba que crear una meta por la API cambie el ETag y el contenido."""
+        etag = cliente.get('/api/metas').headers['ETag']
+
+        cliente.post('/api/metas', json={'titulo': 'Casa', 'monto_objetivo': 500,
+                                         'fecha_limite': '2030-01-01'})
+        respuesta = cliente.get('/api/metas', headers={'If-None-Match': etag})
+
+        assert respuesta.status_code == 200
+        assert [m['titulo'] for m in respuesta.get_json()['metas']] == ['Casa']
@@ -0,0 +1,93 @@
+"""
+Pruebas para las peticiones GET condicionales del dashboard y los listados.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import Ingreso, Meta
+from utils.condicional import PAGINAS_CONDICIONALES
+
+
+def _ingreso(usuario, monto='100'):
+    return Ingreso(usuario_id=usuario.id, monto=Decimal(monto), descripcion='Sueldo',
+                   categoria='Salario', fecha=date.today())
+
+
+class TestPeticionesCondicionales:
+    """Pruebas para ETag, Last-Modified y 304."""
+
+    @pytest.mark.parametrize('url', ['/dashboard', '/ingresos', '/api/ingresos'])
+    def test_etag_y_304(self, app, cliente, url):
+        """Prueba responder 304 si el cliente ya tiene la versión vigente."""
+        respuesta = cliente.get(url)
+        etag = respuesta.headers['ETag']
+
+        assert respuesta.status_code == 200
+        assert 'Last-Modified' in respuesta.headers
+        assert respuesta.headers['Cache-Control'] == 'private, no-cache'
+
+        repetida = cliente.get(url, headers={'If-None-Match': etag})
+        assert repetida.status_code == 304
+        assert repetida.data == b''
+
+    def test_if_modified_since_sin_etag(self, app, cliente):
+        """Prueba que Last-Modified solo no baste: dos cambios pueden caer en el mismo segundo."""
+        modificado = cliente.get('/ingresos').headers['Last-Modified']
+
+        respuesta = cliente.get('/ingresos', headers={'If-Modified-Since': modificado})
+
+        assert respuesta.status_code == 200
+
+    def test_cambio_en_el_mismo_segundo(self, app, cliente, usuario):
+        """Prueba que un cambio inmediatamente posterior invalide el ETag."""
+        anterior = cliente.get('/ingresos')
+
+        db.session.add(_ingreso(usuario))
+        db.session.commit()
+        respuesta = cliente.get('/ingresos', headers={
+            'If-None-Match': anterior.headers['ETag'],
+            'If-Modified-Since': anterior.headers['Last-Modified']
+        })
+
+        assert respuesta.status_code == 200
+
+    def test_cambio_en_la_tabla_invalida(self, app, cliente, usuario):
+        """Prueba que un ingreso nuevo cambie el ETag del listado y del dashboard."""
+        etags = {url: cliente.get(url).headers['ETag'] for url in ('/ingresos', '/dashboard')}
+
+        db.session.add(_ingreso(usuario))
+        db.session.commit()
+
+        for url, etag in etags.items():
+            respuesta = cliente.get(url, headers={'If-None-Match': etag})
+            assert respuesta.status_code == 200
+            assert respuesta.headers['ETag'] != etag
+
+    def test_cambio_en_otra_tabla_no_invalida(self, app, cliente, usuario):
+        """Prueba que una meta nueva no invalide el listado de ingresos."""
+        etag = cliente.get('/ingresos').headers['ETag']
+
+        db.session.add(Meta(usuario_id=usuario.id, titulo='Viaje',
+                            monto_objetivo=Decimal('1000'), fecha_limite=date(2030, 1, 1)))
+        db.session.commit()
+
+        assert cliente.get('/ingresos', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_parametros_cambian_el_etag(self, app, cliente):
+        """Prueba que cada página del listado tenga su propio ETag."""
+        etag = cliente.get('/ingresos').headers['ETag']
+
+        assert cliente.get('/ingresos?cursor=x').headers['ETag'] != etag
+
+    def test_paginas_no_registradas(self, app, cliente):
+        """Prueba que las vistas fuera del registro no lleven ETag."""
+        assert 'metas.nueva_meta' not in PAGINAS_CONDICIONALES
+        assert 'ETag' not in cliente.get('/metas/nueva').headers
+
+    def test_sin_sesion_redirige(self, app, client):
+        """Prueba que sin sesión se mantenga la redirección al login."""
+        respuesta = client.get('/dashboard')
+
+        assert respuesta.status_code == 302
+        assert 'ETag' not in respuesta.headers
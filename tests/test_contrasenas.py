@@ -0,0 +1,99 @@
+"""
+Pruebas para el hash de contraseñas.
+"""
+import threading
+import pytest
+from werkzeug.security import generate_password_hash
+from database import db
+from services import contrasenas
+from services.contrasenas import (VerificadorContrasenas, ContrasenasSaturadasError,
+                                  metodo_hash)
+
+
+class TestMetodoHash:
+    """Pruebas para los parámetros de hash configurados."""
+
+    def test_metodos_completos(self):
+        """Prueba completar los parámetros como los guarda werkzeug."""
+        assert metodo_hash() == 'scrypt:32768:8:1'
+        assert metodo_hash('scrypt', 16384) == 'scrypt:16384:8:1'
+        assert metodo_hash('pbkdf2') == 'pbkdf2:sha256:600000'
+        assert metodo_hash('pbkdf2:sha512', 1000) == 'pbkdf2:sha512:1000'
+
+    def test_metodo_no_soportado(self):
+        """Prueba rechazar métodos desconocidos."""
+        with pytest.raises(ValueError):
+            metodo_hash('md5')
+
+    def test_hash_con_la_configuracion(self, app, usuario):
+        """Prueba que set_password use el método configurado."""
+        assert usuario.password_hash.startswith('pbkdf2:sha256:1000$')
+        assert not contrasenas.necesita_rehash(usuario.password_hash)
+
+
+class TestRehash:
+    """Pruebas para regenerar hashes con parámetros anteriores."""
+
+    def test_login_regenera_hash_antiguo(self, app, client, usuario):
+        """Prueba que iniciar sesión actualice un hash con otros parámetros."""
+        usuario.password_hash = generate_password_hash('password123', 'pbkdf2:sha256:500')
+        db.session.commit()
+
+        client.post('/login', data={'email': 'usuario@example.com', 'password': 'password123'})
+
+        assert usuario.password_hash.startswith('pbkdf2:sha256:1000$')
+        assert usuario.check_password('password123')
+
+    def test_contrasena_incorrecta_no_regenera(self, app, usuario):
+        """Prueba que una contraseña incorrecta no modifique el hash."""
+        antiguo = generate_password_hash('password123', 'pbkdf2:sha256:500')
+        usuario.password_hash = antiguo
+        db.session.commit()
+
+        assert not contrasenas.autenticar(usuario, 'incorrecta')
+        assert usuario.password_hash == antiguo
+
+
+class TestVerificadorContrasenas:
+    """Pruebas para el pool acotado de hashes."""
+
+    def test_ejecuta_en_el_pool(self):
+        """Prueba calcular en un hilo del pool."""
+        verificador = VerificadorContrasenas(hilos=1, max_pendientes=0)
+
+        nombre = verificador.ejecutar(lambda: threading.current_thread().name)
+
+        assert nombre.startswith('contrasenas')
+
+    def test_cola_llena(self):
+        """Prueba rechazar hashes cuando el pool y su cola están ocupados."""
+        verificador = VerificadorContrasenas(hilos=1, max_pendientes=0)
+        iniciado, liberar = threading.Event(), threading.Event()
+
+        def hash_lento():
+            iniciado.set()
+            liberar.wait()
+
+        ocupado = threading.Thread(target=verificador.ejecutar, args=(hash_lento,))
+        ocupado.start()
+        iniciado.wait()
+        try:
+            with pytest.raises(ContrasenasSaturadasError):
+                verificador.ejecutar(lambda: None)
+        finally:
+            liberar.set()
+            ocupado.join()
+
+        assert verificador.ejecutar(lambda: 'libre') == 'libre'
+
+    def test_saturacion_responde_503(self, app, client, usuario):
+        """Prueba responder 503 con Retry-After si no hay cupo para el hash."""
+        verificador = VerificadorContrasenas(hilos=1, max_pendientes=0)
+        verificador._cupos.acquire()
+        app.extensions['verificador_contrasenas'] = verificador
+
+        respuesta = client.post('/api/tokens', json={'email': 'usuario@example.com',
+                                                     'password': 'password123'})
+
+        assert respuesta.status_code == 503
+        assert respuesta.headers['Retry-After'] == '1'
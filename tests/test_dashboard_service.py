@@ -0,0 +1,81 @@
+"""
+Pruebas para el servicio del dashboard.
+"""
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import User, Ingreso, Egreso
+from services.dashboard_service import DashboardService, sumar_meses
+from services.resumen_service import ResumenMensualService
+
+
+class TestSumarMeses:
+    """Pruebas para el desplazamiento de meses."""
+
+    def test_retrocede_cambiando_de_anio(self):
+        """Prueba retroceder meses cruzando el cambio de año."""
+        assert sumar_meses(date(2024, 2, 15), -3) == date(2023, 11, 1)
+
+    def test_avanza_cambiando_de_anio(self):
+        """Prueba avanzar meses cruzando el cambio de año."""
+        assert sumar_meses(date(2024, 12, 31), 1) == date(2025, 1, 1)
+
+
+class TestDashboardService:
+    """Pruebas para la agregación del dashboard."""
+
+    def test_resumen_vacio(self, app, usuario):
+        """Prueba el resumen de un usuario sin transacciones."""
+        resumen = DashboardService.obtener_resumen(usuario.id, date(2024, 3, 10))
+
+        assert resumen.ingresos_mes == 0
+        assert resumen.egresos_mes == 0
+        assert resumen.balance_mes == 0
+        assert resumen.meses == ['Oct 2023', 'Nov 2023', 'Dec 2023',
+                                 'Jan 2024', 'Feb 2024', 'Mar 2024']
+        assert resumen.ingresos_grafico == [0.0] * 6
+
+    def test_resumen_agrupa_por_mes_y_categoria(self, app, usuario):
+        """Prueba totales del mes, serie mensual y desglose por categoría."""
+        db.session.add_all([
+            Ingreso(usuario_id=usuario.id, monto=Decimal('1000'), descripcion='a',
+                    categoria='Salario', fecha=date(2024, 3, 1)),
+            Ingreso(usuario_id=usuario.id, monto=Decimal('200'), descripcion='b',
+                    categoria='Ventas', fecha=date(2024, 3, 5)),
+            Ingreso(usuario_id=usuario.id, monto=Decimal('900'), descripcion='c',
+                    categoria='Salario', fecha=date(2024, 1, 31)),
+            Ingreso(usuario_id=usuario.id, monto=Decimal('50'), descripcion='fuera',
+                    categoria='Salario', fecha=date(2023, 9, 30)),
+            Egreso(usuario_id=usuario.id, monto=Decimal('300'), descripcion='d',
+                   categoria='Vivienda', fecha=date(2024, 3, 2)),
+            Egreso(usuario_id=usuario.id, monto=Decimal('40'), descripcion='e',
+                   categoria='Transporte', fecha=date(2024, 2, 10)),
+        ])
+        db.session.commit()
+        ResumenMensualService.reconstruir(usuario.id)
+
+        resumen = DashboardService.obtener_resumen(usuario.id, date(2024, 3, 10))
+
+        assert resumen.ingresos_mes == Decimal('1200')
+        assert resumen.egresos_mes == Decimal('300')
+        assert resumen.balance_mes == 900.0
+        assert resumen.ingresos_grafico == [0.0, 0.0, 0.0, 900.0, 0.0, 1200.0]
+        assert resumen.egresos_grafico == [0.0, 0.0, 0.0, 0.0, 40.0, 300.0]
+        categorias = {c.categoria: c.total for c in resumen.ingresos_categoria}
+        assert categorias == {'Salario': Decimal('1000'), 'Ventas': Decimal('200')}
+        assert [c.categoria for c in resumen.egresos_categoria] == ['Vivienda']
+
+    def test_resumen_filtra_por_usuario(self, app, usuario):
+        """Prueba que no se mezclen transacciones de otros usuarios."""
+        otro = User(nombre='Otro', email='otro@example.com')
+        otro.set_password('password123')
+        db.session.add(otro)
+        db.session.commit()
+        db.session.add(Ingreso(usuario_id=otro.id, monto=Decimal('500'), descripcion='x',
+                               categoria='Salario', fecha=date(2024, 3, 1)))
+        db.session.commit()
+        ResumenMensualService.reconstruir()
+
+        resumen = DashboardService.obtener_resumen(usuario.id, date(2024, 3, 10))
+
+        assert resumen.ingresos_mes == 0
@@ -0,0 +1,71 @@
+"""
+Pruebas para la configuración del motor de base de datos.
+"""
+import pytest
+from decimal import Decimal
+import database
+from app import create_app
+from config import TestingConfig, opciones_motor
+from database import db, acumular
+from models import User, ResumenMensual
+
+
+class TestOpcionesMotor:
+    """Pruebas para las opciones del pool según el motor."""
+
+    def test_sqlite_sin_opciones_de_pool(self):
+        """Prueba que SQLite use las opciones por defecto de SQLAlchemy."""
+        assert opciones_motor('sqlite:///finanzas.db') == {}
+
+    def test_postgresql(self, monkeypatch):
+        """Prueba el pool y el timeout de sentencias de PostgreSQL."""
+        monkeypatch.setenv('DB_POOL_SIZE', '8')
+        monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '15000')
+
+        opciones = opciones_motor('postgresql://u:p@localhost/finanzas')
+
+        assert opciones['pool_size'] == 8
+        assert opciones['pool_pre_ping'] is True
+        assert opciones['pool_recycle'] == 1800
+        assert opciones['connect_args'] == {'options': '-c statement_timeout=15000'}
+
+
+class TestPragmasSqlite:
+    """Pruebas para los PRAGMA aplicados a cada conexión SQLite."""
+
+    def test_wal_y_pragmas(self, tmp_path):
+        """Prueba que una base en archivo use WAL, synchronous NORMAL y busy_timeout."""
+        class Config(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "finanzas.db"}'
+            SQLITE_BUSY_TIMEOUT_MS = 1234
+
+        app = create_app(Config)
+        with app.app_context():
+            with db.engine.connect() as conexion:
+                pragma = lambda nombre: conexion.exec_driver_sql(f'PRAGMA {nombre}').scalar()
+                assert pragma('journal_mode') == 'wal'
+                assert pragma('synchronous') == 1  # NORMAL
+                assert pragma('busy_timeout') == 1234
+            db.engine.dispose()
+
+
+class TestAcumular:
+    """Pruebas para el upsert que suma sobre la fila existente."""
+
+    @pytest.mark.parametrize('con_conflicto', [True, False])
+    def test_inserta_y_acumula(self, app, monkeypatch, con_conflicto):
+        """Prueba el ON CONFLICT del dialecto y la alternativa con savepoint."""
+        if not con_conflicto:
+            monkeypatch.setattr(database, '_INSERT_CON_CONFLICTO', {})
+        usuario = User(nombre='Upsert', email='upsert@example.com')
+        usuario.set_password('password123')
+        db.session.add(usuario)
+        db.session.commit()
+        clave = dict(usuario_id=usuario.id, anio=2024, mes=1, tipo='ingreso', categoria='Salario')
+
+        acumular(ResumenMensual, clave, {'total': Decimal('10'), 'cantidad': 1})
+        acumular(ResumenMensual, clave, {'total': Decimal('5.5'), 'cantidad': 2})
+        db.session.commit()
+
+        resumen = ResumenMensual.query.filter_by(**clave).one()
+        assert (resumen.total, resumen.cantidad) == (Decimal('15.50'), 3)
@@ -0,0 +1,251 @@
+"""
+Pruebas para el servicio de deudas fijas.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import DeudaFija, AmortizacionDeuda, Egreso, ResumenMensual
+from services.deudas_service import DeudasService
+from services.estrategias_service import MAX_MESES
+from services.validators import ValidationError
+
+
+def _deuda(usuario, titulo='Tarjeta', monto='100', dia_pago=5, proxima=date(2024, 1, 5)):
+    deuda = DeudaFija(usuario_id=usuario.id, titulo=titulo, monto=Decimal(monto),
+                      fecha_pago=date(2024, 1, 5), dia_pago=dia_pago, proxima_fecha_pago=proxima)
+    db.session.add(deuda)
+    return deuda
+
+
+class TestCalcularAmortizacion:
+    """Pruebas para el cálculo del plan de pagos."""
+
+    def test_plan_sin_intereses(self):
+        """Prueba un plan sin intereses con un último pago parcial."""
+        filas = DeudasService.calcular_amortizacion(Decimal('250'), Decimal('0'), Decimal('100'))
+
+        assert [(f['pago'], f['saldo']) for f in filas] == [
+            (Decimal('100'), Decimal('150')), (Decimal('100'), Decimal('50')),
+            (Decimal('50'), Decimal('0'))
+        ]
+
+    def test_interes_redondeado_al_centavo(self):
+        """Prueba redondear el interés mensual al centavo."""
+        filas = DeudasService.calcular_amortizacion(Decimal('1000'), Decimal('19.99'), Decimal('100'))
+
+        assert filas[0]['interes'] == Decimal('16.66')
+        assert filas[0]['saldo'] == Decimal('916.66')
+        assert filas[-1]['saldo'] == 0
+
+    def test_deuda_que_no_se_liquida(self):
+        """Prueba detener el plan en el límite de meses."""
+        filas = DeudasService.calcular_amortizacion(Decimal('1000'), Decimal('24'), Decimal('10'))
+
+        assert len(filas) == MAX_MESES
+
+
+class TestFinanciamiento:
+    """Pruebas para los datos de financiamiento guardados."""
+
+    def test_genera_plan_al_guardar(self, app, usuario):
+        """Prueba generar el plan al registrar saldo y tasa."""
+        deuda = _deuda(usuario)
+
+        assert DeudasService.actualizar_financiamiento(deuda, '1000', '12', '')
+        db.session.commit()
+
+        assert deuda.pago_minimo is None
+        assert len(deuda.amortizacion) == 11
+        assert deuda.amortizacion[0].interes == Decimal('10.00')
+
+    def test_sin_cambios_no_regenera(self, app, usuario):
+        """Prueba que reenviar los mismos valores no regenere el plan."""
+        deuda = _deuda(usuario)
+        DeudasService.actualizar_financiamiento(deuda, '1000', '12', '150')
+        db.session.commit()
+        ids = [f.id for f in deuda.amortizacion]
+
+        assert not DeudasService.actualizar_financiamiento(deuda, '1000.00', '12.000', '150')
+        db.session.commit()
+        assert [f.id for f in deuda.amortizacion] == ids
+
+        assert DeudasService.actualizar_financiamiento(deuda, '1000', '12', '500')
+        db.session.commit()
+        assert len(deuda.amortizacion) == 3
+
+    def test_vaciar_saldo_elimina_plan(self, app, usuario):
+        """Prueba que quitar el saldo deje la deuda sin plan."""
+        deuda = _deuda(usuario)
+        DeudasService.actualizar_financiamiento(deuda, '1000', '12', '')
+        db.session.commit()
+
+        DeudasService.actualizar_financiamiento(deuda, '', '12', '')
+        db.session.commit()
+
+        assert AmortizacionDeuda.query.count() == 0
+
+    def test_valores_invalidos(self, app, usuario):
+        """Prueba rechazar montos negativos o no numéricos."""
+        deuda = _deuda(usuario)
+
+        with pytest.raises(ValidationError):
+            DeudasService.actualizar_financiamiento(deuda, '-5', '', '')
+        with pytest.raises(ValidationError):
+            DeudasService.actualizar_financiamiento(deuda, '100', 'abc', '')
+
+
+class TestProyecciones:
+    """Pruebas para las proyecciones leídas de los planes guardados."""
+
+    def test_proyecciones_y_resumen(self, app, usuario):
+        """Prueba resumir los planes por deuda y por usuario."""
+        tarjeta = _deuda(usuario, 'Tarjeta')
+        prestamo = _deuda(usuario, 'Préstamo', '50')
+        sin_saldo = _deuda(usuario, 'Servicio')
+        DeudasService.actualizar_financiamiento(tarjeta, '250', '0', '')
+        DeudasService.actualizar_financiamiento(prestamo, '1000', '12', '')
+        db.session.commit()
+
+        proyecciones = DeudasService.proyecciones([tarjeta.id, prestamo.id, sin_saldo.id])
+        resumen = DeudasService.resumen_usuario(usuario.id)
+
+        assert proyecciones[tarjeta.id] == {'meses': 3, 'total_intereses': 0.0,
+                                            'total_pagado': 250.0, 'liquidada': True}
+        assert proyecciones[prestamo.id]['meses'] == 23
+        assert sin_saldo.id not in proyecciones
+        assert resumen['saldo_total'] == 1250.0
+        assert resumen['meses_para_liquidar'] == 23
+        assert [d['nombre'] for d in DeudasService.deudas_para_estrategia(
+            [tarjeta, prestamo, sin_saldo])] == ['Tarjeta', 'Préstamo']
+
+    def test_resumen_con_deuda_sin_liquidar(self, app, usuario):
+        """Prueba indicar que no hay fecha de liquidación si una deuda crece."""
+        deuda = _deuda(usuario)
+        DeudasService.actualizar_financiamiento(deuda, '1000', '24', '10')
+        db.session.commit()
+
+        assert DeudasService.resumen_usuario(usuario.id)['meses_para_liquidar'] is None
+
+
+class TestActualizarFechasPago:
+    """Pruebas para el avance de los próximos vencimientos."""
+
+    def test_avanza_solo_las_vencidas(self, app, usuario):
+        """Prueba mover al mes siguiente solo las fechas que ya pasaron."""
+        vencida = _deuda(usuario, 'Vencida', dia_pago=31, proxima=date(2024, 1, 31))
+        otra = _deuda(usuario, 'Otra', dia_pago=31, proxima=date(2024, 1, 31))
+        vigente = _deuda(usuario, 'Vigente', dia_pago=20, proxima=date(2024, 2, 20))
+        db.session.commit()
+
+        assert DeudasService.actualizar_fechas_pago(date(2024, 2, 10)) == 2
+
+        db.session.expire_all()
+        assert vencida.proxima_fecha_pago == date(2024, 2, 29)
+        assert otra.proxima_fecha_pago == date(2024, 2, 29)
+        assert vigente.proxima_fecha_pago == date(2024, 2, 20)
+
+    def test_deuda_sin_revisar_varios_meses(self, app, usuario):
+        """Prueba saltar directamente al próximo vencimiento desde hoy."""
+        deuda = _deuda(usuario, dia_pago=15, proxima=date(2023, 6, 15))
+        db.session.commit()
+
+        DeudasService.actualizar_fechas_pago(date(2024, 2, 16))
+
+        db.session.expire_all()
+        assert deuda.proxima_fecha_pago == date(2024, 3, 15)
+
+
+class TestPagos:
+    """Pruebas para el registro de pagos mensuales."""
+
+    def test_registrar_pago_crea_egreso(self, app, usuario):
+        """Prueba registrar el pago y su egreso en la misma transacción."""
+        deuda = _deuda(usuario)
+        db.session.commit()
+
+        pago = DeudasService.registrar_pago(deuda, date(2024, 3, 4))
+
+        assert pago.periodo == '2024-03'
+        assert pago.egreso.descripcion == 'Pago de deuda: Tarjeta'
+        assert pago.egreso.monto == Decimal('100')
+        assert deuda.fecha_ultimo_pago == date(2024, 3, 4)
+        resumen = ResumenMensual.query.filter_by(usuario_id=usuario.id, tipo='egreso').one()
+        assert (resumen.anio, resumen.mes, resumen.total) == (2024, 3, Decimal('100'))
+
+    def test_un_pago_por_cuota(self, app, usuario):
+        """Prueba rechazar un segundo pago de la misma cuota sin crear otro egreso."""
+        deuda = _deuda(usuario)
+        db.session.commit()
+        DeudasService.registrar_pago(deuda, date(2024, 3, 4))
+
+        with pytest.raises(ValidationError):
+            DeudasService.registrar_pago(deuda, date(2024, 3, 5))
+
+        DeudasService.registrar_pago(deuda, date(2024, 3, 20))
+        assert Egreso.query.count() == 2
+        assert [p.periodo for p in deuda.pagos] == ['2024-04', '2024-03']
+
+    def test_pago_anticipado_cruza_el_mes(self, app, usuario):
+        """Prueba que pagar el 30 una deuda del día 1 salde la cuota del mes siguiente."""
+        deuda = _deuda(usuario, dia_pago=1, proxima=date(2026, 11, 1))
+        db.session.commit()
+
+        pago = DeudasService.registrar_pago(deuda, date(2026, 10, 30))
+
+        assert pago.periodo == '2026-11'
+        assert pago.egreso.fecha == date(2026, 10, 30)
+        for dia in (date(2026, 10, 30), date(2026, 11, 1)):
+            assert deuda.cuota_pagada(dia)
+            assert DeudasService.cuotas_pagadas([deuda], dia) == {deuda.id}
+        assert not deuda.cuota_pagada(date(2026, 11, 2))
+        with pytest.raises(ValidationError):
+            DeudasService.registrar_pago(deuda, date(2026, 11, 1))
+        assert Egreso.query.count() == 1
+
+    def test_estado_por_cuota(self, app, usuario):
+        """Prueba que el pago cuente para la cuota de su vencimiento."""
+        pagada = _deuda(usuario, 'Pagada', proxima=date(2024, 3, 5))
+        _deuda(usuario, 'Pendiente', proxima=date(2024, 3, 5))
+        db.session.commit()
+        DeudasService.registrar_pago(pagada, date(2024, 3, 4))
+
+        pendientes = DeudaFija.query.filter(DeudasService.condicion_pendiente('2024-03'))
+        cuotas_pendientes = DeudaFija.query.filter(
+            DeudasService.condicion_cuota_pendiente(date(2024, 3, 1), date(2024, 4, 30)))
+
+        assert [d.titulo for d in pendientes] == ['Pendiente']
+        assert [d.titulo for d in cuotas_pendientes] == ['Pendiente']
+        assert DeudasService.cuotas_pagadas([pagada], date(2024, 3, 5)) == {pagada.id}
+        assert pagada.cuota_pagada(date(2024, 3, 5))
+        assert not pagada.cuota_pagada(date(2024, 3, 6))
+
+    def test_anular_pago_elimina_egreso(self, app, usuario):
+        """Prueba anular el pago del mes junto con su egreso."""
+        deuda = _deuda(usuario)
+        db.session.commit()
+        DeudasService.registrar_pago(deuda, date(2024, 2, 3))
+        DeudasService.registrar_pago(deuda, date(2024, 3, 4))
+
+        assert DeudasService.anular_pago(deuda, '2024-03')
+        assert not DeudasService.anular_pago(deuda, '2024-03')
+
+        assert [p.periodo for p in deuda.pagos] == ['2024-02']
+        assert Egreso.query.count() == 1
+        assert deuda.fecha_ultimo_pago == date(2024, 2, 3)
+        assert ResumenMensual.query.filter_by(mes=3).count() == 0
+
+    def test_resumen_anual(self, app, usuario):
+        """Prueba agrupar los pagos del año por deuda."""
+        luz = _deuda(usuario, 'Luz', monto='50')
+        agua = _deuda(usuario, 'Agua', monto='20')
+        db.session.commit()
+        for mes in (1, 2, 3):
+            DeudasService.registrar_pago(luz, date(2024, mes, 5))
+        DeudasService.registrar_pago(agua, date(2024, 2, 5))
+        DeudasService.registrar_pago(agua, date(2025, 1, 5))
+
+        assert DeudasService.resumen_anual(usuario.id, 2024) == [
+            {'deuda_id': agua.id, 'titulo': 'Agua', 'pagos': 1, 'total': 20.0},
+            {'deuda_id': luz.id, 'titulo': 'Luz', 'pagos': 3, 'total': 150.0},
+        ]
@@ -0,0 +1,222 @@
+"""
+Pruebas para el servicio de estrategias de pago de deudas.
+"""
+import pytest
+from services.estrategias_service import EstrategiasService, MAX_MESES
+from services.cache import CacheLRU
+from services.validators import ValidationError
+
+
+def _deuda(id, saldo, tasa, minimo):
+    return {'id': id, 'nombre': f'Deuda {id}', 'saldo_pendiente': saldo,
+            'tasa_interes': tasa, 'pago_minimo': minimo}
+
+
+@pytest.fixture
+def portafolio():
+    """Tres deudas con tasas, saldos y mínimos distintos."""
+    return [
+        _deuda(1, 5000, 12, 100),
+        _deuda(2, 800, 30, 40),
+        _deuda(3, 2500, 18, 150),
+    ]
+
+
+class TestEstrategiasService:
+    """Pruebas para la simulación de estrategias."""
+
+    def test_deuda_sin_intereses(self):
+        """Prueba una deuda sin intereses pagada solo con el mínimo."""
+        resultado = EstrategiasService.simular([_deuda(1, 1000, 0, 250)], 0)
+
+        assert resultado['meses'] == 4
+        assert resultado['total_intereses'] == 0
+        assert [h['saldos'] for h in resultado['historial']] == [
+            {'Deuda 1': 750.0}, {'Deuda 1': 500.0}, {'Deuda 1': 250.0}, {}
+        ]
+
+    @pytest.mark.parametrize('politica', ['avalancha', 'bola_nieve', 'mayor_pago'])
+    def test_vectorizado_coincide_con_exacto(self, portafolio, politica):
+        """Prueba que el modo vectorizado reproduzca el cálculo con Decimal."""
+        exacto = EstrategiasService.simular(portafolio, 75, politica, modo='exacto')
+        vectorizado = EstrategiasService.simular(portafolio, 75, politica)
+
+        assert vectorizado['meses'] == exacto['meses']
+        assert vectorizado['total_intereses'] == pytest.approx(exacto['total_intereses'], abs=0.01)
+        assert len(vectorizado['historial']) == len(exacto['historial'])
+
+    @pytest.mark.parametrize('politica', ['avalancha', 'bola_nieve', 'mayor_pago'])
+    @pytest.mark.parametrize('pago_extra', [0, 75, 1000])
+    def test_eventos_coincide_con_exacto(self, portafolio, politica, pago_extra):
+        """Prueba que la simulación por eventos devuelva los mismos resultados."""
+        portafolio.append(_deuda(4, 12000, 24, 260))
+        exacto = EstrategiasService.simular(portafolio, pago_extra, politica, modo='exacto')
+        eventos = EstrategiasService.simular(portafolio, pago_extra, politica, modo='eventos')
+
+        assert eventos['meses'] == exacto['meses']
+        assert eventos['total_intereses'] == pytest.approx(exacto['total_intereses'], abs=0.01)
+        assert len(eventos['historial']) == len(exacto['historial'])
+        for mes_eventos, mes_exacto in zip(eventos['historial'], exacto['historial']):
+            assert mes_eventos['saldos'] == pytest.approx(mes_exacto['saldos'])
+
+    def test_eventos_sin_limite_de_historial(self):
+        """Prueba un plan de 40 años resuelto por eventos."""
+        deudas = [_deuda(1, 50000, 6, 280), _deuda(2, 3000, 20, 60)]
+
+        exacto = EstrategiasService.simular(deudas, 5, 'bola_nieve', modo='exacto')
+        eventos = EstrategiasService.simular(deudas, 5, 'bola_nieve', modo='eventos')
+
+        assert 400 < exacto['meses'] <= MAX_MESES
+        assert eventos['meses'] == exacto['meses']
+        assert eventos['total_intereses'] == pytest.approx(exacto['total_intereses'], abs=0.01)
+
+    def test_politicas_eligen_deuda_distinta(self, portafolio):
+        """Prueba que el pago extra del primer mes vaya a la deuda de la política."""
+        def primer_saldo(politica, **kwargs):
+            resultado = EstrategiasService.simular(portafolio, 100, politica, **kwargs)
+            return resultado['historial'][0]['saldos']
+
+        # Sin extra, la deuda 2 quedaría en 800 * 1.025 - 40 = 780
+        assert primer_saldo('avalancha')['Deuda 2'] == pytest.approx(680)
+        assert primer_saldo('bola_nieve')['Deuda 2'] == pytest.approx(680)
+        # Sin extra, la deuda 3 quedaría en 2500 * 1.015 - 150 = 2387.5
+        assert primer_saldo('mayor_pago')['Deuda 3'] == pytest.approx(2287.5)
+        assert primer_saldo('personalizada', orden=[1, 3, 2])['Deuda 1'] == pytest.approx(4850)
+
+    def test_avalancha_paga_menos_intereses(self, portafolio):
+        """Prueba que avalancha no pague más intereses que bola de nieve."""
+        avalancha = EstrategiasService.simular(portafolio, 200, 'avalancha')
+        bola_nieve = EstrategiasService.simular(portafolio, 200, 'bola_nieve')
+
+        assert avalancha['total_intereses'] <= bola_nieve['total_intereses']
+
+    def test_limite_de_meses(self):
+        """Prueba que una deuda que nunca se paga se detenga en el límite."""
+        resultado = EstrategiasService.simular([_deuda(1, 1000, 24, 10)], 0)
+
+        assert resultado['meses'] == MAX_MESES + 1
+        assert len(resultado['historial']) == 24
+
+    def test_modo_verificado(self, portafolio):
+        """Prueba que el modo verificado devuelva el mismo formato."""
+        resultado = EstrategiasService.simular(portafolio, 50, modo='verificado')
+
+        assert set(resultado) == {'meses', 'total_intereses', 'historial'}
+
+    def test_politica_invalida(self, portafolio):
+        """Prueba rechazar una política desconocida."""
+        with pytest.raises(ValueError):
+            EstrategiasService.simular(portafolio, 0, 'aleatoria')
+
+
+class TestCompararEstrategias:
+    """Pruebas para la comparación de escenarios."""
+
+    def test_construir_escenarios(self):
+        """Prueba combinar estrategias, órdenes y montos de pago extra."""
+        escenarios = EstrategiasService.construir_escenarios(
+            ['avalancha', 'bola_nieve'], [[2, 1]], [0, '50.5']
+        )
+
+        assert len(escenarios) == 6
+        assert escenarios[2] == {'estrategia': 'personalizada', 'orden': [2, 1], 'pago_extra': 0.0}
+        assert escenarios[-1]['pago_extra'] == 50.5
+
+    def test_construir_escenarios_invalidos(self):
+        """Prueba rechazar estrategias desconocidas y montos negativos."""
+        with pytest.raises(ValidationError):
+            EstrategiasService.construir_escenarios(['inventada'], [], [0])
+        with pytest.raises(ValidationError):
+            EstrategiasService.construir_escenarios(['avalancha'], [], [-10])
+
+    @pytest.mark.parametrize('estrategias, ordenes', [
+        ([['x']], []),
+        ([{'a': 1}], []),
+        (['avalancha'], [[[1], 2]]),
+        (['avalancha'], [[{'id': 1}]]),
+    ])
+    def test_construir_escenarios_no_escalares(self, estrategias, ordenes):
+        """Prueba rechazar estrategias e IDs de orden que no son texto ni enteros."""
+        with pytest.raises(ValidationError):
+            EstrategiasService.construir_escenarios(estrategias, ordenes, [0])
+
+    @pytest.mark.parametrize('id_deuda', [[1], {'a': 1}, 1.5, True])
+    def test_validar_deudas_id_invalido(self, id_deuda):
+        """Prueba rechazar IDs de deuda que no son texto ni enteros."""
+        with pytest.raises(ValidationError):
+            EstrategiasService.validar_deudas([{'id': id_deuda, 'saldo_pendiente': 100,
+                                                'tasa_interes': 1, 'pago_minimo': 10}])
+
+    def test_validar_deudas(self):
+        """Prueba normalizar las deudas y rechazar saldos en cero."""
+        deudas = EstrategiasService.validar_deudas([
+            {'nombre': 'Tarjeta', 'saldo_pendiente': '1500.50', 'tasa_interes': 24,
+             'pago_minimo': 60}
+        ])
+        assert deudas == [{'id': 1, 'nombre': 'Tarjeta', 'saldo_pendiente': 1500.5,
+                           'tasa_interes': 24.0, 'pago_minimo': 60.0}]
+
+        with pytest.raises(ValidationError):
+            EstrategiasService.validar_deudas([{'nombre': 'X', 'saldo_pendiente': '0',
+                                                'tasa_interes': 1, 'pago_minimo': 1}])
+
+    @pytest.mark.parametrize('procesos', [1, 2])
+    def test_comparar(self, portafolio, procesos):
+        """Prueba que la tabla coincida con simular cada escenario por separado."""
+        escenarios = EstrategiasService.construir_escenarios(
+            ['avalancha', 'bola_nieve'], [[3, 2, 1]], [0, 100, 400]
+        )
+
+        filas = EstrategiasService.comparar(portafolio, escenarios, procesos=procesos)
+
+        assert len(filas) == len(escenarios)
+        for fila, escenario in zip(filas, escenarios):
+            esperado = EstrategiasService.simular(portafolio, escenario['pago_extra'],
+                                                  escenario['estrategia'], escenario['orden'])
+            assert fila['meses'] == esperado['meses']
+            assert fila['total_intereses'] == round(esperado['total_intereses'], 2)
+            assert fila['pagada']
+
+
+class TestCacheEstrategias:
+    """Pruebas para la caché de resultados de estrategias."""
+
+    def test_portafolio_reordenado_reutiliza_resultado(self, portafolio):
+        """Prueba que el mismo portafolio en otro orden sea un acierto."""
+        cache = CacheLRU()
+
+        primero = EstrategiasService.simular_en_cache(cache, portafolio, 100)
+        segundo = EstrategiasService.simular_en_cache(cache, list(reversed(portafolio)), 100.0)
+
+        assert segundo is primero
+        assert primero == EstrategiasService.simular(portafolio, 100)
+        assert cache.estadisticas() == {'aciertos': 1, 'fallos': 1, 'entradas': 1}
+
+    def test_cambio_de_datos_cambia_la_clave(self, portafolio):
+        """Prueba que otro pago extra, política o saldo no reutilicen el resultado."""
+        cache = CacheLRU()
+        EstrategiasService.simular_en_cache(cache, portafolio, 100)
+        EstrategiasService.simular_en_cache(cache, portafolio, 150)
+        EstrategiasService.simular_en_cache(cache, portafolio, 100, 'bola_nieve')
+        portafolio[0] = dict(portafolio[0], saldo_pendiente=5001)
+        EstrategiasService.simular_en_cache(cache, portafolio, 100)
+
+        assert cache.estadisticas()['aciertos'] == 0
+        assert cache.estadisticas()['entradas'] == 4
+
+
+class TestCompararEndpoint:
+    """Pruebas para POST /api/estrategias/comparar."""
+
+    @pytest.mark.parametrize('cuerpo', [
+        {'estrategias': [['x']]},
+        {'ordenes': [[['x']]]},
+        {'deudas': [_deuda([1], 100, 1, 10)]},
+    ])
+    def test_entrada_no_escalar_responde_400(self, app, cliente, portafolio, cuerpo):
+        """Prueba responder 400 (no 500) a valores que no son texto ni enteros."""
+        respuesta = cliente.post('/api/estrategias/comparar',
+                                 json={'deudas': portafolio, **cuerpo})
+
+        assert respuesta.status_code == 400
+        assert 'error' in respuesta.get_json()
@@ -0,0 +1,66 @@
+"""
+Pruebas para el servicio de exportación.
+"""
+import csv
+import io
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import Ingreso, Egreso
+from services import exportacion_service
+from services.exportacion_service import ExportacionService
+from services.validators import ValidationError
+
+
+@pytest.fixture
+def usuario(usuario_en_sesion):
+    """Crea un usuario con algunas transacciones."""
+    usuario = usuario_en_sesion()
+    db.session.add_all([
+        Ingreso(usuario_id=usuario.id, monto=Decimal('100.50'), descripcion='Sueldo, enero',
+                categoria='Salario', fecha=date(2024, 1, 31)),
+        Ingreso(usuario_id=usuario.id, monto=Decimal('20'), descripcion='Venta',
+                categoria='Ventas', fecha=date(2024, 2, 10)),
+        Egreso(usuario_id=usuario.id, monto=Decimal('30'), descripcion='Bus',
+               categoria='Transporte', fecha=date(2024, 2, 1)),
+    ])
+    db.session.commit()
+    return usuario
+
+
+class TestExportacionService:
+    """Pruebas para la exportación en streaming."""
+
+    def test_ndjson_una_linea_por_fila(self, app, usuario):
+        """Prueba que NDJSON emita un objeto JSON por transacción."""
+        lineas = ''.join(ExportacionService.exportar(usuario.id, ['ingreso'])).splitlines()
+        filas = [json.loads(linea) for linea in lineas]
+
+        assert [f['monto'] for f in filas] == [100.5, 20.0]
+        assert filas[0]['tipo'] == 'ingreso'
+
+    def test_csv_con_filtros(self, app, usuario):
+        """Prueba el CSV combinado filtrado por rango de fechas."""
+        texto = ''.join(ExportacionService.exportar(
+            usuario.id, ['ingreso', 'egreso'], 'csv',
+            desde=date(2024, 2, 1), hasta=date(2024, 2, 28)
+        ))
+        filas = list(csv.DictReader(io.StringIO(texto)))
+
+        assert [(f['tipo'], f['monto']) for f in filas] == [('ingreso', '20.00'), ('egreso', '30.00')]
+
+    def test_csv_se_envia_por_lotes(self, app, usuario, monkeypatch):
+        """Prueba que el CSV se emita en varios fragmentos."""
+        monkeypatch.setattr(exportacion_service, 'FILAS_POR_LOTE', 1)
+        fragmentos = list(ExportacionService.exportar(usuario.id, ['ingreso'], 'csv'))
+        assert len(fragmentos) == 3
+
+    def test_validar_filtros(self):
+        """Prueba rechazar formatos y rangos inválidos."""
+        with pytest.raises(ValidationError):
+            ExportacionService.validar_filtros('xml')
+        with pytest.raises(ValidationError):
+            ExportacionService.validar_filtros('csv', '2024-02-01', '2024-01-01')
+        assert ExportacionService.validar_filtros('csv', '2024-01-01') == (date(2024, 1, 1), None)
@@ -0,0 +1,68 @@
+"""
+Pruebas para la caché de identidad de los usuarios autenticados.
+"""
+import pytest
+from flask import g
+from database import db
+from services.identidad import UsuarioSesion
+
+
+@pytest.fixture
+def identidad(app):
+    """Caché de identidad de la aplicación (vacía al empezar la prueba)."""
+    return app.extensions['cache_identidad']
+
+
+class TestCacheIdentidad:
+    """Pruebas para la carga de usuarios sin leer la base de datos."""
+
+    def test_devuelve_copia_ligera(self, app, usuario, identidad):
+        """Prueba cargar una copia del usuario sin sesión de base de datos."""
+        cargado = identidad.cargar(usuario.id)
+
+        assert isinstance(cargado, UsuarioSesion)
+        assert (cargado.id, cargado.nombre, cargado.email) == \
+            (usuario.id, 'Usuario', 'usuario@example.com')
+        assert cargado.get_id() == str(usuario.id)
+        assert cargado.is_authenticated
+
+    def test_segunda_carga_desde_cache(self, app, usuario, identidad):
+        """Prueba que la segunda carga no consulte la base de datos."""
+        primero = identidad.cargar(usuario.id)
+        db.session.execute(db.text('UPDATE users SET nombre = :n WHERE id = :id'),
+                           {'n': 'Sin invalidar', 'id': usuario.id})
+
+        assert identidad.cargar(usuario.id) is primero
+        assert identidad.estadisticas()['aciertos'] == 1
+
+    def test_edicion_invalida(self, app, usuario, identidad):
+        """Prueba que editar el usuario renueve la copia cacheada."""
+        identidad.cargar(usuario.id)
+
+        usuario.nombre = 'Nuevo nombre'
+        db.session.commit()
+
+        assert identidad.cargar(usuario.id).nombre == 'Nuevo nombre'
+
+    def test_cambio_de_contrasena_invalida(self, app, usuario, identidad):
+        """Prueba que set_password renueve la copia cacheada."""
+        primero = identidad.cargar(usuario.id)
+
+        usuario.set_password('otra-clave-123')
+        db.session.commit()
+
+        assert identidad.cargar(usuario.id) is not primero
+
+    def test_usuario_inexistente(self, app, identidad):
+        """Prueba que un ID desconocido no cargue ningún usuario."""
+        assert identidad.cargar(999) is None
+
+    def test_peticiones_con_sesion(self, app, cliente):
+        """Prueba que las peticiones autenticadas usen la caché."""
+        # El contexto de la prueba conserva el usuario del login
+        g.pop('_login_user', None)
+
+        respuesta = cliente.get('/dashboard')
+
+        assert respuesta.status_code == 200
+        assert isinstance(g._login_user, UsuarioSesion)
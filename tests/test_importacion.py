@@ -0,0 +1,129 @@
+"""
+Pruebas para la importación masiva de transacciones.
+"""
+import io
+from models import Ingreso, Egreso
+from services.transacciones_service import TransaccionesService
+from services.resumen_service import ResumenMensualService
+from routes.api import lineas_utf8
+
+
+def _fila(tipo='egreso', monto='10', categoria='Transporte', fecha='2024-01-15'):
+    return {'tipo': tipo, 'monto': monto, 'descripcion': 'Importada',
+            'categoria': categoria, 'fecha': fecha}
+
+
+class TestImportarLote:
+    """Pruebas para TransaccionesService.importar_lote."""
+
+    def test_inserta_en_varios_lotes(self, app, usuario):
+        """Prueba insertar filas de ambos tipos repartidas en lotes."""
+        filas = [_fila() for _ in range(7)] + [_fila('ingreso', '100', 'Salario')]
+
+        resultado = TransaccionesService.importar_lote(usuario.id, filas, tamano_lote=3)
+
+        assert resultado == {'creados': 8, 'errores': []}
+        assert Egreso.query.filter_by(usuario_id=usuario.id).count() == 7
+        assert Ingreso.query.filter_by(usuario_id=usuario.id).count() == 1
+
+    def test_informa_errores_por_fila_sin_abortar(self, app, usuario):
+        """Prueba que las filas inválidas se informen y el resto se guarde."""
+        filas = [_fila(), _fila(monto='-5'), _fila(categoria='Inventada'), 'no es un objeto']
+
+        resultado = TransaccionesService.importar_lote(usuario.id, filas)
+
+        assert resultado['creados'] == 1
+        assert [e['fila'] for e in resultado['errores']] == [2, 3, 4]
+
+    def test_tipos_json_incorrectos(self, app, usuario):
+        """Prueba que los campos con otro tipo JSON se informen como errores de fila."""
+        filas = [_fila(), dict(_fila(), fecha=20240115), dict(_fila(), descripcion=123),
+                 _fila(tipo=['egreso']), _fila(monto=True), _fila(monto={'valor': 1}), _fila()]
+
+        resultado = TransaccionesService.importar_lote(usuario.id, filas)
+
+        assert resultado['creados'] == 2
+        assert [e['fila'] for e in resultado['errores']] == [2, 3, 4, 5, 6]
+        assert Egreso.query.filter_by(usuario_id=usuario.id).count() == 2
+
+    def test_tipo_por_defecto(self, app, usuario):
+        """Prueba usar el tipo por defecto cuando la fila no lo indica."""
+        fila = _fila()
+        del fila['tipo']
+
+        resultado = TransaccionesService.importar_lote(usuario.id, [fila], tipo_defecto='egreso')
+
+        assert resultado['creados'] == 1
+
+    def test_actualiza_resumenes(self, app, usuario):
+        """Prueba que los resúmenes mensuales reflejen lo importado."""
+        filas = [_fila(monto='10'), _fila(monto='2.5'), _fila(fecha='2024-02-01')]
+
+        TransaccionesService.importar_lote(usuario.id, filas, tamano_lote=2)
+
+        assert ResumenMensualService.verificar(usuario.id) == []
+
+
+class TestImportarEndpoint:
+    """Pruebas para POST /api/transacciones/bulk."""
+
+    def test_csv_en_el_cuerpo(self, app, cliente):
+        """Prueba importar un CSV enviado como text/csv."""
+        csv_texto = 'tipo,fecha,monto,categoria,descripcion\negreso,2024-01-15,10,Transporte,Bus\n'
+
+        respuesta = cliente.post('/api/transacciones/bulk', data=csv_texto.encode(),
+                                 content_type='text/csv')
+
+        assert respuesta.status_code == 201
+        assert respuesta.get_json()['creados'] == 1
+
+    def test_archivo_multipart(self, app, cliente):
+        """Prueba importar un CSV subido como archivo, con BOM y fin de línea CRLF."""
+        csv_texto = '\ufefftipo,fecha,monto,categoria,descripcion\r\n' \
+            'egreso,2024-01-15,10,Transporte,"Bus, ida\r\ny vuelta"\r\n' \
+            'ingreso,2024-01-20,50,Salario,Sueldo'
+        archivo = (io.BytesIO(csv_texto.encode()), 'movimientos.csv')
+
+        respuesta = cliente.post('/api/transacciones/bulk', data={'archivo': archivo},
+                                 content_type='multipart/form-data')
+
+        assert respuesta.status_code == 201
+        assert respuesta.get_json()['creados'] == 2
+        assert Egreso.query.one().descripcion == 'Bus, ida\r\ny vuelta'
+
+    def test_archivo_multipart_no_utf8(self, app, cliente):
+        """Prueba responder 400 a un archivo subido que no es UTF-8."""
+        archivo = (io.BytesIO('tipo,fecha\nñ,é\n'.encode('latin-1')), 'movimientos.csv')
+
+        respuesta = cliente.post('/api/transacciones/bulk', data={'archivo': archivo},
+                                 content_type='multipart/form-data')
+
+        assert respuesta.status_code == 400
+        assert 'CSV' in respuesta.get_json()['error']
+
+    def test_lineas_utf8_por_bloques(self):
+        """Prueba no cortar caracteres multibyte entre bloques."""
+        contenido = 'año,ñandú\r\né,ü'.encode()
+
+        assert list(lineas_utf8(io.BytesIO(contenido), tamano_bloque=1)) == \
+            ['año,ñandú\r\n', 'é,ü']
+
+    def test_csv_no_utf8(self, app, cliente):
+        """Prueba responder 400 a un archivo que no es UTF-8."""
+        respuesta = cliente.post('/api/transacciones/bulk', data='tipo,fecha\nñ,é\n'.encode('latin-1'),
+                                 content_type='text/csv')
+
+        assert respuesta.status_code == 400
+        assert 'CSV' in respuesta.get_json()['error']
+
+    def test_maximo_de_filas(self, app, cliente):
+        """Prueba rechazar un CSV con más filas que el máximo configurado."""
+        app.config['IMPORTACION_MAX_FILAS'] = 2
+        csv_texto = 'tipo,fecha,monto,categoria,descripcion\n' + \
+            'egreso,2024-01-15,10,Transporte,Bus\n' * 5
+
+        respuesta = cliente.post('/api/transacciones/bulk', data=csv_texto.encode(),
+                                 content_type='text/csv')
+
+        assert respuesta.status_code == 400
+        assert Egreso.query.count() == 0
@@ -0,0 +1,215 @@
+"""
+Pruebas para el servicio de notificaciones.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from flask_mail import Message
+from database import db
+from models import User, Recordatorio, DeudaFija, NotificacionEnviada, PagoDeuda
+from services.deudas_service import DeudasService
+from services.notificaciones_service import (
+    DespachadorNotificaciones, verificar_recordatorios, recordatorios_vencidos, por_lotes,
+    ventana_de_aviso
+)
+
+
+@pytest.fixture
+def mail(app):
+    """Extensión Flask-Mail de la app (en pruebas no envía realmente)."""
+    return app.extensions['mail']
+
+
+def _recordatorio(usuario, titulo, fecha_recordatorio):
+    return Recordatorio(usuario_id=usuario.id, titulo=titulo, monto=Decimal('10'),
+                        fecha_pago=fecha_recordatorio, fecha_recordatorio=fecha_recordatorio)
+
+
+def _deuda(usuario, titulo, dia_pago, desde=date(2024, 3, 1)):
+    deuda = DeudaFija(usuario_id=usuario.id, titulo=titulo, monto=Decimal('100'),
+                      fecha_pago=date(2024, 1, min(dia_pago, 28)), dia_pago=dia_pago)
+    deuda.programar_pago(desde)
+    return deuda
+
+
+class TestDespachadorNotificaciones:
+    """Pruebas para el envío por lotes."""
+
+    def test_envia_todos_los_lotes(self, app, mail):
+        """Prueba repartir los mensajes en varios lotes e hilos."""
+        mensajes = [(i, Message(subject=f'm{i}', recipients=['a@example.com'],
+                                sender='app@example.com', body='x'))
+                    for i in range(7)]
+        despachador = DespachadorNotificaciones(app, mail, tamano_lote=2, max_hilos=3)
+
+        with mail.record_messages() as salida:
+            enviados = despachador.enviar(mensajes)
+
+        assert sorted(enviados) == list(range(7))
+        assert len(salida) == 7
+
+    def test_un_error_no_detiene_el_lote(self, app, mail):
+        """Prueba que un mensaje inválido no impida enviar el resto."""
+        mensajes = [
+            (1, Message(subject='ok', recipients=['a@example.com'], sender='app@example.com')),
+            (2, Message(subject='sin destinatarios', sender='app@example.com')),
+            (3, Message(subject='ok', recipients=['b@example.com'], sender='app@example.com')),
+        ]
+        despachador = DespachadorNotificaciones(app, mail, tamano_lote=10)
+
+        assert despachador.enviar(mensajes) == [1, 3]
+
+
+class TestConsultas:
+    """Pruebas para las consultas de la tarea programada."""
+
+    def test_recordatorios_vencidos_en_lotes(self, app, usuario):
+        """Prueba filtrar por fecha en SQL y recorrer todos los lotes."""
+        db.session.add_all([_recordatorio(usuario, f'R{i}', date(2024, 3, 1 + i)) for i in range(7)])
+        db.session.commit()
+
+        lotes = list(por_lotes(recordatorios_vencidos(date(2024, 3, 5)), Recordatorio, 2))
+
+        assert [len(lote) for lote in lotes] == [2, 2, 1]
+        assert lotes[0][0].usuario.email == 'usuario@example.com'
+
+    def test_shards_reparten_usuarios(self, app, usuario):
+        """Prueba que cada usuario quede en un único shard."""
+        otro = User(nombre='Otro', email='otro@example.com')
+        otro.set_password('password123')
+        db.session.add(otro)
+        db.session.commit()
+        db.session.add_all([_recordatorio(usuario, 'A', date(2024, 3, 1)),
+                            _recordatorio(otro, 'B', date(2024, 3, 1))])
+        db.session.commit()
+
+        por_shard = [[r.titulo for r in recordatorios_vencidos(date(2024, 3, 5), shard, 2)]
+                     for shard in range(2)]
+
+        assert sorted(por_shard) == [['A'], ['B']]
+
+
+class TestVentanaDeAviso:
+    """Pruebas para la ventana de vencimiento de deudas."""
+
+    def test_ventana_dentro_del_mes(self):
+        """Prueba agrupar los días de la ventana en un solo período."""
+        assert ventana_de_aviso(date(2024, 3, 10)) == {
+            '2024-03': (date(2024, 3, 10), date(2024, 3, 12))
+        }
+
+    def test_ventana_cruza_el_mes(self):
+        """Prueba dividir la ventana entre el fin de mes y el mes siguiente."""
+        assert ventana_de_aviso(date(2024, 12, 30)) == {
+            '2024-12': (date(2024, 12, 30), date(2024, 12, 31)),
+            '2025-01': (date(2025, 1, 1), date(2025, 1, 1))
+        }
+
+
+class TestVerificarRecordatorios:
+    """Pruebas para la tarea programada de recordatorios."""
+
+    def test_envia_vencidos_y_los_marca(self, app, mail, usuario):
+        """Prueba enviar solo los recordatorios vencidos y marcarlos como enviados."""
+        app.config['MAIL_DEFAULT_SENDER'] = 'app@example.com'
+        mail.default_sender = 'app@example.com'
+        db.session.add_all([
+            _recordatorio(usuario, 'Vencido', date(2024, 3, 1)),
+            _recordatorio(usuario, 'Hoy', date(2024, 3, 10)),
+            _recordatorio(usuario, 'Futuro', date(2024, 3, 11)),
+        ])
+        db.session.commit()
+
+        with mail.record_messages() as salida:
+            verificar_recordatorios(app, mail, hoy=date(2024, 3, 10))
+
+        assert sorted(m.subject for m in salida) == [
+            '[FINANZAS MALU] Recordatorio: Hoy',
+            '[FINANZAS MALU] Recordatorio: Vencido',
+        ]
+        db.session.expire_all()
+        pendientes = [r.titulo for r in Recordatorio.query.filter_by(enviado=False)]
+        assert pendientes == ['Futuro']
+
+
+class TestVerificarDeudas:
+    """Pruebas para los avisos de deudas fijas."""
+
+    @pytest.fixture(autouse=True)
+    def remitente(self, app, mail):
+        app.config['MAIL_DEFAULT_SENDER'] = 'app@example.com'
+        mail.default_sender = 'app@example.com'
+
+    def test_avisa_una_vez_por_periodo(self, app, mail, usuario):
+        """Prueba que una deuda se notifique una sola vez en el período."""
+        db.session.add_all([
+            _deuda(usuario, 'Arriendo', 12),
+            _deuda(usuario, 'Lejana', 20),
+        ])
+        db.session.commit()
+
+        with mail.record_messages() as salida:
+            verificar_recordatorios(app, mail, hoy=date(2024, 3, 10))
+            verificar_recordatorios(app, mail, hoy=date(2024, 3, 11))
+
+        assert [m.subject for m in salida] == [
+            '[FINANZAS MALU] Recordatorio: Pago de deuda fija - Arriendo'
+        ]
+        assert [(n.deuda.titulo, n.periodo) for n in NotificacionEnviada.query] == [
+            ('Arriendo', '2024-03')
+        ]
+
+    def test_dia_de_pago_mayor_a_28(self, app, mail, usuario):
+        """Prueba que el día 31 venza el último día de cada mes y se avise de nuevo."""
+        db.session.add(_deuda(usuario, 'Tarjeta', 31))
+        db.session.commit()
+
+        with mail.record_messages() as salida:
+            verificar_recordatorios(app, mail, hoy=date(2024, 3, 29))
+            verificar_recordatorios(app, mail, hoy=date(2024, 4, 28))
+
+        assert len(salida) == 2
+        assert 'Fecha de pago: 31/03/2024' in salida[0].body
+        assert 'Fecha de pago: 30/04/2024' in salida[1].body
+        assert 'Días restantes: 2' in salida[1].body
+        assert sorted(n.periodo for n in NotificacionEnviada.query) == ['2024-03', '2024-04']
+
+    def test_vencimiento_a_fin_de_mes_en_el_periodo_anterior(self, app, mail, usuario):
+        """Prueba avisar en diciembre una deuda que vence el 31 con la ventana cruzando el año."""
+        db.session.add(_deuda(usuario, 'Seguro', 31, desde=date(2024, 12, 1)))
+        db.session.commit()
+
+        with mail.record_messages() as salida:
+            verificar_recordatorios(app, mail, hoy=date(2024, 12, 30))
+
+        assert len(salida) == 1
+        assert [n.periodo for n in NotificacionEnviada.query] == ['2024-12']
+
+    def test_no_avisa_deudas_pagadas(self, app, mail, usuario):
+        """Prueba omitir deudas pagadas o inactivas."""
+        pagada = _deuda(usuario, 'Pagada', 10)
+        inactiva = _deuda(usuario, 'Inactiva', 10)
+        inactiva.activa = False
+        db.session.add_all([pagada, inactiva])
+        db.session.commit()
+        db.session.add(PagoDeuda(deuda_id=pagada.id, periodo='2024-03', monto=Decimal('100'),
+                                 fecha=date(2024, 3, 2)))
+        db.session.commit()
+
+        with mail.record_messages() as salida:
+            verificar_recordatorios(app, mail, hoy=date(2024, 3, 10))
+
+        assert salida == []
+
+    def test_no_avisa_cuota_pagada_el_mes_anterior(self, app, mail, usuario):
+        """Prueba no avisar el 30 una deuda del día 1 pagada ese mismo día."""
+        deuda = _deuda(usuario, 'Arriendo', 1, desde=date(2026, 10, 2))
+        db.session.add(deuda)
+        db.session.commit()
+        DeudasService.registrar_pago(deuda, date(2026, 10, 30))
+
+        with mail.record_messages() as salida:
+            verificar_recordatorios(app, mail, hoy=date(2026, 10, 30))
+
+        assert salida == []
+        assert NotificacionEnviada.query.count() == 0
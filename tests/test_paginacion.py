@@ -0,0 +1,65 @@
+"""
+Pruebas para la paginación por cursor.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import User, Ingreso
+from services.paginacion import codificar_cursor, decodificar_cursor, paginar_por_cursor
+from services.validators import ValidationError
+
+
+class TestCursor:
+    """Pruebas para la codificación de cursores."""
+
+    def test_ida_y_vuelta(self):
+        """Prueba que un cursor se decodifique a los mismos valores."""
+        cursor = codificar_cursor(date(2024, 5, 1), 42)
+        assert decodificar_cursor(cursor) == (date(2024, 5, 1), 42)
+
+    def test_cursor_invalido(self):
+        """Prueba que un cursor manipulado falle con ValidationError."""
+        with pytest.raises(ValidationError):
+            decodificar_cursor('no-es-un-cursor')
+
+
+class TestPaginarPorCursor:
+    """Pruebas para la paginación keyset de transacciones."""
+
+    @pytest.fixture
+    def usuario(self, app):
+        usuario = User(nombre='Paginas', email='paginas@example.com')
+        usuario.set_password('password123')
+        db.session.add(usuario)
+        db.session.commit()
+        # Varias filas comparten fecha para forzar el desempate por id
+        db.session.add_all([
+            Ingreso(usuario_id=usuario.id, monto=Decimal(i + 1), descripcion=f'i{i}',
+                    categoria='Salario', fecha=date(2024, 1, 1 + i // 3))
+            for i in range(10)
+        ])
+        db.session.commit()
+        return usuario
+
+    def test_recorre_todas_las_filas_sin_repetir(self, app, usuario):
+        """Prueba que recorrer las páginas devuelva cada fila una vez y en orden."""
+        consulta = Ingreso.query.filter_by(usuario_id=usuario.id)
+        vistos, cursor = [], None
+        while True:
+            pagina = paginar_por_cursor(consulta, Ingreso, cursor, limite=4)
+            vistos.extend(pagina.items)
+            if not pagina.has_next:
+                break
+            cursor = pagina.next_cursor
+
+        claves = [(i.fecha, i.id) for i in vistos]
+        assert len(claves) == 10
+        assert claves == sorted(claves, reverse=True)
+
+    def test_total_bajo_demanda(self, app, usuario):
+        """Prueba que el total cuente todas las filas, no solo la página."""
+        pagina = paginar_por_cursor(Ingreso.query.filter_by(usuario_id=usuario.id),
+                                    Ingreso, limite=3)
+        assert len(pagina.items) == 3
+        assert pagina.total == 10
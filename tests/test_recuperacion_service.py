@@ -0,0 +1,85 @@
+"""
+Pruebas para el servicio de recuperación de contraseñas.
+"""
+from datetime import datetime, timedelta
+from database import db
+from models import TokenRecuperacion
+from services.recuperacion_service import RecuperacionService, hash_token
+
+
+def _token(usuario, expira, usado=False):
+    token = TokenRecuperacion(usuario_id=usuario.id, token_hash=hash_token(str(expira) + str(usado)),
+                              fecha_expiracion=expira, usado=usado)
+    db.session.add(token)
+    return token
+
+
+class TestTokensRecuperacion:
+    """Pruebas para la emisión y búsqueda de tokens."""
+
+    def test_guarda_solo_el_hash(self, app, usuario):
+        """Prueba que el token en claro no se guarde en la base de datos."""
+        token, token_rec = RecuperacionService.crear_token(usuario.id, horas=2)
+
+        assert token_rec.token_hash == hash_token(token)
+        assert token not in token_rec.token_hash
+        assert RecuperacionService.buscar_token(token) == token_rec
+
+    def test_nuevo_token_reemplaza_los_pendientes(self, app, usuario):
+        """Prueba que un token nuevo invalide los anteriores del usuario."""
+        anterior, _ = RecuperacionService.crear_token(usuario.id)
+        nuevo, _ = RecuperacionService.crear_token(usuario.id)
+
+        assert RecuperacionService.buscar_token(anterior) is None
+        assert RecuperacionService.buscar_token(nuevo) is not None
+
+    def test_token_expirado_o_usado(self, app, usuario):
+        """Prueba que la búsqueda descarte tokens expirados o usados."""
+        token, token_rec = RecuperacionService.crear_token(usuario.id, horas=1)
+
+        assert RecuperacionService.buscar_token(
+            token, ahora=datetime.utcnow() + timedelta(hours=2)) is None
+
+        token_rec.usado = True
+        db.session.commit()
+        assert RecuperacionService.buscar_token(token) is None
+
+
+class TestEliminarVencidos:
+    """Pruebas para la limpieza periódica de tokens."""
+
+    def test_elimina_usados_y_expirados_por_lotes(self, app, usuario):
+        """Prueba eliminar solo los tokens que ya no sirven."""
+        ahora = datetime(2026, 1, 1)
+        for dias in range(1, 6):
+            _token(usuario, ahora - timedelta(days=dias))
+        _token(usuario, ahora + timedelta(days=1), usado=True)
+        vigente = _token(usuario, ahora + timedelta(days=1))
+        db.session.commit()
+
+        eliminados = RecuperacionService.eliminar_vencidos(ahora, tamano_lote=2)
+
+        assert eliminados == 6
+        assert TokenRecuperacion.query.all() == [vigente]
+
+
+class TestResetearContrasena:
+    """Pruebas para el enlace de recuperación."""
+
+    def test_resetear_con_token_valido(self, app, client, usuario):
+        """Prueba cambiar la contraseña con el token del email."""
+        token, token_rec = RecuperacionService.crear_token(usuario.id)
+
+        respuesta = client.post(f'/resetear-contraseña/{token}', data={
+            'password': 'nueva-clave-1', 'confirm_password': 'nueva-clave-1'})
+
+        assert respuesta.status_code == 302
+        assert token_rec.usado
+        assert usuario.check_password('nueva-clave-1')
+
+    def test_token_invalido_redirige(self, app, client, usuario):
+        """Prueba rechazar un token desconocido."""
+        respuesta = client.get('/resetear-contraseña/desconocido')
+
+        assert respuesta.status_code == 302
+        assert 'recuperar' in respuesta.headers['Location']
@@ -0,0 +1,54 @@
+"""
+Pruebas para las fechas de pago recurrentes.
+"""
+from datetime import date
+from models import DeudaFija
+from utils.recurrencia import fecha_en_mes, proxima_fecha_pago
+
+
+class TestFechaEnMes:
+    """Pruebas para el ajuste del día de pago a la duración del mes."""
+
+    def test_dia_existente(self):
+        """Prueba conservar el día cuando existe en el mes."""
+        assert fecha_en_mes(2024, 3, 31) == date(2024, 3, 31)
+
+    def test_meses_cortos(self):
+        """Prueba usar el último día en meses de 30 días y en febrero."""
+        assert fecha_en_mes(2024, 4, 31) == date(2024, 4, 30)
+        assert fecha_en_mes(2024, 2, 30) == date(2024, 2, 29)
+        assert fecha_en_mes(2023, 2, 29) == date(2023, 2, 28)
+
+
+class TestProximaFechaPago:
+    """Pruebas para el cálculo del próximo vencimiento."""
+
+    def test_vence_hoy(self):
+        """Prueba que el día de hoy aún cuente como próximo vencimiento."""
+        assert proxima_fecha_pago(10, date(2024, 3, 10)) == date(2024, 3, 10)
+
+    def test_ya_paso_en_el_mes(self):
+        """Prueba pasar al mes siguiente si el día ya pasó."""
+        assert proxima_fecha_pago(5, date(2024, 3, 10)) == date(2024, 4, 5)
+
+    def test_cambio_de_anio(self):
+        """Prueba pasar de diciembre a enero."""
+        assert proxima_fecha_pago(1, date(2024, 12, 2)) == date(2025, 1, 1)
+
+    def test_fin_de_mes(self):
+        """Prueba que el día 31 venza a fin de febrero y no el 28 de un bisiesto."""
+        assert proxima_fecha_pago(31, date(2024, 2, 1)) == date(2024, 2, 29)
+        assert proxima_fecha_pago(31, date(2024, 1, 31)) == date(2024, 1, 31)
+
+
+class TestDeudaFijaFechas:
+    """Pruebas para el próximo vencimiento guardado en la deuda."""
+
+    def test_fecha_guardada_vencida(self):
+        """Prueba recalcular al leer si la fecha guardada ya pasó."""
+        deuda = DeudaFija(dia_pago=31)
+        deuda.programar_pago(date(2024, 1, 15))
+
+        assert deuda.proxima_fecha_pago == date(2024, 1, 31)
+        assert deuda.fecha_proximo_pago(date(2024, 1, 20)) == date(2024, 1, 31)
+        assert deuda.fecha_proximo_pago(date(2024, 2, 1)) == date(2024, 2, 29)
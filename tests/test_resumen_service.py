@@ -0,0 +1,77 @@
+"""
+Pruebas para el servicio de resúmenes mensuales.
+"""
+from datetime import date
+from decimal import Decimal
+from database import db
+from models import Ingreso, ResumenMensual
+from services.transacciones_service import TransaccionesService
+from services.resumen_service import ResumenMensualService
+
+
+def _resumenes(usuario_id):
+    return {
+        (r.tipo, r.anio, r.mes, r.categoria): (r.total, r.cantidad)
+        for r in ResumenMensual.query.filter_by(usuario_id=usuario_id)
+    }
+
+
+class TestResumenMensualService:
+    """Pruebas para el mantenimiento incremental de los resúmenes."""
+
+    def test_crear_acumula_en_el_mes(self, app, usuario):
+        """Prueba que crear transacciones acumule total y cantidad."""
+        TransaccionesService.crear_ingreso(usuario.id, '100.50', 'a', 'Salario', '2024-01-15')
+        TransaccionesService.crear_ingreso(usuario.id, '20', 'b', 'Salario', '2024-01-20')
+        TransaccionesService.crear_egreso(usuario.id, '30', 'c', 'Vivienda', '2024-02-01')
+
+        assert _resumenes(usuario.id) == {
+            ('ingreso', 2024, 1, 'Salario'): (Decimal('120.50'), 2),
+            ('egreso', 2024, 2, 'Vivienda'): (Decimal('30.00'), 1),
+        }
+
+    def test_actualizar_mueve_de_mes_y_categoria(self, app, usuario):
+        """Prueba que actualizar traslade el importe al nuevo grupo."""
+        ingreso = TransaccionesService.crear_ingreso(usuario.id, '100', 'a', 'Salario', '2024-01-15')
+        TransaccionesService.crear_ingreso(usuario.id, '50', 'b', 'Salario', '2024-01-16')
+
+        TransaccionesService.actualizar_ingreso(ingreso, monto='80', categoria='Ventas',
+                                                fecha='2024-03-01')
+
+        assert _resumenes(usuario.id) == {
+            ('ingreso', 2024, 1, 'Salario'): (Decimal('50.00'), 1),
+            ('ingreso', 2024, 3, 'Ventas'): (Decimal('80.00'), 1),
+        }
+
+    def test_actualizar_monto_en_el_mismo_grupo(self, app, usuario):
+        """Prueba que cambiar solo el monto ajuste la diferencia."""
+        ingreso = TransaccionesService.crear_ingreso(usuario.id, '100', 'a', 'Salario', '2024-01-15')
+
+        TransaccionesService.actualizar_ingreso(ingreso, monto='130')
+
+        assert _resumenes(usuario.id) == {
+            ('ingreso', 2024, 1, 'Salario'): (Decimal('130.00'), 1),
+        }
+
+    def test_eliminar_borra_grupo_vacio(self, app, usuario):
+        """Prueba que eliminar la última transacción borre su resumen."""
+        egreso = TransaccionesService.crear_egreso(usuario.id, '30', 'c', 'Vivienda', '2024-02-01')
+
+        TransaccionesService.eliminar_egreso(egreso)
+
+        assert _resumenes(usuario.id) == {}
+        assert ResumenMensualService.verificar(usuario.id) == []
+
+    def test_verificar_y_reconstruir(self, app, usuario):
+        """Prueba detectar desvíos y corregirlos reconstruyendo."""
+        TransaccionesService.crear_ingreso(usuario.id, '100', 'a', 'Salario', '2024-01-15')
+        db.session.add(Ingreso(usuario_id=usuario.id, monto=Decimal('10'), descripcion='directo',
+                               categoria='Salario', fecha=date(2024, 1, 2)))
+        db.session.commit()
+
+        diferencias = ResumenMensualService.verificar(usuario.id)
+        assert len(diferencias) == 1
+        assert diferencias[0]['esperado'] == (Decimal('110.00'), 2)
+
+        assert ResumenMensualService.reconstruir(usuario.id) == 1
+        assert ResumenMensualService.verificar(usuario.id) == []
@@ -0,0 +1,163 @@
+"""
+Pruebas para los tokens Bearer de la API.
+"""
+import pytest
+from datetime import timedelta
+from flask import g
+from database import db
+from models import TokenApiRevocado
+from services.cache import CacheLRU
+from services.tokens_api import TokensApi
+from services import contrasenas
+
+
+@pytest.fixture
+def tokens(app):
+    """Emisor de tokens con la lista de revocados en memoria."""
+    return TokensApi('secreto', timedelta(hours=1), CacheLRU(1, 60),
+                     app.extensions['cache_identidad'])
+
+
+def _get(client, url, token):
+    # El contexto de la prueba conserva el usuario de la petición anterior
+    g.pop('_login_user', None)
+    return client.get(url, headers={'Authorization': f'Bearer {token}'})
+
+
+class TestTokensApi:
+    """Pruebas para la firma, expiración y revocación."""
+
+    def test_verificar_token_valido(self, app, usuario, tokens):
+        """Prueba que un token emitido identifique a su usuario."""
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+
+        assert tokens.verificar(token) == usuario.id
+
+    def test_firma_alterada(self, app, usuario, tokens):
+        """Prueba rechazar tokens modificados o firmados con otra clave."""
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+        _, resto = token.split('.', 1)
+        otra_clave = TokensApi('otro', timedelta(hours=1), CacheLRU(), tokens.identidad)
+
+        assert tokens.verificar(f'{usuario.id + 1}.{resto}') is None
+        assert otra_clave.verificar(token) is None
+        assert tokens.verificar('no-es-un-token') is None
+        assert tokens.verificar('1.2.3.4.ñ') is None
+
+    def test_token_expirado(self, app, usuario, tokens):
+        """Prueba rechazar tokens vencidos."""
+        tokens.duracion = timedelta(seconds=-1)
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+
+        assert tokens.verificar(token) is None
+
+    def test_revocar(self, app, usuario, tokens):
+        """Prueba que un token revocado deje de ser válido."""
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+        otro, _ = tokens.generar(usuario.id, usuario.version_tokens)
+
+        assert tokens.revocar(token)
+
+        assert tokens.verificar(token) is None
+        assert tokens.verificar(otro) == usuario.id
+        assert TokenApiRevocado.query.count() == 1
+
+    def test_cambio_de_contrasena_revoca(self, app, usuario, tokens):
+        """Prueba que set_password invalide los tokens emitidos antes."""
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+
+        usuario.set_password('otra-clave-123')
+        db.session.commit()
+
+        assert tokens.verificar(token) is None
+        nuevo, _ = tokens.generar(usuario.id, usuario.version_tokens)
+        assert tokens.verificar(nuevo) == usuario.id
+
+    def test_rehash_no_revoca(self, app, usuario, tokens):
+        """Prueba que regenerar el hash al iniciar sesión mantenga los tokens."""
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+        app.config['PASSWORD_HASH_ITERACIONES'] = 1001
+
+        assert contrasenas.autenticar(usuario, 'password123')
+        assert tokens.verificar(token) == usuario.id
+
+    def test_lista_de_revocados_en_cache(self, app, usuario, tokens):
+        """Prueba que la verificación no relea los revocados mientras dure el TTL."""
+        token, _ = tokens.generar(usuario.id, usuario.version_tokens)
+        tokens.verificar(token)
+        _, expira = tokens.generar(usuario.id, usuario.version_tokens)
+        db.session.add(TokenApiRevocado(jti=token.split('.')[3], usuario_id=usuario.id,
+                                        fecha_expiracion=expira))
+        db.session.commit()
+
+        assert tokens.verificar(token) == usuario.id
+
+        tokens.cache.limpiar()
+        assert tokens.verificar(token) is None
+
+
+class TestAutenticacionConToken:
+    """Pruebas para los endpoints de la API con token Bearer."""
+
+    def test_crear_y_usar_token(self, app, client, usuario):
+        """Prueba obtener un token y usarlo sin cookie de sesión."""
+        respuesta = client.post('/api/tokens', json={'email': 'usuario@example.com',
+                                                     'password': 'password123'})
+        token = respuesta.get_json()['token']
+
+        assert respuesta.status_code == 201
+
+        listado = _get(app.test_client(), '/api/metas', token)
+        assert listado.status_code == 200
+        assert listado.get_json() == {'metas': []}
+        assert 'Set-Cookie' not in listado.headers
+
+    def test_credenciales_incorrectas(self, app, client, usuario):
+        """Prueba no emitir tokens con una contraseña incorrecta."""
+        respuesta = client.post('/api/tokens', json={'email': 'usuario@example.com',
+                                                     'password': 'incorrecta'})
+
+        assert respuesta.status_code == 401
+
+    def test_token_invalido(self, app, client, usuario):
+        """Prueba responder 401 en JSON a un token inválido."""
+        respuesta = _get(client, '/api/metas', 'invalido')
+
+        assert respuesta.status_code == 401
+        assert 'error' in respuesta.get_json()
+
+    def test_revocar_token(self, app, client, usuario):
+        """Prueba que DELETE /api/tokens revoque el token de la petición."""
+        token, _ = app.extensions['tokens_api'].generar(usuario.id, usuario.version_tokens)
+
+        g.pop('_login_user', None)
+        respuesta = client.delete('/api/tokens', headers={'Authorization': f'Bearer {token}'})
+
+        assert respuesta.status_code == 200
+        assert _get(client, '/api/metas', token).status_code == 401
+
+    def test_token_no_ascii(self, app, client, usuario):
+        """Prueba responder 401 (no 500) a un token con caracteres no ASCII."""
+        assert _get(client, '/api/metas', '1.2.3.ñ').status_code == 401
+
+    def test_revocar_todos(self, app, usuario, cliente):
+        """Prueba que DELETE /api/tokens/todos con sesión invalide todos los tokens."""
+        tokens = app.extensions['tokens_api']
+        emitidos = [tokens.generar(usuario.id, usuario.version_tokens)[0] for _ in range(2)]
+
+        respuesta = cliente.delete('/api/tokens/todos')
+
+        assert respuesta.status_code == 200
+        for token in emitidos:
+            assert _get(app.test_client(), '/api/metas', token).status_code == 401
+
+    def test_revocar_todos_requiere_sesion(self, app, client, usuario):
+        """Prueba que un token Bearer no pueda revocar todos los tokens."""
+        token, _ = app.extensions['tokens_api'].generar(usuario.id, usuario.version_tokens)
+
+        g.pop('_login_user', None)
+        respuesta = client.delete('/api/tokens/todos',
+                                  headers={'Authorization': f'Bearer {token}'})
+
+        assert respuesta.status_code == 403
+        assert _get(client, '/api/metas', token).status_code == 200
@@ -0,0 +1,88 @@
+"""
+Comandos de línea de comandos de la aplicación.
+
+Se ejecutan con ``flask <grupo> <comando>``.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+
+resumen_cli = AppGroup('resumen', help='Mantenimiento de los resúmenes mensuales.')
+
+
+@resumen_cli.command('reconstruir')
+@click.option('--usuario', 'usuario_id', type=int, default=None,
+              help='Reconstruir solo el usuario indicado.')
+def reconstruir_resumenes(usuario_id):
+    """Regenera los resúmenes mensuales a partir de las transacciones."""
+    from services.resumen_service import ResumenMensualService
+    filas = ResumenMensualService.reconstruir(usuario_id)
+    click.echo(f'Resúmenes reconstruidos: {filas} filas.')
+
+
+@resumen_cli.command('verificar')
+@click.option('--usuario', 'usuario_id', type=int, default=None,
+              help='Verificar solo el usuario indicado.')
+def verificar_resumenes(usuario_id):
+    """Comprueba que los resúmenes coincidan con las transacciones."""
+    from services.resumen_service import ResumenMensualService
+    diferencias = ResumenMensualService.verificar(usuario_id)
+    if not diferencias:
+        click.echo('Los resúmenes son consistentes.')
+        return
+
+    for diferencia in diferencias:
+        click.echo(f"{diferencia['clave']}: esperado={diferencia['esperado']} "
+                   f"actual={diferencia['actual']}")
+    raise click.ClickException(f'{len(diferencias)} diferencias encontradas.')
+
+
+contrasenas_cli = AppGroup('contrasenas', help='Hash de contraseñas.')
+
+
+@contrasenas_cli.command('benchmark')
+@click.option('--peticiones', type=int, default=200, help='Verificaciones a realizar.')
+@click.option('--clientes', type=int, default=16, help='Peticiones de login simultáneas.')
+def benchmark_contrasenas(peticiones, clientes):
+    """Mide los inicios de sesión por segundo con la configuración actual."""
+    from services import contrasenas
+
+    app = current_app._get_current_object()
+    password_hash = contrasenas.generar_hash('contraseña-de-prueba')
+
+    def login(_):
+        with app.app_context():
+            inicio = time.perf_counter()
+            try:
+                contrasenas.verificar(password_hash, 'contraseña-de-prueba')
+            except contrasenas.ContrasenasSaturadasError:
+                return None
+            return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        tiempos = list(pool.map(login, range(peticiones)))
+    total = time.perf_counter() - inicio
+
+    aceptadas = sorted(t for t in tiempos if t is not None)
+    click.echo(f'Método: {contrasenas.metodo_configurado()}  '
+               f'hilos de hash: {app.config["PASSWORD_HILOS"] or "en la petición"}')
+    click.echo(f'{len(aceptadas)} verificaciones en {total:.2f} s '
+               f'({len(aceptadas) / total:.1f}/s), {peticiones - len(aceptadas)} rechazadas')
+    if aceptadas:
+        click.echo(f'Latencia p50: {aceptadas[len(aceptadas) // 2] * 1000:.0f} ms  '
+                   f'p95: {aceptadas[int(len(aceptadas) * 0.95)] * 1000:.0f} ms')
+
+
+def register_commands(app):
+    """
+    Registra los comandos CLI en la aplicación.
+
+    Args:
+        app: Instancia de Flask
+    """
+    app.cli.add_command(resumen_cli)
+    app.cli.add_command(contrasenas_cli)
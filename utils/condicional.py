@@ -0,0 +1,92 @@
+"""
+Peticiones GET condicionales (ETag / Last-Modified) para páginas y listados.
+
+Las vistas registradas en ``PAGINAS_CONDICIONALES`` dependen solo de los datos
+del usuario en las tablas indicadas y de la fecha actual. Antes de ejecutar la
+vista se calcula el ETag a partir de las versiones de esas tablas (ver
+``services.cache_usuario``), que se leen con una sola consulta por clave
+primaria; si el cliente ya tiene esa versión se responde 304 sin ejecutar las
+consultas de la vista ni renderizar la plantilla.
+
+Last-Modified se envía como información, pero solo se responde 304 cuando
+coincide el ETag: If-Modified-Since tiene precisión de segundos y no
+distingue dos cambios hechos en el mismo segundo.
+"""
+from datetime import date, datetime, timezone
+from flask import Response, g, request, session
+from flask_login import current_user
+from services.cache import clave_hash
+
+
+# Endpoint -> tablas de las que depende la respuesta (None: todos los datos)
+PAGINAS_CONDICIONALES = {
+    'main.dashboard': None,
+    'transacciones.listar_ingresos': ('ingresos',),
+    'transacciones.listar_egresos': ('egresos',),
+    'metas.listar_metas': ('metas',),
+    'ahorros.listar_ahorros': ('ahorros',),
+    'recordatorios.listar_recordatorios': ('recordatorios',),
+    'deudas.listar_deudas': ('deudas_fijas', 'pagos_deuda'),
+    'api.listar_ingresos': ('ingresos',),
+    'api.listar_egresos': ('egresos',),
+    'api.listar_deudas': ('deudas_fijas', 'pagos_deuda', 'amortizaciones_deuda'),
+}
+
+
+def _es_condicional() -> bool:
+    """Indica si la petición actual puede responderse con 304."""
+    return (request.method == 'GET'
+            and request.endpoint in PAGINAS_CONDICIONALES
+            and current_user.is_authenticated
+            # Los mensajes flash pendientes se muestran una sola vez
+            and '_flashes' not in session)
+
+
+def _ultima_modificacion(timestamp: float) -> datetime:
+    """Momento del último cambio; el contenido también cambia a medianoche."""
+    hoy = datetime.combine(date.today(), datetime.min.time()).astimezone(timezone.utc)
+    modificado = datetime.fromtimestamp(int(timestamp), timezone.utc)
+    return max(modificado, hoy)
+
+
+def configurar_peticiones_condicionales(app):
+    """
+    Registra los manejadores que añaden ETag y Last-Modified a las vistas de
+    ``PAGINAS_CONDICIONALES`` y responden 304 si el ETag del cliente está al día.
+
+    Args:
+        app: Instancia de Flask con la caché ``cache_usuarios`` configurada
+    """
+    @app.before_request
+    def responder_no_modificado():
+        if not _es_condicional():
+            return None
+
+        cache = app.extensions['cache_usuarios']
+        version, timestamp = cache.estado(current_user.id,
+                                          PAGINAS_CONDICIONALES[request.endpoint])
+        g.etag = clave_hash(current_user.id, version, request.endpoint,
+                            sorted(request.args.items(multi=True)),
+                            request.view_args, date.today().isoformat())[:32]
+        g.ultima_modificacion = _ultima_modificacion(timestamp)
+
+        if g.etag in request.if_none_match:
+            respuesta = Response(status=304)
+            respuesta.set_etag(g.etag)
+            respuesta.last_modified = g.ultima_modificacion
+            respuesta.headers['Cache-Control'] = 'private, no-cache'
+            return respuesta
+        return None
+
+    @app.after_request
+    def agregar_validadores(respuesta):
+        etag = g.pop('etag', None)
+        ultima_modificacion = g.pop('ultima_modificacion', None)
+        if (etag is None or respuesta.status_code != 200
+                or 'ETag' in respuesta.headers or '_flashes' in session):
+            return respuesta
+
+        respuesta.set_etag(etag)
+        respuesta.last_modified = ultima_modificacion
+        respuesta.headers['Cache-Control'] = 'private, no-cache'
+        return respuesta
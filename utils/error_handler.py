@@ -6,6 +6,7 @@ Proporciona funciones y decoradores para manejar errores de manera consistente.
 from functools import wraps
 from flask import jsonify, flash, redirect, url_for, request
 from services.validators import ValidationError
+from services.contrasenas import ContrasenasSaturadasError
 from database import db
 
 
@@ -68,6 +69,12 @@ def register_error_handlers(app):
         """Maneja errores 403."""
         return jsonify({'error': 'No autorizado'}), 403
     
+    @app.errorhandler(ContrasenasSaturadasError)
+    def contrasenas_saturadas(error):
+        """Rechaza la petición si hay demasiados hashes de contraseña pendientes."""
+        db.session.rollback()
+        return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+    
     @app.errorhandler(500)
     def internal_error(error):
         """Maneja errores 500."""
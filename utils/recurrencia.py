@@ -0,0 +1,36 @@
+"""
+Fechas de pago mensuales recurrentes.
+
+Una deuda fija vence cada mes en su día de pago (1-31). En los meses más
+cortos que ese día, vence el último día del mes (el 31 vence el 30 de abril
+y el 29 de febrero en años bisiestos).
+"""
+import calendar
+from datetime import date
+
+
+def fecha_en_mes(anio: int, mes: int, dia_pago: int) -> date:
+    """Fecha de pago de un mes concreto, ajustada a la duración del mes."""
+    return date(anio, mes, min(dia_pago, calendar.monthrange(anio, mes)[1]))
+
+
+def mes_siguiente(anio: int, mes: int):
+    """Año y mes del mes siguiente."""
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def proxima_fecha_pago(dia_pago: int, desde: date) -> date:
+    """
+    Primera fecha de pago igual o posterior a `desde`.
+
+    Args:
+        dia_pago: Día de pago del mes (1-31)
+        desde: Fecha de referencia (normalmente hoy)
+
+    Returns:
+        Fecha de pago de este mes si aún no pasó; si no, la del mes siguiente
+    """
+    fecha = fecha_en_mes(desde.year, desde.month, dia_pago)
+    if fecha < desde:
+        fecha = fecha_en_mes(*mes_siguiente(desde.year, desde.month), dia_pago)
+    return fecha
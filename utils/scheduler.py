@@ -0,0 +1,198 @@
+"""
+Configuración del scheduler de tareas programadas.
+
+Dos modos, según ``SCHEDULER_MODO``:
+
+- ``local``: cada proceso tiene sus tareas en memoria (un solo worker).
+- ``distribuido``: las tareas se guardan en la base de datos
+  (``SQLAlchemyJobStore``) y cada ejecución toma un bloqueo en
+  ``bloqueos_tareas``, así que con varios workers cada tarea corre una sola
+  vez por día. Con ``SCHEDULER_SHARDS`` > 1 la verificación de recordatorios
+  se divide en tareas independientes por ``usuario_id mod N`` que pueden
+  ejecutarse en paralelo en distintos workers.
+
+Además, poco después de medianoche se avanza el próximo vencimiento de las
+deudas fijas cuya fecha ya pasó, y de madrugada se eliminan los tokens de
+recuperación de contraseña usados o expirados.
+"""
+from datetime import datetime
+from apscheduler.schedulers.background import BackgroundScheduler
+
+
+TAREA_RECORDATORIOS = 'verificar_recordatorios'
+TAREA_DEUDAS = 'actualizar_deudas'
+TAREA_TOKENS = 'limpiar_tokens'
+
+# App y extensión de correo del proceso, para las tareas persistidas: el
+# jobstore solo guarda una referencia textual a la función y sus argumentos.
+_contexto = {}
+
+
+def nombre_tarea(shard: int, shards: int) -> str:
+    """Id de la tarea de recordatorios para un shard."""
+    if shards <= 1:
+        return TAREA_RECORDATORIOS
+    return f'{TAREA_RECORDATORIOS}_{shard}'
+
+
+def ejecutar_verificacion(app, mail, shard: int = 0, shards: int = 1) -> None:
+    """Ejecuta la verificación de recordatorios de un shard."""
+    from services.notificaciones_service import verificar_recordatorios
+    verificar_recordatorios(app, mail, shard=shard, shards=shards)
+
+
+def actualizar_deudas(app) -> None:
+    """Avanza los vencimientos de deudas fijas que ya pasaron."""
+    from services.deudas_service import DeudasService
+    with app.app_context():
+        actualizadas = DeudasService.actualizar_fechas_pago(datetime.now().date())
+        app.logger.info(f'Próximas fechas de pago actualizadas: {actualizadas}')
+
+
+def limpiar_tokens(app) -> None:
+    """Elimina los tokens de recuperación usados o expirados."""
+    from services.recuperacion_service import RecuperacionService
+    with app.app_context():
+        eliminados = RecuperacionService.eliminar_vencidos()
+        app.logger.info(f'Tokens de recuperación eliminados: {eliminados}')
+
+
+def ejecutar_con_bloqueo(nombre: str, tarea) -> None:
+    """
+    Ejecuta `tarea` solo si este proceso obtiene el bloqueo del día.
+
+    Si la tarea falla el bloqueo se libera sin marcar el día, de modo que
+    otro worker (o la siguiente ejecución) puede reintentarla.
+    """
+    from services.bloqueo_service import BloqueoService, identificador_proceso
+
+    app = _contexto['app']
+    propietario = identificador_proceso()
+    periodo = datetime.now().date().isoformat()
+
+    with app.app_context():
+        duracion = app.config.get('SCHEDULER_LEASE_SEGUNDOS', 3600)
+        if not BloqueoService.adquirir(nombre, propietario, periodo, duracion):
+            app.logger.info(f'Tarea {nombre} ya ejecutada o en curso en otro proceso')
+            return
+
+        try:
+            tarea()
+        except Exception:
+            BloqueoService.liberar(nombre, propietario)
+            raise
+        BloqueoService.completar(nombre, propietario, periodo)
+
+
+def ejecutar_verificacion_distribuida(shard: int = 0, shards: int = 1) -> None:
+    """Ejecuta la verificación de un shard una vez por día entre todos los workers."""
+    app, mail = _contexto['app'], _contexto['mail']
+    ejecutar_con_bloqueo(nombre_tarea(shard, shards),
+                         lambda: ejecutar_verificacion(app, mail, shard, shards))
+
+
+def actualizar_deudas_distribuida() -> None:
+    """Actualiza las deudas fijas una vez por día entre todos los workers."""
+    app = _contexto['app']
+    ejecutar_con_bloqueo(TAREA_DEUDAS, lambda: actualizar_deudas(app))
+
+
+def limpiar_tokens_distribuida() -> None:
+    """Limpia los tokens de recuperación una vez por día entre todos los workers."""
+    app = _contexto['app']
+    ejecutar_con_bloqueo(TAREA_TOKENS, lambda: limpiar_tokens(app))
+
+
+def configurar_scheduler(app, mail) -> BackgroundScheduler:
+    """
+    Crea el scheduler, programa la verificación diaria y lo inicia.
+
+    Args:
+        app: Instancia de Flask
+        mail: Extensión Flask-Mail
+
+    Returns:
+        Scheduler iniciado
+    """
+    distribuido = app.config.get('SCHEDULER_MODO', 'local') == 'distribuido'
+    shards = max(1, app.config.get('SCHEDULER_SHARDS', 1))
+    programacion = dict(
+        trigger='cron',
+        hour=app.config.get('SCHEDULER_HOUR', 9),
+        minute=app.config.get('SCHEDULER_MINUTE', 0),
+        replace_existing=True
+    )
+    # Justo después del cambio de día, antes de que se consulten los vencimientos
+    programacion_deudas = dict(trigger='cron', hour=0, minute=5, replace_existing=True)
+    programacion_tokens = dict(trigger='cron', hour=3, minute=30, replace_existing=True)
+
+    if not distribuido:
+        scheduler = BackgroundScheduler(timezone=app.config.get('SCHEDULER_TIMEZONE', 'UTC'))
+        scheduler.start()
+        for shard in range(shards):
+            scheduler.add_job(
+                func=ejecutar_verificacion,
+                args=(app, mail, shard, shards),
+                id=nombre_tarea(shard, shards),
+                name='Verificar recordatorios diarios',
+                **programacion
+            )
+        scheduler.add_job(
+            func=actualizar_deudas,
+            args=(app,),
+            id=TAREA_DEUDAS,
+            name='Actualizar vencimientos de deudas',
+            **programacion_deudas
+        )
+        scheduler.add_job(
+            func=limpiar_tokens,
+            args=(app,),
+            id=TAREA_TOKENS,
+            name='Limpiar tokens de recuperación',
+            **programacion_tokens
+        )
+        return scheduler
+
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+
+    _contexto.update(app=app, mail=mail)
+    url = app.config.get('SCHEDULER_JOBSTORE_URL') or app.config['SQLALCHEMY_DATABASE_URI']
+    scheduler = BackgroundScheduler(
+        jobstores={'default': SQLAlchemyJobStore(url=url)},
+        job_defaults={
+            # Si todos los workers estaban caídos a la hora programada
+            'coalesce': True,
+            'misfire_grace_time': app.config.get('SCHEDULER_LEASE_SEGUNDOS', 3600),
+        },
+        timezone=app.config.get('SCHEDULER_TIMEZONE', 'UTC')
+    )
+    scheduler.start()
+
+    ids = set()
+    for shard in range(shards):
+        ids.add(nombre_tarea(shard, shards))
+        scheduler.add_job(
+            func='utils.scheduler:ejecutar_verificacion_distribuida',
+            args=(shard, shards),
+            id=nombre_tarea(shard, shards),
+            name=f'Verificar recordatorios diarios ({shard + 1}/{shards})',
+            **programacion
+        )
+    scheduler.add_job(
+        func='utils.scheduler:actualizar_deudas_distribuida',
+        id=TAREA_DEUDAS,
+        name='Actualizar vencimientos de deudas',
+        **programacion_deudas
+    )
+    scheduler.add_job(
+        func='utils.scheduler:limpiar_tokens_distribuida',
+        id=TAREA_TOKENS,
+        name='Limpiar tokens de recuperación',
+        **programacion_tokens
+    )
+
+    # Quitar tareas de una configuración anterior con otro número de shards
+    for tarea in scheduler.get_jobs():
+        if tarea.id.startswith(TAREA_RECORDATORIOS) and tarea.id not in ids:
+            scheduler.remove_job(tarea.id)
+    return scheduler